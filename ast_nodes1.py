@@ -36,6 +36,15 @@ class BinaryOp:
         self.op = op
         self.right = right
 
+class TypedBinaryOp(BinaryOp):
+    """BinaryOp specialized by type inference: operation is applied directly when the operands
+    have exactly left_type and right_type."""
+    def __init__(self, left, op, right, left_type, right_type, operation):
+        super().__init__(left, op, right)
+        self.left_type = left_type
+        self.right_type = right_type
+        self.operation = operation
+
 class UnaryOp:
     def __init__(self, op, expr):
         self.op = op
@@ -69,6 +78,61 @@ class FunctionCall:
         self.name = name
         self.args = args
 
+class BuiltinCall(FunctionCall):
+    """Call of a function registered in builtin_functions.BUILTINS.
+
+    Runs the builtin directly unless a user function of the same name is defined.
+    """
+
+class ListNode:
+    def __init__(self, elements):
+        self.elements = elements
+
+class DictNode:
+    """Dict literal; keys[i] maps to values[i]."""
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+class SetNode:
+    def __init__(self, elements):
+        self.elements = elements
+
+class IndexNode:
+    def __init__(self, expr, index):
+        self.expr = expr
+        self.index = index
+
+class SliceNode:
+    """`expr[start:stop:step]`; start, stop and step may each be None."""
+    def __init__(self, expr, start, stop, step):
+        self.expr = expr
+        self.start = start
+        self.stop = stop
+        self.step = step
+
+class ListAssign:
+    """`expr[index] = value`, assigning one element of a list in place."""
+    def __init__(self, expr, index, value):
+        self.expr = expr
+        self.index = index
+        self.value = value
+
+class StringMethod:
+    def __init__(self, string_obj, method, args):
+        self.string_obj = string_obj
+        self.method = method
+        self.args = args
+
+class LenFunction:
+    def __init__(self, expr):
+        self.expr = expr
+
+class TryExcept:
+    def __init__(self, try_body, except_body):
+        self.try_body = try_body
+        self.except_body = except_body
+
 class RangeCall:
     def __init__(self, start, stop, step):
         self.start = start
@@ -80,3 +144,54 @@ class Break(Statement):
 
 class Continue(Statement):
     pass
+
+# Superinstructions: fused forms of common statement shapes, created by superinstructions.py.
+# Each keeps the fields of the node it replaces and counts its executions (iterations, for
+# loops) in hits.
+
+class IncrementAssign(Assign):
+    """`x = x + operand` or `x = x - operand` with a literal or variable operand."""
+    def __init__(self, name, expr, op, operand):
+        super().__init__(name, expr)
+        self.op = op
+        self.operand = operand
+        self.hits = 0
+
+class FusedCompare(BinaryOp):
+    """Comparison of a variable with a literal or another variable, applied with compare."""
+    def __init__(self, left, op, right, compare):
+        super().__init__(left, op, right)
+        self.compare = compare
+        self.right_name = right.name if isinstance(right, Identifier) else None
+        self.constant = None if self.right_name else right.value
+        self.hits = 0
+
+class CompareBranch(IfElse):
+    """IfElse whose condition is a FusedCompare."""
+    def __init__(self, condition, if_body, else_body=None):
+        super().__init__(condition, if_body, else_body)
+        self.hits = 0
+
+class CompareWhileLoop(WhileLoop):
+    """WhileLoop whose condition is a FusedCompare."""
+    def __init__(self, condition, body):
+        super().__init__(condition, body)
+        self.hits = 0
+
+# Vectorized loops, created by vectorizer.py. The ForLoop fields are kept so the loop can still
+# run element by element whenever the whole-column kernel cannot reproduce it exactly.
+
+class VectorizedLoop(ForLoop):
+    """ForLoop whose single statement is an element-wise map or a reduction.
+
+    kind is 'map' (c[i] = element), 'append' (c.append(element)), 'sum', 'product', 'min' or
+    'max' (reductions into the variable target). hits and fallbacks count the runs done on whole
+    columns and element by element.
+    """
+    def __init__(self, var, iterable, body, kind, target, element):
+        super().__init__(var, iterable, body)
+        self.kind = kind
+        self.target = target
+        self.element = element
+        self.hits = 0
+        self.fallbacks = 0
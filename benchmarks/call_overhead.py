@@ -0,0 +1,61 @@
+"""Benchmark: per-call overhead with and without call-site caches.
+
+Run from the repository root: python benchmarks/call_overhead.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+
+PROGRAM = """
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+def add(a, b):
+    return a + b
+print(fib(20))
+i = 0
+total = 0
+while i < 50000:
+    total = add(total, i)
+    i = add(i, 1)
+print(total)
+"""
+
+class UncachedInterpreter(Interpreter):
+    """Resolves and checks the callee and evaluates every argument on every call, as before
+    call-site caching."""
+    def evaluate_FunctionCall(self, node):
+        func = self.resolve_call(node).func
+        return self.call_function(func, [self.evaluate(arg) for arg in node.args])
+
+def run(interpreter_class, repeat=3):
+    """Execute PROGRAM and return (best seconds, output)."""
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            interpreter_class().execute(PROGRAM)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue()
+
+def main():
+    calls = 21891 + 100000
+    uncached_time, uncached_output = run(UncachedInterpreter)
+    cached_time, cached_output = run(Interpreter)
+    if uncached_output != cached_output:
+        raise SystemExit("Output mismatch between cached and uncached calls")
+    print(f"Calls per run:     {calls}")
+    print(f"Uncached lookups:  {uncached_time:.3f}s ({uncached_time / calls * 1e6:.2f} us/call)")
+    print(f"Call-site caches:  {cached_time:.3f}s ({cached_time / calls * 1e6:.2f} us/call)")
+
+if __name__ == "__main__":
+    main()
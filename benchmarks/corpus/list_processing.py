@@ -0,0 +1,18 @@
+xs = []
+for i in range(4000):
+    xs.append((i * 7919) % 1000)
+evens = []
+for x in xs:
+    if x % 2 == 0:
+        evens.append(x)
+print(len(evens))
+ordered = sorted(xs)
+print(ordered[0])
+print(ordered[len(ordered) - 1])
+total = 0
+i = 0
+while i < len(ordered):
+    total = total + ordered[i]
+    i = i + 5
+print(total)
+print(sum(xs[100:200]))
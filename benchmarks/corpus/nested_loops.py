@@ -0,0 +1,8 @@
+total = 0
+for i in range(120):
+    for j in range(120):
+        if (i + j) % 3 == 0:
+            total = total + i * j
+        else:
+            total = total - 1
+print(total)
@@ -0,0 +1,12 @@
+s = ""
+line = ""
+for i in range(3000):
+    line = line + str(i % 10)
+    if len(line) == 40:
+        s = s + line + "\n"
+        line = ""
+s = s + line
+print(len(s))
+digits = s.replace("\n", "")
+print(len(digits))
+print(len(digits.replace("0", "")))
@@ -0,0 +1,23 @@
+def safe_div(a, b):
+    try:
+        return a / b
+    except:
+        return 0
+def first(xs):
+    try:
+        return xs[0]
+    except:
+        return -1
+ok = 0
+failed = 0
+for i in range(3000):
+    if safe_div(i, i % 4) == 0:
+        failed = failed + 1
+    else:
+        ok = ok + 1
+empty = []
+full = [1, 2]
+for i in range(1000):
+    ok = ok + first(full) + first(empty)
+print(ok)
+print(failed)
@@ -0,0 +1,86 @@
+"""Benchmark: counting and membership tests with list scans versus dicts and sets.
+
+Run from the repository root: python benchmarks/dict_lookup.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+
+# Count occurrences of 200 distinct values in 2000 items, then test 5000 values for membership
+LIST_PROGRAM = """
+keys = []
+counts = []
+i = 0
+while i < 2000:
+    value = i * 7 % 200
+    j = 0
+    found = False
+    while j < len(keys) and not found:
+        if keys[j] == value:
+            counts[j] = counts[j] + 1
+            found = True
+        j = j + 1
+    if not found:
+        keys.append(value)
+        counts.append(1)
+    i = i + 1
+print(len(keys))
+print(counts[0])
+items = []
+for k in range(5000):
+    items.append(k * 3)
+hits = 0
+for q in range(5000):
+    if q in items:
+        hits = hits + 1
+print(hits)
+"""
+
+# There is no empty-set literal ({} is a dict), so items starts as {0}; the loop adds 0 anyway
+DICT_PROGRAM = """
+counts = {}
+i = 0
+while i < 2000:
+    value = i * 7 % 200
+    counts[value] = counts.get(value, 0) + 1
+    i = i + 1
+print(len(counts))
+print(counts[0])
+items = {0}
+for k in range(5000):
+    items.add(k * 3)
+hits = 0
+for q in range(5000):
+    if q in items:
+        hits = hits + 1
+print(hits)
+"""
+
+def run(program, repeat=3):
+    """Execute a program and return (best seconds, output)."""
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            Interpreter().execute(program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue()
+
+def main():
+    list_time, list_output = run(LIST_PROGRAM)
+    dict_time, dict_output = run(DICT_PROGRAM)
+    if list_output != dict_output:
+        raise SystemExit("Output mismatch between list and dict programs")
+    print(f"List scans:      {list_time:.3f}s")
+    print(f"Dicts and sets:  {dict_time:.3f}s ({list_time / dict_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Differential testing: random programs must print the same under every backend as under Python.
+
+Run from the repository root: python benchmarks/differential_testing.py
+
+Each seed gives one program from program_generator. It is run by Python itself and by each
+backend (the interpreter in its various modes and the ICG executor); a backend that prints
+something else or raises is reported with the seed, and with --save-failures the program is
+written out for reproduction. The exit status is 1 if any backend disagreed.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from program_generator import generate_program
+from interpreter import Interpreter
+from compiler_phases import parse_program, generate_icg, optimize_code_icg
+from icg_executor import ICGExecutor
+
+def printed(function, *args, **kwargs):
+    """What function(*args, **kwargs) prints."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        function(*args, **kwargs)
+    return output.getvalue()
+
+def interpreter_backend(interpreter_options=None, **execute_options):
+    def run(source):
+        return printed(Interpreter(**(interpreter_options or {})).execute, source, **execute_options)
+    return run
+
+def icg_backend(optimize):
+    def run(source):
+        listing = generate_icg(parse_program(source))
+        if optimize:
+            listing = optimize_code_icg(listing)
+        executor = ICGExecutor(max_steps=10 ** 7)
+        executor.execute(listing)
+        return "".join(f"{value}\n" for value in executor.output)
+    return run
+
+BACKENDS = {
+    'interpreter': interpreter_backend(),
+    'optimized': interpreter_backend(optimize=True),
+    'specialized': interpreter_backend(specialize=True, fuse=True),
+    'fused': interpreter_backend(fuse=True),
+    'vectorized': interpreter_backend(vectorize=True),
+    'tiered': interpreter_backend({'tier_threshold': 2}),
+    'coverage': interpreter_backend({'coverage': True}),
+    'icg': icg_backend(optimize=False),
+    'icg_optimized': icg_backend(optimize=True),
+}
+
+
+def first_difference(expected, got):
+    """Line number and the two versions of the first line where two outputs differ."""
+    expected_lines, got_lines = expected.split("\n"), got.split("\n")
+    for number, (want, have) in enumerate(zip(expected_lines, got_lines), 1):
+        if want != have:
+            return number, want, have
+    number = min(len(expected_lines), len(got_lines)) + 1
+    return number, "\n".join(expected_lines[number - 1:])[:60], "\n".join(got_lines[number - 1:])[:60]
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    arguments.add_argument("--seeds", type=int, default=100, help="number of programs to test")
+    arguments.add_argument("--first-seed", type=int, default=0)
+    arguments.add_argument("--statements", type=int, default=30, help="top-level statements per program")
+    arguments.add_argument("--functions", type=int, default=3, help="functions per program")
+    arguments.add_argument("--depth", type=int, default=3, help="deepest nesting of blocks")
+    arguments.add_argument("--function-statements", type=int, default=6, help="statements per function")
+    arguments.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=list(BACKENDS))
+    arguments.add_argument("--save-failures", metavar="DIR", help="write each failing program to DIR")
+    options = arguments.parse_args()
+
+    agreed = {name: 0 for name in options.backends}
+    failures = []
+    for seed in range(options.first_seed, options.first_seed + options.seeds):
+        source = generate_program(seed, options.statements, options.functions, options.depth,
+                                  options.function_statements)
+        expected = printed(exec, source, {})
+        failed = False
+        for name in options.backends:
+            try:
+                got = BACKENDS[name](source)
+            except Exception as e:
+                got = f"<{type(e).__name__}: {e}>"
+            if got == expected:
+                agreed[name] += 1
+                continue
+            failed = True
+            number, want, have = first_difference(expected, got)
+            failures.append(f"seed {seed}, {name}: output line {number} is {have!r}, Python printed {want!r}")
+        if failed and options.save_failures:
+            os.makedirs(options.save_failures, exist_ok=True)
+            with open(os.path.join(options.save_failures, f"seed{seed}.py"), "w", encoding="utf-8") as f:
+                f.write(source)
+
+    for name in options.backends:
+        print(f"{name}: {agreed[name]}/{options.seeds} program(s) agree with Python")
+    for failure in failures[:20]:
+        print(f"  {failure}")
+    if len(failures) > 20:
+        print(f"  ... {len(failures) - 20} more")
+    if failures:
+        raise SystemExit(f"{len(failures)} disagreement(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Syntax highlighter speed: time per keystroke in a 5,000-line file.
+
+Run from the repository root: python benchmarks/highlighter.py
+
+The file is made of random programs from program_generator. Each keystroke types a character
+on a random line and highlights the lines it made dirty, as the editor does once its debounce
+delay has passed. The work is timed on its own (LineHighlighter) and, when a display is
+available, through a Tk Text widget with the tags applied (TextHighlighter).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from program_generator import generate_program
+from syntax_highlighter import LineHighlighter, TextHighlighter
+
+def source_of(lines):
+    """A program of the given number of lines, made of generated programs."""
+    text, seed = [], 0
+    while len(text) < lines:
+        text += generate_program(seed, statements=50, functions=5).split("\n")
+        seed += 1
+    return "\n".join(text[:lines])
+
+def summary(times):
+    times = sorted(times)
+    return (f"mean {sum(times) / len(times) * 1000:.3f}ms, "
+            f"p99 {times[int(len(times) * 0.99)] * 1000:.3f}ms, max {times[-1] * 1000:.3f}ms")
+
+def time_model(source, keystrokes, rng):
+    start = time.perf_counter()
+    highlighter = LineHighlighter(source)
+    highlighter.retokenize()
+    print(f"LineHighlighter: first highlighting {(time.perf_counter() - start) * 1000:.1f}ms")
+    times = []
+    for _ in range(keystrokes):
+        line = rng.randrange(len(highlighter.lines)) + 1
+        text = highlighter.lines[line - 1]
+        column = rng.randint(0, len(text))
+        start = time.perf_counter()
+        highlighter.replace_lines(line, line, [text[:column] + rng.choice("ax1( ") + text[column:]])
+        highlighter.retokenize()
+        times.append(time.perf_counter() - start)
+    print(f"LineHighlighter: per keystroke {summary(times)}")
+
+def time_widget(source, keystrokes, rng):
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("TextHighlighter: no display, not timed")
+        return
+    root.withdraw()
+    text = tk.Text(root)
+    highlighter = TextHighlighter(text)
+    start = time.perf_counter()
+    text.insert("1.0", source)
+    highlighter.flush()
+    print(f"TextHighlighter: first highlighting {(time.perf_counter() - start) * 1000:.1f}ms")
+    lines = source.count("\n") + 1
+    times = []
+    for _ in range(keystrokes):
+        line = rng.randrange(lines) + 1
+        start = time.perf_counter()
+        text.insert(f"{line}.{rng.randint(0, 20)}", rng.choice("ax1( "))
+        highlighter.flush()
+        times.append(time.perf_counter() - start)
+    print(f"TextHighlighter: per keystroke {summary(times)}")
+    root.destroy()
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    arguments.add_argument("--lines", type=int, default=5000, help="lines in the file")
+    arguments.add_argument("--keystrokes", type=int, default=1000, help="keystrokes to time")
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    source = source_of(options.lines)
+    time_model(source, options.keystrokes, random.Random(options.seed))
+    time_widget(source, options.keystrokes, random.Random(options.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark: growing lists with `xs = xs + [v]`, copied each time or rewritten to in-place appends.
+
+Run from the repository root: python benchmarks/list_append.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+from myparser import parser
+import optimizer
+
+PROGRAM = """
+squares = []
+i = 0
+while i < 20000:
+    squares = squares + [i * i]
+    i = i + 1
+print(len(squares))
+print(squares[19999])
+def evens(n):
+    result = []
+    for k in range(n):
+        if k % 2 == 0:
+            result = result + [k]
+    return result
+print(len(evens(10000)))
+"""
+
+def run(passes, repeat=3):
+    """Optimize PROGRAM with the given passes and return (best seconds, output, report)."""
+    best = None
+    for _ in range(repeat):
+        statements, report = optimizer.optimize_ast(parser.parse(PROGRAM), passes=passes)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            Interpreter().interpret(statements)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue(), report
+
+def main():
+    without = [p for p in optimizer.OPTIMIZATION_PASSES if p is not optimizer.ListAppendRewriter]
+    copy_time, copy_output, _ = run(without)
+    append_time, append_output, report = run(optimizer.OPTIMIZATION_PASSES)
+    if copy_output != append_output:
+        raise SystemExit("Output mismatch between copying and appending programs")
+    print(f"Copy per append:   {copy_time:.3f}s")
+    print(f"In-place append:   {append_time:.3f}s ({copy_time / append_time:.2f}x)")
+    for line in report:
+        if line.startswith("List append"):
+            print(f"  {line}")
+
+if __name__ == "__main__":
+    main()
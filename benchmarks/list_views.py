@@ -0,0 +1,62 @@
+"""Benchmark: recursive binary search on list slices, copying each slice versus sharing storage.
+
+Run from the repository root: python benchmarks/list_views.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+from typed_list import TypedList, storage
+
+# 300 searches in a sorted list of a million ints, each recursing on the half that may hold the target
+PROGRAM = """
+def search(xs, target, offset):
+    if len(xs) == 0:
+        return -1
+    mid = int((len(xs) - len(xs) % 2) / 2)
+    if xs[mid] == target:
+        return offset + mid
+    if xs[mid] < target:
+        return search(xs[mid + 1:], target, offset + mid + 1)
+    return search(xs[:mid], target, offset)
+xs = sorted(range(1000000))
+found = 0
+for t in range(300):
+    if search(xs, t * 3331, 0) == t * 3331:
+        found = found + 1
+print(found)
+print(search(xs, 0 - 1, 0))
+"""
+
+class CopyingInterpreter(Interpreter):
+    """Interpreter whose list slices copy their elements into a new list, as Python's slicing does."""
+    def evaluate_SliceNode(self, node):
+        return TypedList(storage(super().evaluate_SliceNode(node)))
+
+def run(interpreter_class, repeat=3):
+    """Execute PROGRAM and return (best seconds, output)."""
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            interpreter_class().execute(PROGRAM)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue()
+
+def main():
+    copy_time, copy_output = run(CopyingInterpreter)
+    view_time, view_output = run(Interpreter)
+    if copy_output != view_output:
+        raise SystemExit("Output mismatch between copied slices and views")
+    print(f"Copied slices:  {copy_time:.3f}s")
+    print(f"List views:     {view_time:.3f}s ({copy_time / view_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: interpreter time for range loops with and without loop unrolling.
+
+Run from the repository root: python benchmarks/loop_unrolling.py [factor]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+from myparser import parser
+import optimizer
+
+PROGRAM = """
+total = 0
+for i in range(200000):
+    total = total + i * 3
+print(total)
+cells = 0
+for row in range(300):
+    for col in range(6):
+        cells = cells + row + col
+print(cells)
+"""
+
+def run(passes, repeat=3):
+    """Optimize PROGRAM with the given passes and return (best seconds, output, report)."""
+    best = None
+    for _ in range(repeat):
+        statements, report = optimizer.optimize_ast(parser.parse(PROGRAM), passes=passes)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            Interpreter().interpret(statements)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue(), report
+
+def main():
+    if len(sys.argv) > 1:
+        optimizer.LoopUnroller.UNROLL_FACTOR = int(sys.argv[1])
+    without = [p for p in optimizer.OPTIMIZATION_PASSES if p is not optimizer.LoopUnroller]
+    base_time, base_output, _ = run(without)
+    unrolled_time, unrolled_output, report = run(optimizer.OPTIMIZATION_PASSES)
+    if base_output != unrolled_output:
+        raise SystemExit("Output mismatch between unrolled and rolled programs")
+    print(f"Unroll factor:     {optimizer.LoopUnroller.UNROLL_FACTOR}")
+    print(f"Without unrolling: {base_time:.3f}s")
+    print(f"With unrolling:    {unrolled_time:.3f}s ({base_time / unrolled_time:.2f}x)")
+    for line in report:
+        if line.startswith("Loop unrolling"):
+            print(f"  {line}")
+
+if __name__ == "__main__":
+    main()
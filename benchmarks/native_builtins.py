@@ -0,0 +1,66 @@
+"""Benchmark: aggregates written as interpreted loops versus calls to native builtins.
+
+Run from the repository root: python benchmarks/native_builtins.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+
+# Sum, minimum and maximum of 20000 values, repeated 5 times
+SETUP = """
+xs = []
+for i in range(20000):
+    xs.append(i * 7919 % 10007 - 5000)
+"""
+
+LOOP_PROGRAM = SETUP + """
+for r in range(5):
+    total = 0
+    low = xs[0]
+    high = xs[0]
+    for x in xs:
+        total = total + x
+        if x < low:
+            low = x
+        if x > high:
+            high = x
+    print(total)
+    print(low)
+    print(high)
+"""
+
+BUILTIN_PROGRAM = SETUP + """
+for r in range(5):
+    print(sum(xs))
+    print(min(xs))
+    print(max(xs))
+"""
+
+def run(program, repeat=3):
+    """Execute a program and return (best seconds, output)."""
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            Interpreter().execute(program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue()
+
+def main():
+    loop_time, loop_output = run(LOOP_PROGRAM)
+    builtin_time, builtin_output = run(BUILTIN_PROGRAM)
+    if loop_output != builtin_output:
+        raise SystemExit("Output mismatch between loop and builtin programs")
+    print(f"Interpreted loops:  {loop_time:.3f}s")
+    print(f"Native builtins:    {builtin_time:.3f}s ({loop_time / builtin_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
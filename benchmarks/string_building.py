@@ -0,0 +1,50 @@
+"""Benchmark: building a 1 MB string with `s = s + ...` with and without the string builder.
+
+Run from the repository root: python benchmarks/string_building.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+
+CHUNK = "0123456789abcdef0123456789abcdef"
+PROGRAM = f"""
+s = ""
+i = 0
+while i < {(1 << 20) // len(CHUNK)}:
+    s = s + "{CHUNK}"
+    i = i + 1
+print(len(s))
+"""
+
+class PlainConcatInterpreter(Interpreter):
+    """Copies the whole string on every append, as before the string builder."""
+    def concat_in_place(self, name, current, right):
+        value = self.binary_operation('+', current, right)
+        self.environment[name] = value
+        return value
+
+def run(interpreter_class):
+    """Execute PROGRAM and return (seconds, output)."""
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter_class().execute(PROGRAM)
+    return time.perf_counter() - start, output.getvalue()
+
+def main():
+    plain_time, plain_output = run(PlainConcatInterpreter)
+    builder_time, builder_output = run(Interpreter)
+    if plain_output != builder_output:
+        raise SystemExit("Output mismatch between plain and builder runs")
+    print(f"String length:    {builder_output.strip()} characters")
+    print(f"Copy per append:  {plain_time:.3f}s")
+    print(f"String builder:   {builder_time:.3f}s ({plain_time / builder_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
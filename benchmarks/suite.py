@@ -0,0 +1,165 @@
+"""Benchmark suite: lexer, parser, compiler phase and interpreter speed on a corpus of programs.
+
+Run from the repository root: python benchmarks/suite.py
+
+The corpus is benchmarks/corpus/*.py plus one large program from program_generator. For each
+program the suite measures tokens/s for the lexer, AST nodes/s for the parser, the time of each
+later compiler phase and statements/s for the interpreter. --save-baseline stores the results
+in the baseline file (benchmarks/baseline.json unless --baseline says otherwise); later runs
+compare against it and exit with status 1 when a metric is worse by more than --threshold.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+
+from lexer import tokenize
+from compiler_phases import parse_program, semantic_analysis, generate_icg, optimize_code_icg, generate_code
+from interpreter import Interpreter
+from myparser import parser
+from optimizer import count_nodes
+from program_generator import generate_program
+
+CORPUS = os.path.join(BENCHMARKS, "corpus")
+DEFAULT_BASELINE = os.path.join(BENCHMARKS, "baseline.json")
+
+def corpus():
+    """(name, source) of each corpus program, then of the generated large source."""
+    programs = []
+    for filename in sorted(os.listdir(CORPUS)):
+        if filename.endswith(".py"):
+            with open(os.path.join(CORPUS, filename), encoding="utf-8") as f:
+                programs.append((filename[:-3], f.read()))
+    programs.append(("generated_large", generate_program(seed=0, statements=40, functions=8)))
+    return programs
+
+def timed(function, args, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function(*args)
+    return time.perf_counter() - start
+
+def best_time(function, *args, repeat, minimum=0.05):
+    """Best time per call of function(*args), with its printed output discarded.
+
+    Each of the repeat timings makes enough calls to last at least minimum seconds, so that phases
+    taking microseconds are timed as reliably as whole program runs. As with timeit, the garbage
+    collector is paused while timing, so that collections of earlier garbage do not land in a
+    random measurement.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            calls = 1
+            while True:
+                elapsed = timed(function, args, calls)
+                if elapsed >= minimum:
+                    break
+                calls *= 2
+            best = elapsed
+            for _ in range(repeat - 1):
+                best = min(best, timed(function, args, calls))
+    finally:
+        gc.enable()
+    return best / calls
+
+def interpret(statements):
+    Interpreter().interpret(statements)
+
+def measure(source, repeat):
+    """Metrics of one program: *_per_second throughputs (higher is better) and *_seconds phase
+    times (lower is better)."""
+    ast = parse_program(source)
+    icg = generate_icg(ast)
+    optimized = optimize_code_icg(icg)
+    metrics = {
+        "tokens_per_second": len(tokenize(source)) / best_time(tokenize, source, repeat=repeat),
+        "nodes_per_second": count_nodes(ast) / best_time(parse_program, source, repeat=repeat),
+    }
+    for phase, argument in ((semantic_analysis, ast), (generate_icg, ast),
+                            (optimize_code_icg, icg), (generate_code, optimized)):
+        metrics[f"{phase.__name__}_seconds"] = best_time(phase, argument, repeat=repeat)
+    # The profiler counts the statements the program executes; the timing is of a plain run of
+    # the parsed program, leaving out the parser
+    profiled = Interpreter(profile=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiled.execute(source)
+    statements = sum(calls for calls, _, _ in profiled.profiler.lines.stats.values())
+    metrics["statements_per_second"] = statements / best_time(interpret, parser.parse(source), repeat=repeat)
+    return metrics
+
+def regressions(results, baseline, threshold):
+    """(program, metric, baseline value, value) for each metric worse than its baseline by more
+    than the threshold fraction."""
+    found = []
+    for program, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(program, {}).get(metric)
+            if old is None:
+                continue
+            if metric.endswith("_per_second"):
+                worse = value < old * (1 - threshold)
+            else:
+                worse = value > old * (1 + threshold)
+            if worse:
+                found.append((program, metric, old, value))
+    return found
+
+def format_metric(metric, value):
+    if metric.endswith("_per_second"):
+        return f"{value:,.0f}/s"
+    return f"{value * 1000:.3f}ms"
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    arguments.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare with or save")
+    arguments.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    arguments.add_argument("--threshold", type=float, default=0.2,
+                           help="fraction by which a metric may be worse than the baseline (default 0.2)")
+    arguments.add_argument("--repeat", type=int, default=5, help="timings per measurement, best kept")
+    arguments.add_argument("programs", nargs="*", help="corpus programs to run (default: all)")
+    options = arguments.parse_args()
+
+    baseline = {}
+    if os.path.exists(options.baseline) and not options.save_baseline:
+        with open(options.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    for name, source in corpus():
+        if options.programs and name not in options.programs:
+            continue
+        results[name] = measure(source, options.repeat)
+        print(f"{name}:")
+        for metric, value in results[name].items():
+            line = f"  {metric}: {format_metric(metric, value)}"
+            old = baseline.get(name, {}).get(metric)
+            if old is not None:
+                line += f" (baseline {format_metric(metric, old)}, {(value / old - 1) * 100:+.1f}%)"
+            print(line)
+
+    if options.save_baseline:
+        with open(options.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {options.baseline}")
+        return
+    if not baseline:
+        print("No baseline to compare with; run with --save-baseline to store one.")
+        return
+    found = regressions(results, baseline, options.threshold)
+    for program, metric, old, value in found:
+        print(f"REGRESSION {program} {metric}: {format_metric(metric, old)} -> {format_metric(metric, value)}")
+    if found:
+        raise SystemExit(f"{len(found)} metric(s) regressed by more than {options.threshold:.0%}")
+    print(f"No metric regressed by more than {options.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark: interpreter time with and without superinstructions, and which fused forms ran.
+
+Run from the repository root: python benchmarks/superinstruction_dispatch.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+from myparser import parser
+from superinstructions import format_superinstruction_report, fuse_superinstructions
+
+PROGRAM = """
+i = 0
+n = 100000
+evens = 0
+odds = 0
+while i < n:
+    if i < 50000:
+        evens = evens + 2
+    else:
+        odds = odds - 1
+    i = i + 1
+print(evens)
+print(odds)
+"""
+
+def run(fuse, repeat=3):
+    """Interpret PROGRAM and return (best seconds, output, statements of the last run)."""
+    best = None
+    for _ in range(repeat):
+        statements = parser.parse(PROGRAM)
+        if fuse:
+            statements, _ = fuse_superinstructions(statements)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            Interpreter().interpret(statements)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue(), statements
+
+def main():
+    plain_time, plain_output, _ = run(False)
+    fused_time, fused_output, statements = run(True)
+    if plain_output != fused_output:
+        raise SystemExit("Output mismatch between plain and fused programs")
+    print(f"Plain nodes:       {plain_time:.3f}s")
+    print(f"Superinstructions: {fused_time:.3f}s ({plain_time / fused_time:.2f}x)")
+    print(format_superinstruction_report(statements))
+
+if __name__ == "__main__":
+    main()
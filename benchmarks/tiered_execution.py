@@ -0,0 +1,56 @@
+"""Benchmark: tree-walking interpreter vs tiered execution at several tier-up thresholds.
+
+Run from the repository root: python benchmarks/tiered_execution.py [threshold ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from closure_compiler import format_tier_report
+from interpreter import Interpreter
+
+PROGRAM = """
+i = 0
+total = 0
+while i < 100000:
+    if i % 3 == 0:
+        total = total + i
+    else:
+        total = total - 1
+    i = i + 1
+print(total)
+words = ""
+for row in range(200):
+    for col in range(50):
+        if col == row:
+            break
+        words = words + "x"
+print(len(words))
+"""
+
+def run(tier_threshold):
+    """Execute PROGRAM and return (seconds, output, interpreter)."""
+    interpreter = Interpreter(tier_threshold=tier_threshold)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.execute(PROGRAM)
+    return time.perf_counter() - start, output.getvalue(), interpreter
+
+def main():
+    thresholds = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 10000]
+    base_time, base_output, _ = run(None)
+    print(f"Tree walker only:  {base_time:.3f}s")
+    for threshold in thresholds:
+        elapsed, output, interpreter = run(threshold)
+        if output != base_output:
+            raise SystemExit(f"Output mismatch with tier threshold {threshold}")
+        print(f"Threshold {threshold:>6}: {elapsed:.3f}s ({base_time / elapsed:.2f}x)")
+    print(format_tier_report(interpreter))
+
+if __name__ == "__main__":
+    main()
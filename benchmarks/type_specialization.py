@@ -0,0 +1,60 @@
+"""Benchmark: interpreter time for arithmetic with and without type-specialized nodes.
+
+Run from the repository root: python benchmarks/type_specialization.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+from myparser import parser
+from type_inference import specialize_types
+
+PROGRAM = """
+i = 0
+total = 0
+evens = 0
+while i < 100000:
+    total = total + i * 2 - 1
+    if i % 2 == 0:
+        evens = evens + 1
+    i = i + 1
+print(total)
+print(evens)
+ratio = total / 7
+print(ratio)
+"""
+
+def run(specialize, repeat=3):
+    """Interpret PROGRAM and return (best seconds, output, deoptimizations)."""
+    best = None
+    for _ in range(repeat):
+        statements = parser.parse(PROGRAM)
+        if specialize:
+            statements, _ = specialize_types(statements)
+        interpreter = Interpreter()
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            interpreter.interpret(statements)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue(), interpreter.deoptimizations
+
+def main():
+    generic_time, generic_output, _ = run(False)
+    typed_time, typed_output, deoptimizations = run(True)
+    if generic_output != typed_output:
+        raise SystemExit("Output mismatch between generic and specialized runs")
+    _, scopes = specialize_types(parser.parse(PROGRAM))
+    print(f"Inferred types:    {scopes['<module>']}")
+    print(f"Generic nodes:     {generic_time:.3f}s")
+    print(f"Specialized nodes: {typed_time:.3f}s ({generic_time / typed_time:.2f}x)")
+    print(f"Deoptimizations:   {deoptimizations}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: a million-element int list stored as a Python list versus a typed array.
+
+Run from the repository root: python benchmarks/typed_lists.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+
+# Fill a million-element list with distinct ints, sum it, then read every 100th element in a loop
+PROGRAM = """
+n = 1000000
+xs = [0] * n
+for i in range(n):
+    xs[i] = i * 1000 + 7
+print(sum(xs))
+total = 0
+j = 0
+while j < n:
+    total = total + xs[j]
+    j = j + 100
+print(total)
+"""
+
+class PlainListInterpreter(Interpreter):
+    """Interpreter whose list literals are always Python lists, as before typed arrays."""
+    def evaluate_ListNode(self, node):
+        return [self.evaluate(elem) for elem in node.elements]
+
+def run(interpreter_class, repeat=3):
+    """Execute PROGRAM and return (best seconds, output)."""
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            interpreter_class().execute(PROGRAM, vectorize=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue()
+
+def list_memory(interpreter_class):
+    """Bytes still allocated for the program's variables once it has run, and the peak."""
+    interpreter = interpreter_class()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.execute(PROGRAM, vectorize=True)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+def main():
+    plain_time, plain_output = run(PlainListInterpreter)
+    typed_time, typed_output = run(Interpreter)
+    if plain_output != typed_output:
+        raise SystemExit("Output mismatch between Python lists and typed arrays")
+    plain_current, plain_peak = list_memory(PlainListInterpreter)
+    typed_current, typed_peak = list_memory(Interpreter)
+    print(f"Python list:  {plain_time:.3f}s, {plain_current / 1e6:.1f} MB retained, "
+          f"{plain_peak / 1e6:.1f} MB peak")
+    print(f"Typed array:  {typed_time:.3f}s ({plain_time / typed_time:.2f}x), "
+          f"{typed_current / 1e6:.1f} MB retained ({plain_current / typed_current:.2f}x less), "
+          f"{typed_peak / 1e6:.1f} MB peak")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: element-wise list loops and reductions, element by element versus vectorized.
+
+Run from the repository root: python benchmarks/vectorized_loops.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Interpreter
+import vectorizer
+
+# Lists are built once; the map and reduction loops then run 5 times over 20000 elements
+PROGRAM = """
+n = 20000
+a = []
+b = []
+c = []
+for i in range(n):
+    a.append(i * 37 % 1000 - 500)
+    b.append(i % 13)
+    c.append(0)
+for r in range(5):
+    for i in range(len(a)):
+        c[i] = a[i] * b[i] + r
+    total = 0
+    for x in c:
+        total = total + x
+    low = c[0]
+    for x in c:
+        if x < low:
+            low = x
+    dot = 0
+    for i in range(n):
+        dot = dot + a[i] * c[i]
+    print(total)
+    print(low)
+    print(dot)
+"""
+
+def run(vectorize, repeat=3):
+    """Execute PROGRAM and return (best seconds, output)."""
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            Interpreter().execute(PROGRAM, vectorize=vectorize)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, output.getvalue()
+
+def main():
+    loop_time, loop_output = run(vectorize=False)
+    numpy_module = vectorizer.numpy
+    vectorizer.numpy = None
+    python_time, python_output = run(vectorize=True)
+    vectorizer.numpy = numpy_module
+    if loop_output != python_output:
+        raise SystemExit("Output mismatch between element loops and Python columns")
+    print(f"Element by element:  {loop_time:.3f}s")
+    print(f"Python columns:      {python_time:.3f}s ({loop_time / python_time:.2f}x)")
+    if numpy_module is None:
+        print("NumPy columns:       skipped (NumPy is not installed)")
+        return
+    numpy_time, numpy_output = run(vectorize=True)
+    if loop_output != numpy_output:
+        raise SystemExit("Output mismatch between element loops and NumPy columns")
+    print(f"NumPy columns:       {numpy_time:.3f}s ({loop_time / numpy_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Builtin functions implemented directly on Python values.
+
+A call to a name in BUILTINS parses as a BuiltinCall and runs the registered Python function
+on the evaluated arguments, without a FunctionDef, a new environment or a call-site lookup.
+A user function with the same name still takes precedence, as it does in Python.
+print, len and range have their own grammar rules and nodes and are not in the registry.
+"""
+from typed_list import ListView, TypedList, make_list, storage, type_name
+
+# Values the builtins accept as an iterable argument
+ITERABLE_ARGUMENT_TYPES = (range, list, TypedList, ListView, tuple, dict, set, str)
+
+# Builtin name -> (function, minimum argument count, maximum argument count or None)
+BUILTINS = {}
+
+def builtin(name, min_args, max_args):
+    """Register the decorated function as the builtin `name`."""
+    def register(function):
+        BUILTINS[name] = (function, min_args, max_args)
+        return function
+    return register
+
+def call_builtin(name, args):
+    """Check the argument count of a call to builtin `name` and run it."""
+    function, min_args, max_args = BUILTINS[name]
+    if len(args) < min_args or (max_args is not None and len(args) > max_args):
+        if max_args == min_args:
+            expected = min_args
+        elif max_args is None:
+            expected = f"at least {min_args}"
+        else:
+            expected = f"{min_args} to {max_args}"
+        raise Exception(f"{name}() takes {expected} arguments but {len(args)} were given")
+    return function(*args)
+
+def iterable_argument(name, value):
+    if not isinstance(value, ITERABLE_ARGUMENT_TYPES):
+        raise Exception(f"{name}() argument must be iterable, not {type(value).__name__}")
+    # Builtins run directly on a TypedList's array
+    return storage(value) if type(value) in (TypedList, ListView) else value
+
+def extremum(name, function, args):
+    values = iterable_argument(name, args[0]) if len(args) == 1 else args
+    if not values:
+        raise Exception(f"{name}() arg is an empty sequence")
+    return function(values)
+
+@builtin('sum', 1, 2)
+def builtin_sum(values, start=0):
+    return sum(iterable_argument('sum', values), start)
+
+@builtin('min', 1, None)
+def builtin_min(*args):
+    return extremum('min', min, args)
+
+@builtin('max', 1, None)
+def builtin_max(*args):
+    return extremum('max', max, args)
+
+@builtin('abs', 1, 1)
+def builtin_abs(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise Exception(f"Bad operand type for abs(): {type_name(value)}")
+    return abs(value)
+
+@builtin('sorted', 1, 1)
+def builtin_sorted(values):
+    return make_list(sorted(iterable_argument('sorted', values)))
+
+@builtin('reversed', 1, 1)
+def builtin_reversed(values):
+    # The language has no iterator objects, so reversed() returns a list
+    if isinstance(values, (dict, set)):
+        raise Exception(f"{type(values).__name__} object is not reversible")
+    return make_list(list(reversed(iterable_argument('reversed', values))))
+
+@builtin('enumerate', 1, 2)
+def builtin_enumerate(values, start=0):
+    return list(enumerate(iterable_argument('enumerate', values), start))
+
+@builtin('zip', 1, None)
+def builtin_zip(*args):
+    return list(zip(*[iterable_argument('zip', values) for values in args]))
+
+@builtin('str', 1, 1)
+def builtin_str(value):
+    return str(value)
+
+@builtin('int', 1, 1)
+def builtin_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise Exception(f"Invalid literal for int(): {value!r}")
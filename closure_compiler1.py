@@ -0,0 +1,436 @@
+import time
+
+from ast_nodes import *
+from builtin_functions import call_builtin
+from interpreter import ITERABLE_TYPES, SIZED_TYPES, StringBuilder, load_index, load_slice, make_set, store_index
+from optimizer import describe
+from type_inference import PYTHON_OPERATORS
+from typed_list import make_list
+from vectorizer import run_vectorized
+
+# Signals returned by compiled statements; None means "continue with the next statement"
+BREAK = 'break'
+CONTINUE = 'continue'
+RETURN = 'return'
+
+class RegionProfile:
+    """Execution counts, tier and time spent for one function body or loop.
+
+    count is the number of calls (functions) or iterations (loops) run by the tree walker.
+    Times are inclusive: a loop's time includes the loops and calls nested in it.
+    """
+    def __init__(self, node):
+        self.node = node
+        self.name = region_name(node)
+        self.count = 0
+        self.code = None
+        self.resume = None
+        self.compile_time = 0.0
+        self.interpreted_time = 0.0
+        self.compiled_time = 0.0
+
+def region_name(node):
+    """Readable name of a tiering region for reports."""
+    if isinstance(node, FunctionDef):
+        return f"function {node.name}"
+    if isinstance(node, WhileLoop):
+        return f"while {describe(node.condition)}"
+    if isinstance(node, ForLoop):
+        return f"for {node.var.name} in {describe(node.iterable)}"
+    return node.__class__.__name__
+
+class ClosureCompiler:
+    """Compile AST regions into nested Python closures that run against an Interpreter.
+
+    Expressions compile to functions of the current environment dict returning a value;
+    statements compile to functions returning None or a BREAK/CONTINUE/RETURN signal. The
+    closures raise the same errors as the tree walker. Node types without a compile method
+    are handed back to Interpreter.evaluate, so new nodes work before they get one.
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.in_loop = False
+
+    def compile_region(self, node):
+        """Compile a function body or loop; returns (code, resume).
+
+        code runs the whole region. For for-loops, resume(env, iterator) continues a loop the
+        tree walker already started; for while-loops resume is code.
+        """
+        if isinstance(node, FunctionDef):
+            self.in_loop = False
+            return self.block(node.body), None
+        self.in_loop = True
+        if isinstance(node, ForLoop):
+            return self.statement_ForLoop(node), self.for_loop_body(node)
+        code = self.statement(node)
+        return code, code
+
+    # ---------- Expressions ----------
+
+    def expression(self, node):
+        method = getattr(self, f'expression_{node.__class__.__name__}', None)
+        if method is not None:
+            return method(node)
+        interpreter = self.interpreter
+        return lambda env: interpreter.evaluate(node)
+
+    def expression_Number(self, node):
+        value = node.value
+        return lambda env: value
+
+    expression_String = expression_Number
+    expression_Boolean = expression_Number
+
+    def expression_Identifier(self, node):
+        name = node.name
+        functions = self.interpreter.functions
+
+        def load(env):
+            try:
+                value = env[name]
+            except KeyError:
+                if name in functions:
+                    return functions[name]
+                raise Exception(f"Undefined variable or function: {name}")
+            return value.value() if type(value) is StringBuilder else value
+        return load
+
+    def expression_BinaryOp(self, node):
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        if node.op == 'and':
+            return lambda env: left(env) and right(env)
+        if node.op == 'or':
+            return lambda env: left(env) or right(env)
+        operation = PYTHON_OPERATORS.get(node.op)
+        if operation is None:
+            op = node.op
+
+            def unknown(env):
+                raise Exception(f"Unknown operator: {op}")
+            return unknown
+        return lambda env: operation(left(env), right(env))
+
+    def expression_TypedBinaryOp(self, node):
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        left_type, right_type, operation = node.left_type, node.right_type, node.operation
+        interpreter = self.interpreter
+
+        def typed(env):
+            a = left(env)
+            b = right(env)
+            if type(a) is left_type and type(b) is right_type:
+                return operation(a, b)
+            if node.__class__ is not BinaryOp:
+                node.__class__ = BinaryOp
+                interpreter.deoptimizations += 1
+            return interpreter.binary_operation(node.op, a, b)
+        return typed
+
+    # Fused nodes keep the fields of the nodes they replace
+    expression_FusedCompare = expression_BinaryOp
+
+    def expression_UnaryOp(self, node):
+        expr = self.expression(node.expr)
+        if node.op == '-':
+            return lambda env: -expr(env)
+        if node.op == 'not':
+            return lambda env: not expr(env)
+        op = node.op
+
+        def unknown(env):
+            raise Exception(f"Unknown unary operator: {op}")
+        return unknown
+
+    def expression_FunctionCall(self, node):
+        args = [self.expression(arg) for arg in node.args]
+        interpreter = self.interpreter
+
+        def call(env):
+            func = interpreter.lookup_function(node).func
+            return interpreter.call_function(func, [arg(env) for arg in args])
+        return call
+
+    def expression_BuiltinCall(self, node):
+        args = [self.expression(arg) for arg in node.args]
+        user_call = self.expression_FunctionCall(node)
+        functions = self.interpreter.functions
+        name = node.name.name
+
+        def call(env):
+            if name in functions:
+                return user_call(env)
+            return call_builtin(name, [arg(env) for arg in args])
+        return call
+
+    def expression_ListNode(self, node):
+        elements = [self.expression(element) for element in node.elements]
+        return lambda env: make_list([element(env) for element in elements])
+
+    def expression_DictNode(self, node):
+        items = [(self.expression(key), self.expression(value)) for key, value in zip(node.keys, node.values)]
+
+        def build(env):
+            result = {}
+            for key, value in items:
+                store_index(result, key(env), value(env))
+            return result
+        return build
+
+    def expression_SetNode(self, node):
+        elements = [self.expression(element) for element in node.elements]
+        return lambda env: make_set([element(env) for element in elements])
+
+    def expression_IndexNode(self, node):
+        expr = self.expression(node.expr)
+        index = self.expression(node.index)
+        return lambda env: load_index(expr(env), index(env))
+
+    def expression_SliceNode(self, node):
+        expr = self.expression(node.expr)
+        bounds = [(lambda env: None) if part is None else self.expression(part)
+                  for part in (node.start, node.stop, node.step)]
+        return lambda env: load_slice(expr(env), *[bound(env) for bound in bounds])
+
+    def expression_LenFunction(self, node):
+        expr = self.expression(node.expr)
+
+        def length(env):
+            value = expr(env)
+            if not isinstance(value, SIZED_TYPES):
+                raise Exception(f"Cannot get length of {type(value)}")
+            return len(value)
+        return length
+
+    def expression_StringMethod(self, node):
+        interpreter = self.interpreter
+        return lambda env: interpreter.evaluate_StringMethod(node)
+
+    def expression_RangeCall(self, node):
+        start = self.expression(node.start) if node.start is not None else (lambda env: 0)
+        stop = self.expression(node.stop) if node.stop is not None else (lambda env: None)
+        step = self.expression(node.step) if node.step is not None else (lambda env: 1)
+
+        def make_range(env):
+            values = (start(env), stop(env), step(env))
+            if not all(isinstance(x, int) for x in values if x is not None):
+                raise Exception("Range arguments must be integers")
+            return range(*values)
+        return make_range
+
+    # ---------- Statements ----------
+
+    def statement(self, node):
+        name = node.__class__.__name__
+        method = getattr(self, f'statement_{name}', None)
+        if method is not None:
+            return method(node)
+        if hasattr(self, f'expression_{name}'):
+            expr = self.expression(node)
+
+            def run(env):
+                expr(env)
+            return run
+        return self.fallback_statement(node)
+
+    def fallback_statement(self, node):
+        """Run a statement in the tree walker, turning its control-flow flags into signals."""
+        interpreter = self.interpreter
+
+        def run(env):
+            interpreter.evaluate(node)
+            if interpreter.returning:
+                interpreter.returning = False
+                return RETURN
+            if interpreter.break_loop:
+                interpreter.break_loop = False
+                return BREAK
+            if interpreter.continue_loop:
+                interpreter.continue_loop = False
+                return CONTINUE
+        return run
+
+    def block(self, statements):
+        compiled = [self.statement(stmt) for stmt in statements]
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run(env):
+            for stmt in compiled:
+                signal = stmt(env)
+                if signal is not None:
+                    return signal
+        return run
+
+    def statement_Assign(self, node):
+        name = node.name.name
+        expr = self.expression(node.expr)
+        if not (isinstance(node.expr, BinaryOp) and node.expr.op == '+' and type(node.expr.left) is Identifier
+                and node.expr.left.name == name):
+            def assign(env):
+                env[name] = expr(env)
+            return assign
+
+        # `name = name + right` appends to a StringBuilder when name holds a string, as in the tree walker
+        right = self.expression(node.expr.right)
+        interpreter = self.interpreter
+
+        def append(env):
+            current = env.get(name)
+            if type(current) is str or type(current) is StringBuilder:
+                interpreter.concat_in_place(name, current, right(env))
+            else:
+                env[name] = expr(env)
+        return append
+
+    statement_IncrementAssign = statement_Assign
+
+    def statement_ListAssign(self, node):
+        value = self.expression(node.value)
+        expr = self.expression(node.expr)
+        index = self.expression(node.index)
+
+        def store(env):
+            item = value(env)
+            store_index(expr(env), index(env), item)
+        return store
+
+    def statement_Print(self, node):
+        expr = self.expression(node.expr)
+
+        def run(env):
+            print(expr(env))
+        return run
+
+    def statement_IfElse(self, node):
+        condition = self.expression(node.condition)
+        if_body = self.block(node.if_body)
+        else_body = self.block(node.else_body) if node.else_body else None
+
+        def run(env):
+            if condition(env):
+                return if_body(env)
+            if else_body is not None:
+                return else_body(env)
+        return run
+
+    statement_CompareBranch = statement_IfElse
+
+    def loop_body(self, statements):
+        outer_in_loop = self.in_loop
+        self.in_loop = True
+        body = self.block(statements)
+        self.in_loop = outer_in_loop
+        return body
+
+    def statement_WhileLoop(self, node):
+        condition = self.expression(node.condition)
+        body = self.loop_body(node.body)
+
+        def run(env):
+            while condition(env):
+                signal = body(env)
+                if signal is BREAK:
+                    break
+                if signal is RETURN:
+                    return RETURN
+        return run
+
+    statement_CompareWhileLoop = statement_WhileLoop
+
+    def for_loop_body(self, node):
+        """Closure running a for loop over an iterator that has already been created."""
+        var = node.var.name
+        body = self.loop_body(node.body)
+
+        def run(env, iterator):
+            for item in iterator:
+                env[var] = item
+                signal = body(env)
+                if signal is BREAK:
+                    break
+                if signal is RETURN:
+                    return RETURN
+        return run
+
+    def statement_ForLoop(self, node):
+        iterable = self.expression(node.iterable)
+        loop = self.for_loop_body(node)
+
+        def run(env):
+            items = iterable(env)
+            if not isinstance(items, ITERABLE_TYPES):
+                raise Exception(f"Cannot iterate over {type(items)}")
+            return loop(env, iter(items))
+        return run
+
+    def statement_VectorizedLoop(self, node):
+        loop = self.statement_ForLoop(node)
+
+        def run(env):
+            if run_vectorized(node, env):
+                return None
+            return loop(env)
+        return run
+
+    def statement_FunctionDef(self, node):
+        interpreter = self.interpreter
+
+        def define(env):
+            interpreter.define_function(node)
+        return define
+
+    def statement_Return(self, node):
+        expr = self.expression(node.expr) if node.expr is not None else (lambda env: None)
+        interpreter = self.interpreter
+
+        def run(env):
+            interpreter.return_value = expr(env)
+            return RETURN
+        return run
+
+    def statement_Break(self, node):
+        if self.in_loop:
+            return lambda env: BREAK
+        return self.outside_loop("Break")
+
+    def statement_Continue(self, node):
+        if self.in_loop:
+            return lambda env: CONTINUE
+        return self.outside_loop("Continue")
+
+    def outside_loop(self, keyword):
+        def run(env):
+            raise Exception(f"{keyword} statement outside loop")
+        return run
+
+    def statement_TryExcept(self, node):
+        try_body = self.block(node.try_body)
+        except_body = self.block(node.except_body)
+
+        def run(env):
+            try:
+                return try_body(env)
+            except Exception:
+                return except_body(env)
+        return run
+
+def compile_region(interpreter, region):
+    """Compile a RegionProfile's node, recording the compile time."""
+    start = time.perf_counter()
+    region.code, region.resume = ClosureCompiler(interpreter).compile_region(region.node)
+    region.compile_time = time.perf_counter() - start
+
+def format_tier_report(interpreter):
+    """Text report of tier-up events and per-region time for an Interpreter run with tiering."""
+    lines = [f"Tiered execution (threshold {interpreter.tier_threshold}):"]
+    for event in interpreter.tier_events:
+        lines.append(f"  tier-up: {event['region']} after {event['executions']} executions"
+                     f" (compiled in {event['compile_time'] * 1000:.2f} ms)")
+    for region in interpreter.regions.values():
+        tier = "compiled" if region.code is not None else "interpreted"
+        lines.append(f"  {region.name}: {tier}, {region.count} interpreted executions,"
+                     f" {region.interpreted_time:.4f}s interpreted, {region.compiled_time:.4f}s compiled")
+    return "\n".join(lines)
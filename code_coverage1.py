@@ -0,0 +1,192 @@
+import json
+
+from ast_nodes import IfElse, WhileLoop
+
+class BranchProbe:
+    """Stand-in for the condition of an if or while during a covered run: evaluates the condition
+    and counts how often it came out true and false."""
+    __slots__ = ('condition', 'outcomes')
+
+    def __init__(self, condition):
+        self.condition = condition
+        # [times true, times false]
+        self.outcomes = [0, 0]
+
+class Coverage:
+    """Line and branch coverage of Interpreter runs, added up over any number of runs.
+
+    Before a run every statement is given a slot in a list of counters, and the interpreter's
+    execute_block and interpret methods are replaced on that instance by copies that add one to
+    the slot of each statement they run; the condition of each if and while is swapped for a
+    BranchProbe with its own pair of counters. Expressions run exactly as without coverage, so
+    the cost is one list increment per statement and one call per condition; an interpreter
+    created without coverage=True pays nothing. After the run the counters are added to the totals
+    per source line. Tiered execution is paused during a covered run, and vectorized loops
+    (vectorize=True) run element by element, so that no statement runs inside a compiled region
+    or a whole-list operation unseen. Conditions fused into superinstructions (fuse=True) are not
+    probed, and their lines are counted but not their branches.
+    """
+    def __init__(self):
+        # line -> times a statement on it ran, for every line with a statement
+        self.lines = {}
+        # line of an if or while -> [times its condition was true, times false]
+        self.branches = {}
+        self.run_state = None
+
+    def start(self, interpreter, statements):
+        """Prepare statements and interpreter for a covered run."""
+        # Slot 0 is shared by anything without a line, whose count is thrown away
+        hits = [0]
+        slotted, lines, probes = [], [0], []
+
+        def visit_block(block):
+            for item in block:
+                if not hasattr(item, '__dict__'):
+                    continue
+                line = getattr(item, 'lineno', 0)
+                if line:
+                    item.coverage_slot = len(hits)
+                    hits.append(0)
+                    lines.append(line)
+                else:
+                    item.coverage_slot = 0
+                slotted.append(item)
+                visit(item)
+
+        def visit(node):
+            for value in vars(node).values():
+                if type(value) is list:
+                    visit_block(value)
+                elif hasattr(value, '__dict__'):
+                    visit(value)
+            if type(node) in (IfElse, WhileLoop) and getattr(node, 'lineno', 0):
+                probe = BranchProbe(node.condition)
+                probes.append((node, probe))
+                node.condition = probe
+
+        visit_block(statements)
+
+        def covered_block(statements):
+            result = None
+            for statement in statements:
+                hits[statement.coverage_slot] += 1
+                result = interpreter.evaluate(statement)
+                if interpreter.returning or interpreter.break_loop or interpreter.continue_loop:
+                    break
+            return result
+
+        def covered_interpret(statements):
+            result = None
+            for statement in statements:
+                hits[statement.coverage_slot] += 1
+                result = interpreter.evaluate(statement)
+                if interpreter.returning:
+                    return interpreter.return_value
+            return interpreter.finish(result)
+
+        def evaluate_probe(probe):
+            value = interpreter.evaluate(probe.condition)
+            probe.outcomes[0 if value else 1] += 1
+            return value
+
+        interpreter.execute_block = covered_block
+        interpreter.interpret = covered_interpret
+        interpreter.evaluate_BranchProbe = evaluate_probe
+        interpreter.evaluate_VectorizedLoop = interpreter.evaluate_ForLoop
+        self.run_state = (hits, lines, slotted, probes, interpreter.tier_threshold)
+        interpreter.tier_threshold = None
+
+    def stop(self, interpreter):
+        """Restore the interpreter and the statements, and add the run's counts to the totals."""
+        hits, lines, slotted, probes, tier_threshold = self.run_state
+        self.run_state = None
+        interpreter.tier_threshold = tier_threshold
+        del interpreter.execute_block
+        del interpreter.interpret
+        del interpreter.evaluate_BranchProbe
+        del interpreter.evaluate_VectorizedLoop
+        for node in slotted:
+            node.__dict__.pop('coverage_slot', None)
+        for slot in range(1, len(hits)):
+            self.lines[lines[slot]] = self.lines.get(lines[slot], 0) + hits[slot]
+        for node, probe in probes:
+            node.condition = probe.condition
+            outcomes = self.branches.setdefault(node.lineno, [0, 0])
+            outcomes[0] += probe.outcomes[0]
+            outcomes[1] += probe.outcomes[1]
+
+    def merge(self, other):
+        """Add the counts of another Coverage of the same program to this one."""
+        for line, hits in other.lines.items():
+            self.lines[line] = self.lines.get(line, 0) + hits
+        for line, (taken, not_taken) in other.branches.items():
+            outcomes = self.branches.setdefault(line, [0, 0])
+            outcomes[0] += taken
+            outcomes[1] += not_taken
+        return self
+
+    def line_totals(self):
+        """(lines run at least once, lines with a statement)."""
+        return sum(1 for hits in self.lines.values() if hits), len(self.lines)
+
+    def branch_totals(self):
+        """(condition outcomes seen at least once, possible outcomes), two per if or while."""
+        return sum(1 for outcomes in self.branches.values() for count in outcomes if count), 2 * len(self.branches)
+
+    def to_dict(self):
+        return {
+            'lines': {str(line): hits for line, hits in sorted(self.lines.items())},
+            'branches': {str(line): outcomes for line, outcomes in sorted(self.branches.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        coverage = cls()
+        coverage.lines = {int(line): hits for line, hits in data['lines'].items()}
+        coverage.branches = {int(line): list(outcomes) for line, outcomes in data['branches'].items()}
+        return coverage
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+def merge_coverage(coverages):
+    """One Coverage adding up the counts of several runs of the same program."""
+    total = Coverage()
+    for coverage in coverages:
+        total.merge(coverage)
+    return total
+
+def percent(covered, total):
+    return f"{covered * 100 / total:.1f}%" if total else "n/a"
+
+def format_coverage_report(coverage, source):
+    """The program's source annotated with how often each line ran and how its conditions went.
+
+    Each line is prefixed by its run count, ##### for a line with a statement that never ran, or
+    nothing for lines without a statement; an if or while line is followed by the times its
+    condition was true and false, with a ! when one of the two never happened.
+    """
+    covered_lines, total_lines = coverage.line_totals()
+    covered_branches, total_branches = coverage.branch_totals()
+    lines = [f"Coverage: {covered_lines}/{total_lines} lines ({percent(covered_lines, total_lines)}), "
+             f"{covered_branches}/{total_branches} branch outcomes ({percent(covered_branches, total_branches)})"]
+    source_lines = source.split('\n')
+    if source_lines and not source_lines[-1]:
+        source_lines.pop()
+    width = len(str(len(source_lines)))
+    for number, code in enumerate(source_lines, 1):
+        hits = coverage.lines.get(number)
+        count = "" if hits is None else str(hits) if hits else "#####"
+        text = f"{count:>7} | {number:>{width}} | {code.rstrip()}"
+        if number in coverage.branches:
+            taken, not_taken = coverage.branches[number]
+            partial = " !" if hits and not (taken and not_taken) else ""
+            text += f"    [true {taken}, false {not_taken}{partial}]"
+        lines.append(text)
+    return "\n".join(lines)
@@ -0,0 +1,1187 @@
+"""The compiler phases shown on the compiler phases screen, from a parsed program to generated code.
+
+Kept apart from the GUI so that they can be run and measured without a display.
+"""
+import re
+from myparser import parser
+from ast_nodes import *
+from icg_executor import (BINARY_EXPR, BINARY_OPERATORS, METHOD_EXPR, UNARY_EXPR, UNARY_OPERATORS,
+                          extract_icg_lines, parse_operand)
+
+# --- Helper to ensure all phase functions handle both lists and single nodes ---
+def ensure_list(ast):
+    if isinstance(ast, list):
+        return ast
+    elif ast is None:
+        return []
+    else:
+        return [ast]
+
+# Define the original pretty_print_ast function first
+def pretty_print_ast(node, indent="", is_last=True):
+    # Define prefix based on whether it's the last child
+    prefix = "└── " if is_last else "├── "
+    
+    if isinstance(node, list):
+        result = []
+        for i, n in enumerate(node):
+            result.append(pretty_print_ast(n, indent, i == len(node) - 1))
+        return "\n".join(result)
+    elif hasattr(node, "__class__"):
+        cname = node.__class__.__name__
+        
+        if cname == "Assign":
+            return f"{indent}{prefix}Assignment\n{indent}    ├── Variable: {node.name}\n{indent}    └── Value: {pretty_print_ast(node.expr, indent + '    ', True)}"
+        elif cname == "BinaryOp":
+            return f"{indent}{prefix}Binary Operation: {node.op}\n{indent}    ├── Left: {pretty_print_ast(node.left, indent + '    ', False)}\n{indent}    └── Right: {pretty_print_ast(node.right, indent + '    ', True)}"
+        elif cname == "UnaryOp":
+            return f"{indent}{prefix}Unary Operation: {node.op}\n{indent}    └── Expression: {pretty_print_ast(node.expr, indent + '    ', True)}"
+        elif cname == "Number":
+            return f"{indent}{prefix}Number: {node.value}"
+        elif cname == "String":
+            return f"{indent}{prefix}String: '{node.value}'"
+        elif cname == "Boolean":
+            return f"{indent}{prefix}Boolean: {node.value}"
+        elif cname == "Identifier":
+            return f"{indent}{prefix}Identifier: {node.name}"
+        elif cname == "Print":
+            return f"{indent}{prefix}Print Statement\n{indent}    └── Expression: {pretty_print_ast(node.expr, indent + '    ', True)}"
+        elif cname == "IfElse":
+            result = [f"{indent}{prefix}If-Else Statement"]
+            result.append(f"{indent}    ├── Condition: {pretty_print_ast(node.condition, indent + '    ', False)}")
+            result.append(f"{indent}    ├── If Body:")
+            for i, stmt in enumerate(node.if_body):
+                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.if_body) - 1 and not node.else_body))
+            if node.else_body:
+                result.append(f"{indent}    └── Else Body:")
+                for i, stmt in enumerate(node.else_body):
+                    result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.else_body) - 1))
+            return "\n".join(result)
+        elif cname == "WhileLoop":
+            result = [f"{indent}{prefix}While Loop"]
+            result.append(f"{indent}    ├── Condition: {pretty_print_ast(node.condition, indent + '    ', False)}")
+            result.append(f"{indent}    └── Body:")
+            for i, stmt in enumerate(node.body):
+                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.body) - 1))
+            return "\n".join(result)
+        elif cname == "ForLoop":
+            result = [f"{indent}{prefix}For Loop"]
+            result.append(f"{indent}    ├── Variable: {node.var}")
+            result.append(f"{indent}    ├── Iterable: {pretty_print_ast(node.iterable, indent + '    ', False)}")
+            result.append(f"{indent}    └── Body:")
+            for i, stmt in enumerate(node.body):
+                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.body) - 1))
+            return "\n".join(result)
+        elif cname == "FunctionDef":
+            result = [f"{indent}{prefix}Function Definition: {node.name}"]
+            result.append(f"{indent}    ├── Parameters: {', '.join(str(p) for p in node.params)}")
+            result.append(f"{indent}    └── Body:")
+            for i, stmt in enumerate(node.body):
+                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.body) - 1))
+            return "\n".join(result)
+        elif cname in ("FunctionCall", "BuiltinCall"):
+            kind = "Builtin Call" if cname == "BuiltinCall" else "Function Call"
+            result = [f"{indent}{prefix}{kind}: {node.name}"]
+            result.append(f"{indent}    └── Arguments:")
+            for i, arg in enumerate(node.args):
+                result.append(pretty_print_ast(arg, indent + '        ', i == len(node.args) - 1))
+            return "\n".join(result)
+        elif cname == "ListNode":
+            result = [f"{indent}{prefix}List"]
+            for i, elem in enumerate(node.elements):
+                result.append(pretty_print_ast(elem, indent + '    ', i == len(node.elements) - 1))
+            return "\n".join(result)
+        elif cname == "DictNode":
+            result = [f"{indent}{prefix}Dict"]
+            for i, (key, value) in enumerate(zip(node.keys, node.values)):
+                last = i == len(node.keys) - 1
+                result.append(f"{indent}    {'└── ' if last else '├── '}Key: {pretty_print_ast(key, indent + '    ', False)}")
+                result.append(f"{indent}    {'    ' if last else '│   '}Value: {pretty_print_ast(value, indent + '        ', True)}")
+            return "\n".join(result)
+        elif cname == "SetNode":
+            result = [f"{indent}{prefix}Set"]
+            for i, elem in enumerate(node.elements):
+                result.append(pretty_print_ast(elem, indent + '    ', i == len(node.elements) - 1))
+            return "\n".join(result)
+        elif cname == "IndexNode":
+            return f"{indent}{prefix}List Index\n{indent}    ├── List: {pretty_print_ast(node.expr, indent + '    ', False)}\n{indent}    └── Index: {pretty_print_ast(node.index, indent + '    ', True)}"
+        elif cname == "SliceNode":
+            parts = [(label, part) for label, part in (("Start", node.start), ("Stop", node.stop), ("Step", node.step))
+                     if part is not None]
+            result = [f"{indent}{prefix}List Slice",
+                      f"{indent}    {'├──' if parts else '└──'} List: {pretty_print_ast(node.expr, indent + '    ', not parts)}"]
+            for i, (label, part) in enumerate(parts):
+                last = i == len(parts) - 1
+                result.append(f"{indent}    {'└──' if last else '├──'} {label}: {pretty_print_ast(part, indent + '    ', last)}")
+            return "\n".join(result)
+        elif cname == "ListAssign":
+            return f"{indent}{prefix}List Assignment\n{indent}    ├── List: {pretty_print_ast(node.expr, indent + '    ', False)}\n{indent}    ├── Index: {pretty_print_ast(node.index, indent + '    ', False)}\n{indent}    └── Value: {pretty_print_ast(node.value, indent + '    ', True)}"
+        elif cname == "Return":
+            return f"{indent}{prefix}Return Statement\n{indent}    └── Value: {pretty_print_ast(node.expr, indent + '    ', True)}"
+        elif cname == "Break":
+            return f"{indent}{prefix}Break Statement"
+        elif cname == "Continue":
+            return f"{indent}{prefix}Continue Statement"
+        elif cname == "TryExcept":
+            result = [f"{indent}{prefix}Try-Except Block"]
+            result.append(f"{indent}    ├── Try Block:")
+            for i, stmt in enumerate(node.try_block):
+                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.try_block) - 1))
+            result.append(f"{indent}    └── Except Block:")
+            for i, stmt in enumerate(node.except_block):
+                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.except_block) - 1))
+            return "\n".join(result)
+        elif cname == "StringMethod":
+            result = [f"{indent}{prefix}String Method: {node.method}"]
+            result.append(f"{indent}    ├── String: {pretty_print_ast(node.string_obj, indent + '    ', False)}")
+            if hasattr(node, 'args') and node.args:
+                result.append(f"{indent}    └── Arguments:")
+                for i, arg in enumerate(node.args):
+                    result.append(pretty_print_ast(arg, indent + '        ', i == len(node.args) - 1))
+            return "\n".join(result)
+        elif cname == "LenFunction":
+            return f"{indent}{prefix}Length Function\n{indent}    └── Expression: {pretty_print_ast(node.expr, indent + '    ', True)}"
+        elif cname == "RangeCall":
+            result = [f"{indent}{prefix}Range Function"]
+            if node.start:
+                result.append(f"{indent}    ├── Start: {pretty_print_ast(node.start, indent + '    ', False)}")
+            if node.stop:
+                result.append(f"{indent}    ├── Stop: {pretty_print_ast(node.stop, indent + '    ', False)}")
+            if node.step:
+                result.append(f"{indent}    └── Step: {pretty_print_ast(node.step, indent + '    ', True)}")
+            return "\n".join(result)
+        else:
+            return f"{indent}{prefix}Unknown Node: {cname}"
+    else:
+        return f"{indent}{prefix}Unknown: {str(node)}"
+
+# Now patch the functions after they're defined
+old_pretty_print_ast = pretty_print_ast
+def pretty_print_ast(node, indent="", is_last=True):
+    node = ensure_list(node)
+    if isinstance(node, list) and len(node) == 1:
+        return old_pretty_print_ast(node[0], indent, is_last)
+    elif isinstance(node, list):
+        result = []
+        for i, n in enumerate(node):
+            result.append(old_pretty_print_ast(n, indent, i == len(node) - 1))
+        return "\n".join(result)
+    else:
+        return old_pretty_print_ast(node, indent, is_last)
+
+# Define the original semantic_analysis function
+def semantic_analysis(ast):
+    symbol_table = {}
+    errors = []
+    type_info = {}
+    
+    def get_type(value):
+        if isinstance(value, int):
+            return "int"
+        elif isinstance(value, float):
+            return "float"
+        elif isinstance(value, str):
+            return "str"
+        elif isinstance(value, bool):
+            return "bool"
+        elif isinstance(value, list):
+            return "list"
+        elif value is None:
+            return "None"
+        return str(type(value).__name__)
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+            return None
+        elif hasattr(node, "__class__"):
+            cname = node.__class__.__name__
+            
+            if cname == "Assign":
+                value = visit(node.expr)
+                var_name = node.name.name if hasattr(node.name, 'name') else node.name
+                type_info[var_name] = get_type(value)
+                symbol_table[var_name] = value
+                return value
+                
+            elif cname == "Identifier":
+                var_name = node.name
+                if var_name not in symbol_table:
+                    errors.append(f"❌ Undeclared variable: '{var_name}'")
+                    return None
+                return symbol_table[var_name]
+                
+            elif cname == "BinaryOp":
+                left = visit(node.left)
+                right = visit(node.right)
+                left_type = get_type(left)
+                right_type = get_type(right)
+                
+                if left is not None and right is not None:
+                    if node.op in ['+', '-', '*', '/', '%']:
+                        if left_type not in ['int', 'float'] or right_type not in ['int', 'float']:
+                            errors.append(f"❌ Type mismatch in arithmetic operation '{node.op}': {left_type} and {right_type}")
+                    elif node.op in ['<', '>', '<=', '>=', '==', '!=']:
+                        if left_type != right_type:
+                            errors.append(f"❌ Type mismatch in comparison '{node.op}': {left_type} and {right_type}")
+                    elif node.op in ['and', 'or']:
+                        if left_type != 'bool' or right_type != 'bool':
+                            errors.append(f"❌ Type mismatch in logical operation '{node.op}': {left_type} and {right_type}")
+                return None
+                
+            elif cname == "Number":
+                return node.value
+                
+            elif cname == "String":
+                return node.value
+                
+            elif cname == "Boolean":
+                return node.value
+                
+            elif cname == "Print":
+                expr = visit(node.expr)
+                if expr is not None:
+                    type_info['print_expr'] = get_type(expr)
+                return None
+                
+            elif cname == "IfElse":
+                cond = visit(node.condition)
+                if cond is not None and get_type(cond) != 'bool':
+                    errors.append(f"❌ Condition must be a boolean, got {get_type(cond)}")
+                visit(node.if_body)
+                if node.else_body:
+                    visit(node.else_body)
+                return None
+                
+            elif cname == "WhileLoop":
+                cond = visit(node.condition)
+                if cond is not None and get_type(cond) != 'bool':
+                    errors.append(f"❌ While loop condition must be a boolean, got {get_type(cond)}")
+                visit(node.body)
+                return None
+                
+            elif cname == "ForLoop":
+                var_name = node.var.name if hasattr(node.var, 'name') else node.var
+                iterable = visit(node.iterable)
+                if iterable is not None:
+                    iter_type = get_type(iterable)
+                    if iter_type not in ['list', 'range', 'dict', 'set']:
+                        errors.append(f"❌ For loop iterable must be a list, range, dict or set, got {iter_type}")
+                old_symbol_table = symbol_table.copy()
+                symbol_table[var_name] = None
+                visit(node.body)
+                symbol_table.clear()
+                symbol_table.update(old_symbol_table)
+                return None
+                
+            elif cname == "FunctionDef":
+                func_name = node.name
+                symbol_table[func_name] = "function"
+                type_info[func_name] = "function"
+                old_symbol_table = symbol_table.copy()
+                for param in node.params:
+                    symbol_table[param] = None
+                    type_info[param] = "parameter"
+                visit(node.body)
+                symbol_table.clear()
+                symbol_table.update(old_symbol_table)
+                return None
+                
+            elif cname in ("FunctionCall", "BuiltinCall"):
+                func_name = node.name.name if hasattr(node.name, 'name') else node.name
+                if func_name not in symbol_table and cname != "BuiltinCall":
+                    errors.append(f"❌ Undeclared function: '{func_name}'")
+                for arg in node.args:
+                    visit(arg)
+                return None
+                
+            elif cname == "ListNode":
+                elements = [visit(elem) for elem in node.elements]
+                return elements
+                
+            elif cname == "DictNode":
+                visit(node.keys)
+                visit(node.values)
+                return {}
+                
+            elif cname == "SetNode":
+                visit(node.elements)
+                return set()
+                
+            elif cname == "IndexNode":
+                lst = visit(node.expr)
+                idx = visit(node.index)
+                if lst is not None and get_type(lst) not in ('list', 'dict'):
+                    errors.append(f"❌ Indexing requires a list or dict, got {get_type(lst)}")
+
+            elif cname == "SliceNode":
+                lst = visit(node.expr)
+                visit([part for part in (node.start, node.stop, node.step) if part is not None])
+                if lst is not None and get_type(lst) not in ('list', 'str'):
+                    errors.append(f"❌ Slicing requires a list or string, got {get_type(lst)}")
+                return lst
+                if idx is not None and get_type(lst) == 'list' and get_type(idx) != 'int':
+                    errors.append(f"❌ List index must be an integer, got {get_type(idx)}")
+                return None
+                
+            elif cname == "ListAssign":
+                lst = visit(node.expr)
+                idx = visit(node.index)
+                visit(node.value)
+                if lst is not None and get_type(lst) not in ('list', 'dict'):
+                    errors.append(f"❌ Index assignment requires a list or dict, got {get_type(lst)}")
+                if idx is not None and get_type(lst) == 'list' and get_type(idx) != 'int':
+                    errors.append(f"❌ List index must be an integer, got {get_type(idx)}")
+                return None
+                
+            elif cname == "StringMethod":
+                string_obj = visit(node.string_obj)
+                container_methods = {'append': ('list',), 'extend': ('list',), 'pop': ('list', 'dict'),
+                                     'get': ('dict',), 'keys': ('dict',), 'values': ('dict',),
+                                     'add': ('set',), 'remove': ('set',)}
+                if node.method in container_methods:
+                    if string_obj is not None and get_type(string_obj) not in container_methods[node.method]:
+                        errors.append(f"❌ Method '{node.method}' called on unsupported type: {get_type(string_obj)}")
+                elif string_obj is not None and get_type(string_obj) != 'str':
+                    errors.append(f"❌ String method '{node.method}' called on non-string type: {get_type(string_obj)}")
+                for arg in getattr(node, 'args', []) or []:
+                    visit(arg)
+                return None
+                
+            elif cname == "RangeCall":
+                args = [node.start, node.stop, node.step]
+                for i, arg in enumerate(args):
+                    val = visit(arg) if arg is not None else None
+                    if val is not None and get_type(val) != 'int':
+                        errors.append(f"❌ Range argument {i+1} must be an integer, got {get_type(val)}")
+                return None
+                
+            elif cname == "Return":
+                value = visit(node.expr)
+                if value is not None:
+                    type_info['return_value'] = get_type(value)
+                return None
+                
+            elif cname == "TryExcept":
+                visit(node.try_body)
+                visit(node.except_body)
+                return None
+                
+            elif cname == "LenFunction":
+                expr = visit(node.expr)
+                if expr is not None:
+                    expr_type = get_type(expr)
+                    if expr_type not in ['list', 'str', 'dict', 'set']:
+                        errors.append(f"❌ len() requires a list, string, dict or set, got {expr_type}")
+                return None
+                
+            elif cname == "UnaryOp":
+                expr = visit(node.expr)
+                if expr is not None:
+                    expr_type = get_type(expr)
+                    if node.op == '-' and expr_type not in ['int', 'float']:
+                        errors.append(f"❌ Unary minus requires a number, got {expr_type}")
+                    elif node.op == 'not' and expr_type != 'bool':
+                        errors.append(f"❌ Logical not requires a boolean, got {expr_type}")
+                return None
+                
+            return None
+        return None
+
+    visit(ast)
+    
+    # Format the output
+    output = []
+    if errors:
+        output.append("❌ Semantic Errors Found:")
+        for error in errors:
+            output.append(f"  {error}")
+    else:
+        output.append("✅ No semantic errors found!")
+        
+    output.append("\nType Information:")
+    output.append("----------------")
+    for var, type_name in type_info.items():
+        output.append(f"  {var}: {type_name}")
+        
+    output.append("\nSymbol Table:")
+    output.append("-------------")
+    for var, value in symbol_table.items():
+        if value == "function":
+            output.append(f"  {var}: function")
+        else:
+            output.append(f"  {var}: {get_type(value)}")
+            
+    return len(errors) == 0, "\n".join(output)
+
+# Define the original generate_icg function
+def generate_icg(ast):
+    code_lines = []
+    temp_counter = [0]
+    label_counter = [0]
+    loop_labels = []
+    
+    def new_temp():
+        temp_counter[0] += 1
+        return f"t{temp_counter[0]}"
+        
+    def new_label():
+        label_counter[0] += 1
+        return f"L{label_counter[0]}"
+        
+    def jump_if(node, label, when):
+        """Emit jumping code that goes to label when the condition's truth value equals when.
+
+        and/or become chains of jumps and comparisons become a single ifTrue/ifFalse, so no
+        boolean temporaries are materialized for conditions.
+        """
+        cname = node.__class__.__name__
+        if cname == "BinaryOp" and node.op in ("and", "or"):
+            if (node.op == "and") != when:
+                # A false operand of `and` (true operand of `or`) decides the whole condition
+                jump_if(node.left, label, when)
+                jump_if(node.right, label, when)
+            else:
+                skip_label = new_label()
+                jump_if(node.left, skip_label, not when)
+                jump_if(node.right, label, when)
+                code_lines.append(f"{skip_label}:")
+        elif cname == "UnaryOp" and node.op == "not":
+            jump_if(node.expr, label, not when)
+        elif cname == "BinaryOp" and node.op in ("==", "!=", "<", ">", "<=", ">="):
+            left = visit(node.left)
+            right = visit(node.right)
+            code_lines.append(f"{'ifTrue' if when else 'ifFalse'} {left} {node.op} {right} goto {label}")
+        elif cname == "Boolean":
+            if node.value == when:
+                code_lines.append(f"goto {label}")
+        else:
+            value = visit(node)
+            code_lines.append(f"if {value} goto {label}" if when else f"if {value} == False goto {label}")
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+            return None
+        elif hasattr(node, "__class__"):
+            cname = node.__class__.__name__
+            
+            if cname == "Assign":
+                rhs = visit(node.expr)
+                var_name = node.name.name if hasattr(node.name, 'name') else node.name
+                code_lines.append(f"{var_name} = {rhs}")
+                return var_name
+                
+            elif cname == "Number":
+                temp = new_temp()
+                code_lines.append(f"{temp} = {node.value}")
+                return temp
+                
+            elif cname == "String":
+                temp = new_temp()
+                code_lines.append(f"{temp} = {node.value!r}")
+                return temp
+                
+            elif cname == "Boolean":
+                temp = new_temp()
+                code_lines.append(f"{temp} = {node.value}")
+                return temp
+                
+            elif cname == "Identifier":
+                temp = new_temp()
+                code_lines.append(f"{temp} = {node.name}")
+                return temp
+                
+            elif cname == "BinaryOp" and node.op in ("and", "or"):
+                # Short-circuit: the right operand is only computed when the left one does not decide
+                left = visit(node.left)
+                temp = new_temp()
+                end_label = new_label()
+                code_lines.append(f"{temp} = {left}")
+                if node.op == "and":
+                    code_lines.append(f"if {temp} == False goto {end_label}")
+                else:
+                    code_lines.append(f"if {temp} goto {end_label}")
+                right = visit(node.right)
+                code_lines.append(f"{temp} = {right}")
+                code_lines.append(f"{end_label}:")
+                return temp
+
+            elif cname == "BinaryOp":
+                left = visit(node.left)
+                right = visit(node.right)
+                temp = new_temp()
+                code_lines.append(f"{temp} = {left} {node.op} {right}")
+                return temp
+                
+            elif cname == "UnaryOp":
+                expr = visit(node.expr)
+                temp = new_temp()
+                code_lines.append(f"{temp} = {node.op} {expr}")
+                return temp
+                
+            elif cname == "Print":
+                val = visit(node.expr)
+                code_lines.append(f"print {val}")
+                return None
+                
+            elif cname == "IfElse":
+                else_label = new_label()
+                end_label = new_label()
+                
+                jump_if(node.condition, else_label, False)
+                for stmt in node.if_body:
+                    visit(stmt)
+                code_lines.append(f"goto {end_label}")
+                code_lines.append(f"{else_label}:")
+                if node.else_body:
+                    for stmt in node.else_body:
+                        visit(stmt)
+                code_lines.append(f"{end_label}:")
+                return None
+                
+            elif cname == "WhileLoop":
+                start_label = new_label()
+                end_label = new_label()
+                
+                code_lines.append(f"{start_label}:")
+                jump_if(node.condition, end_label, False)
+                loop_labels.append((start_label, end_label))
+                for stmt in node.body:
+                    visit(stmt)
+                loop_labels.pop()
+                code_lines.append(f"goto {start_label}")
+                code_lines.append(f"{end_label}:")
+                return None
+                
+            elif cname == "ForLoop":
+                start_label = new_label()
+                end_label = new_label()
+                iter_var = new_temp()
+                
+                # Initialize iterator
+                iter_expr = visit(node.iterable)
+                code_lines.append(f"{iter_var} = iter {iter_expr}")
+                
+                code_lines.append(f"{start_label}:")
+                # Assign current value to loop variable, leaving the loop when the iterator is exhausted
+                var_name = node.var.name if hasattr(node.var, 'name') else node.var
+                code_lines.append(f"{var_name} = next {iter_var} else goto {end_label}")
+                
+                # Execute loop body
+                loop_labels.append((start_label, end_label))
+                for stmt in node.body:
+                    visit(stmt)
+                loop_labels.pop()
+                    
+                # Move to next iteration
+                code_lines.append(f"goto {start_label}")
+                code_lines.append(f"{end_label}:")
+                return None
+                
+            elif cname == "FunctionDef":
+                code_lines.append(f"function {node.name}:")
+                for param in node.params:
+                    code_lines.append(f"param {param}")
+                for stmt in node.body:
+                    visit(stmt)
+                code_lines.append("return None")
+                code_lines.append(f"end function {node.name}")
+                return None
+                
+            elif cname in ("FunctionCall", "BuiltinCall"):
+                args = [visit(arg) for arg in node.args]
+                # Convert None to 'None' string to avoid join error
+                safe_args = [str(a) if a is not None else "None" for a in args]
+                temp = new_temp()
+                func_name = node.name.name if hasattr(node.name, 'name') else node.name
+                code_lines.append(f"{temp} = call {func_name}({', '.join(safe_args)})")
+                return temp
+                
+            elif cname == "ListNode":
+                temp = new_temp()
+                code_lines.append(f"{temp} = []")
+                for elem in node.elements:
+                    elem_temp = visit(elem)
+                    code_lines.append(f"{temp}.append({elem_temp})")
+                return temp
+                
+            elif cname == "DictNode":
+                temp = new_temp()
+                code_lines.append(f"{temp} = {{}}")
+                for key, value in zip(node.keys, node.values):
+                    key_temp = visit(key)
+                    value_temp = visit(value)
+                    code_lines.append(f"{temp}[{key_temp}] = {value_temp}")
+                return temp
+                
+            elif cname == "SetNode":
+                temp = new_temp()
+                code_lines.append(f"{temp} = set()")
+                for elem in node.elements:
+                    elem_temp = visit(elem)
+                    code_lines.append(f"{new_temp()} = {temp}.add({elem_temp})")
+                return temp
+                
+            elif cname == "IndexNode":
+                lst = visit(node.expr)
+                idx = visit(node.index)
+                temp = new_temp()
+                code_lines.append(f"{temp} = {lst}[{idx}]")
+                return temp
+
+            elif cname == "SliceNode":
+                lst = visit(node.expr)
+                bounds = ['' if part is None else visit(part) for part in (node.start, node.stop, node.step)]
+                temp = new_temp()
+                code_lines.append(f"{temp} = {lst}[{':'.join(bounds)}]")
+                return temp
+                
+            elif cname == "ListAssign":
+                lst = visit(node.expr)
+                idx = visit(node.index)
+                val = visit(node.value)
+                code_lines.append(f"{lst}[{idx}] = {val}")
+                return None
+                
+            elif cname == "Return":
+                val = visit(node.expr)
+                code_lines.append(f"return {val}")
+                return None
+                
+            elif cname == "Break":
+                if loop_labels:
+                    code_lines.append(f"goto {loop_labels[-1][1]}")
+                else:
+                    code_lines.append("break")
+                return None
+                
+            elif cname == "Continue":
+                if loop_labels:
+                    code_lines.append(f"goto {loop_labels[-1][0]}")
+                else:
+                    code_lines.append("continue")
+                return None
+                
+            elif cname == "TryExcept":
+                try_label = new_label()
+                except_label = new_label()
+                end_label = new_label()
+                
+                code_lines.append(f"{try_label}:")
+                code_lines.append(f"try {except_label}")
+                for stmt in node.try_body:
+                    visit(stmt)
+                code_lines.append("endtry")
+                code_lines.append(f"goto {end_label}")
+                
+                code_lines.append(f"{except_label}:")
+                for stmt in node.except_body:
+                    visit(stmt)
+                    
+                code_lines.append(f"{end_label}:")
+                return None
+                
+            elif cname == "StringMethod":
+                string_obj = visit(node.string_obj)
+                temp = new_temp()
+                if node.method == "upper":
+                    code_lines.append(f"{temp} = {string_obj}.upper()")
+                elif node.method == "lower":
+                    code_lines.append(f"{temp} = {string_obj}.lower()")
+                elif node.method == "strip":
+                    code_lines.append(f"{temp} = {string_obj}.strip()")
+                elif node.method == "replace":
+                    args = [visit(arg) for arg in node.args]
+                    code_lines.append(f"{temp} = {string_obj}.replace({args[0]}, {args[1]})")
+                elif node.method in ("append", "pop", "extend", "get", "keys", "values", "add", "remove"):
+                    args = [visit(arg) for arg in node.args]
+                    code_lines.append(f"{temp} = {string_obj}.{node.method}({', '.join(args)})")
+                return temp
+                
+            elif cname == "LenFunction":
+                expr = visit(node.expr)
+                temp = new_temp()
+                code_lines.append(f"{temp} = len({expr})")
+                return temp
+                
+            elif cname == "RangeCall":
+                start = visit(node.start) if node.start else "0"
+                stop = visit(node.stop) if node.stop else "None"
+                step = visit(node.step) if node.step else "1"
+                temp = new_temp()
+                code_lines.append(f"{temp} = range({start}, {stop}, {step})")
+                return temp
+                
+            return None
+        return None
+
+    visit(ast)
+    
+    # Format the output
+    output = []
+    output.append("Intermediate Code (Three-Address Code):")
+    output.append("=====================================")
+    output.append("")
+    
+    for i, line in enumerate(code_lines, 1):
+        output.append(f"{i:3d} | {line}")
+        
+    output.append("\nLegend:")
+    output.append("-------")
+    output.append("tN    : Temporary variable")
+    output.append("LN    : Label")
+    output.append("goto  : Jump instruction")
+    output.append("ifTrue/ifFalse : Compare and jump")
+    output.append("call  : Function call")
+    output.append("param : Function parameter")
+    output.append("iter/next : Loop iteration")
+    output.append("try/endtry : Exception handler scope")
+    
+    return "\n".join(output)
+
+# Now patch semantic_analysis and generate_icg
+old_semantic_analysis = semantic_analysis
+def semantic_analysis(ast):
+    ast = ensure_list(ast)
+    return old_semantic_analysis(ast)
+
+old_generate_icg = generate_icg
+def generate_icg(ast):
+    ast = ensure_list(ast)
+    return old_generate_icg(ast)
+
+def listing_size(listing):
+    """Number of numbered instruction lines ("  12 | ...") in an ICG or generated code listing,
+    leaving out the commented-out lines of instructions the optimizer removed."""
+    return sum(1 for line in listing.split('\n') if re.match(r'^\s*\d+ \| *[^#\s]', line))
+
+def parse_program(code):
+    return ensure_list(parser.parse(code))
+
+# Tokens of an ICG instruction: string literals (skipped whole), words and single characters
+ICG_TOKEN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\w+|\S")
+ICG_KEYWORDS = {'goto', 'if', 'ifTrue', 'ifFalse', 'else', 'next', 'iter', 'call', 'print', 'return',
+                'and', 'or', 'not', 'in', 'True', 'False', 'None', 'len', 'range', 'set', 'try'}
+ICG_ASSIGNMENT = re.compile(r'^(\w+) = (.*)$')
+ICG_TEMP = re.compile(r'^t\d+$')
+# Constants that can stand wherever an operand can: numbers, True, False and None
+ICG_COMPACT_CONSTANT = re.compile(r'^-?[\w.+]+$')
+ICG_SLICE = re.compile(r'\[\w*:\w*:\w*\]')
+
+def icg_operands(code):
+    """(start, end) of each variable or temporary an ICG instruction reads, in order."""
+    if code.endswith(':') or code.startswith(('function ', 'end function', 'param ')) or code == 'endtry':
+        return []
+    match = ICG_ASSIGNMENT.match(code)
+    start = match.start(2) if match else 0
+    spans = []
+    previous = None
+    for token in ICG_TOKEN.finditer(code, start):
+        text = token.group()
+        # Method names follow a dot, function names call and labels goto or try
+        if ((text[0].isalpha() or text[0] == '_') and text not in ICG_KEYWORDS and
+                previous not in ('.', 'call', 'goto', 'try')):
+            spans.append(token.span())
+        previous = text
+    return spans
+
+def icg_constant(text):
+    """(True, value) if an ICG operand is a constant, else (False, None). [] and {} are not: they
+    make a new list or dict each time."""
+    is_var, value = parse_operand(text)
+    return (False, None) if is_var or type(value) not in (int, float, bool, str, type(None)) else (True, value)
+
+def fold_icg_expression(expr):
+    """Value of a binary or unary ICG expression of constants, or None if it cannot be folded."""
+    match = BINARY_EXPR.match(expr)
+    if match:
+        (left_constant, left), (right_constant, right) = icg_constant(match.group(1)), icg_constant(match.group(3))
+        operands, function = (left, right), BINARY_OPERATORS[match.group(2)]
+    else:
+        match = UNARY_EXPR.match(expr)
+        if not match:
+            return None
+        (left_constant, left), right_constant = icg_constant(match.group(2)), True
+        operands, function = (left,), UNARY_OPERATORS[match.group(1)]
+    if not (left_constant and right_constant):
+        return None
+    try:
+        value = function(*operands)
+    except Exception:
+        # Left to fail at runtime, where the program can catch it
+        return None
+    if type(value) not in (int, float, bool, str) or (type(value) is str and len(value) > 1000):
+        return None
+    text = repr(value)
+    return text if icg_constant(text) == (True, value) else None
+
+def removable_icg_expression(expr):
+    """Check whether computing an ICG expression has no effect besides its result."""
+    if icg_constant(expr)[0] or expr.isidentifier() or expr in ('[]', '{}', 'set()'):
+        return True
+    if UNARY_EXPR.match(expr):
+        return True
+    match = BINARY_EXPR.match(expr)
+    if not match:
+        return False
+    if match.group(2) in ('/', '%'):
+        # Unless the divisor is a nonzero number, it may fail
+        is_constant, divisor = icg_constant(match.group(3))
+        return is_constant and type(divisor) in (int, float) and divisor != 0
+    return True
+
+def optimize_code_icg(icg_code):
+    """Optimize the three-address code of an ICG listing.
+
+    Within each straight-line stretch of code (up to the next label or function boundary),
+    temporaries assigned once from a constant or a variable are replaced by it where they are read
+    (constant and copy propagation), operations on constants are computed (constant folding) and an
+    operation repeated on unchanged operands reuses the first result (common subexpression
+    elimination); the last is given up at calls and in-place changes, which may alter a list the
+    operands refer to. Assignments to temporaries that are then never read are dropped (dead code
+    elimination) when computing them cannot fail or have side effects. Assignments to named
+    variables, which other blocks and functions may read, are always kept. Dropped lines are shown
+    commented out with the reason.
+    """
+    if not icg_code or icg_code == "<no intermediate code generated>":
+        return "⚠️ No intermediate code to optimize."
+
+    code = extract_icg_lines(icg_code)
+    optimizations = []
+    reasons = {}
+    shown = {}
+
+    definitions = {}
+    for index, line in enumerate(code):
+        match = ICG_ASSIGNMENT.match(line) or re.match(r'^param (\w+)$', line)
+        if match:
+            definitions.setdefault(match.group(1), []).append(index)
+    single_temps = {name for name, indices in definitions.items() if ICG_TEMP.match(name) and len(indices) == 1}
+
+    # Forward pass over each straight-line stretch: propagation, folding and reuse
+    values = {}
+    available = {}
+    # Propagated temporary -> "Copy" or "Constant"
+    propagated = {}
+    for index, line in enumerate(code):
+        if line.endswith(':') or line.startswith(('function ', 'end function')):
+            values.clear()
+            available.clear()
+            continue
+        match = ICG_ASSIGNMENT.match(line)
+        sole = match.group(2) if match else line[6:] if line.startswith(('print ', 'return ')) else None
+        names_only = ICG_SLICE.search(line) is not None
+        pieces, position = [], 0
+        for start, end in icg_operands(line):
+            name = line[start:end]
+            value = values.get(name)
+            if value is None:
+                continue
+            if not value.isidentifier():
+                if name != sole and (names_only or not ICG_COMPACT_CONSTANT.match(value) or
+                                     line[end:end + 1] in ('.', '[')):
+                    continue
+            pieces += [line[position:start], value]
+            position = end
+            if name not in propagated:
+                propagated[name] = "Copy" if value.isidentifier() else "Constant"
+                optimizations.append(f"{propagated[name]} propagation: {name} → {value}")
+        if pieces:
+            line = code[index] = "".join(pieces) + line[position:]
+        if not match:
+            if not line.startswith(('print ', 'return ', 'if', 'goto ', 'try ')):
+                # Calls and in-place changes may alter a list the available operations read
+                available.clear()
+            continue
+        dest, expr = match.group(1), line[len(match.group(1)) + 3:]
+        if expr.startswith(('call ', 'next ')) or METHOD_EXPR.match(expr):
+            available.clear()
+
+        folded = fold_icg_expression(expr)
+        if folded is not None:
+            optimizations.append(f"Constant folding: {expr} → {folded}")
+            expr = folded
+            code[index] = line = f"{dest} = {expr}"
+        elif expr in available:
+            shown[index] = line
+            reasons[index] = "Common subexpression eliminated"
+            expr = available[expr][0]
+            optimizations.append(f"Common subexpression elimination: {shown[index].split(' = ', 1)[1]} → {expr}")
+            code[index] = line = f"{dest} = {expr}"
+
+        # The assignment changes dest, so forget what was known from its old value
+        for name in [name for name, value in values.items() if value == dest or name == dest]:
+            del values[name]
+        for key in [key for key, (temp, names) in available.items() if dest in names or temp == dest]:
+            del available[key]
+        if dest in single_temps:
+            if icg_constant(expr)[0] or expr.isidentifier():
+                values[dest] = expr
+            elif BINARY_EXPR.match(expr) or UNARY_EXPR.match(expr):
+                names = {line[start:end] for start, end in icg_operands(line)}
+                if dest not in names:
+                    available[expr] = (dest, names)
+
+    # Dead code elimination: drop assignments to temporaries that are never read
+    uses = {}
+    for line in code:
+        for start, end in icg_operands(line):
+            uses[line[start:end]] = uses.get(line[start:end], 0) + 1
+    removed = set()
+    worklist = [name for name in definitions if ICG_TEMP.match(name) and not uses.get(name)]
+    while worklist:
+        name = worklist.pop()
+        for index in definitions[name]:
+            line = code[index]
+            if index in removed or not removable_icg_expression(line[len(name) + 3:]):
+                continue
+            removed.add(index)
+            if index not in reasons and name in propagated:
+                reasons[index] = f"{propagated[name]} propagated"
+            elif index not in reasons:
+                reasons[index] = "Dead code eliminated"
+                optimizations.append(f"Dead code elimination: {name} is never used")
+            for start, end in icg_operands(line):
+                operand = line[start:end]
+                uses[operand] -= 1
+                if not uses[operand] and ICG_TEMP.match(operand) and operand in definitions:
+                    worklist.append(operand)
+    optimized_lines = [f"# {shown.get(index, line)}  # {reasons[index]}" if index in removed else line
+                       for index, line in enumerate(code)]
+
+    # Format the output
+    output = []
+    output.append("Code Optimization Analysis:")
+    output.append("==========================")
+    output.append("")
+
+    if optimizations:
+        output.append("Applied Optimizations:")
+        output.append("---------------------")
+        for opt in optimizations:
+            output.append(f"✓ {opt}")
+        output.append("")
+
+    output.append("Optimized Code:")
+    output.append("--------------")
+    for i, line in enumerate(optimized_lines, 1):
+        output.append(f"{i:3d} | {line}")
+
+    output.append("\nOptimization Summary:")
+    output.append("-------------------")
+    output.append(f"• Total optimizations applied: {len(optimizations)}")
+    output.append(f"• Instructions removed: {len(removed)}")
+    output.append("• Types of optimizations:")
+    output.append("  - Constant and copy propagation")
+    output.append("  - Constant folding")
+    output.append("  - Common subexpression elimination")
+    output.append("  - Dead code elimination")
+
+    return "\n".join(output)
+
+BRANCH_INSTRUCTIONS = {'==': 'BEQ', '!=': 'BNE', '<': 'BLT', '>': 'BGT', '<=': 'BLE', '>=': 'BGE'}
+NEGATED_COMPARISONS = {'==': '!=', '!=': '==', '<': '>=', '>': '<=', '<=': '>', '>=': '<'}
+
+def generate_code(optimized_code):
+    if not optimized_code or "No intermediate code" in optimized_code:
+        return "⚠️ No code to generate."
+        
+    lines = optimized_code.split('\n')
+    generated_code = []
+    reg_counter = [0]
+    label_counter = [0]
+    
+    def new_reg():
+        reg_counter[0] += 1
+        return f"R{reg_counter[0]}"
+        
+    def new_label():
+        label_counter[0] += 1
+        return f"L{label_counter[0]}"
+        
+    # Skip header and summary
+    start_idx = 0
+    for i, line in enumerate(lines):
+        if "Optimized Code:" in line:
+            start_idx = i + 2
+            break
+            
+    # Process each line
+    i = start_idx
+    while i < len(lines):
+        line = lines[i].strip()
+        if not line or "Optimization Summary" in line:
+            break
+            
+        # Extract the actual code part (after line number)
+        code = line.split('|', 1)[1].strip() if '|' in line else line
+        
+        # Skip commented lines
+        if code.startswith('#'):
+            i += 1
+            continue
+            
+        # Compare and branch (ifTrue/ifFalse a < b goto L)
+        match = re.match(r'^(ifTrue|ifFalse) (\S+) (==|!=|<=|>=|<|>) (\S+) goto (\w+)$', code)
+        if match:
+            kind, left_op, op, right_op, label = match.groups()
+            reg1 = new_reg()
+            reg2 = new_reg()
+            for reg, operand in ((reg1, left_op), (reg2, right_op)):
+                if operand.isdigit():
+                    generated_code.append(f"MOV {reg}, #{operand}  ; Load constant {operand}")
+                else:
+                    generated_code.append(f"LDR {reg}, [{operand}] ; Load {operand}")
+            generated_code.append(f"CMP {reg1}, {reg2}  ; Compare operands")
+            if kind == 'ifFalse':
+                op = NEGATED_COMPARISONS[op]
+            generated_code.append(f"{BRANCH_INSTRUCTIONS[op]} {label}      ; Branch if {left_op} {op} {right_op}")
+            i += 1
+            continue
+            
+        # Branch on a truth value (if t goto L / if t == False goto L)
+        match = re.match(r'^if (\S+)( == False)? goto (\w+)$', code)
+        if match:
+            value, if_false, label = match.groups()
+            reg = new_reg()
+            generated_code.append(f"LDR {reg}, [{value}]  ; Load condition")
+            generated_code.append(f"CMP {reg}, #0  ; Test condition")
+            if if_false:
+                generated_code.append(f"BEQ {label}      ; Branch if false")
+            else:
+                generated_code.append(f"BNE {label}      ; Branch if true")
+            i += 1
+            continue
+            
+        # Assignment
+        if '=' in code:
+            left, right = code.split('=', 1)
+            left = left.strip()
+            right = right.strip()
+            
+            # Constant assignment
+            if right.isdigit():
+                reg = new_reg()
+                generated_code.append(f"MOV {reg}, #{right}    ; Load constant {right}")
+                generated_code.append(f"STR {reg}, [{left}]   ; Store in {left}")
+                
+            # Variable assignment
+            elif right.isidentifier():
+                reg1 = new_reg()
+                reg2 = new_reg()
+                generated_code.append(f"LDR {reg1}, [{right}]  ; Load {right}")
+                generated_code.append(f"STR {reg1}, [{left}]   ; Store in {left}")
+                
+            # Arithmetic operation
+            elif any(op in right for op in ['+', '-', '*', '/']):
+                op = next(op for op in ['+', '-', '*', '/'] if op in right)
+                left_op, right_op = right.split(op)
+                left_op = left_op.strip()
+                right_op = right_op.strip()
+                
+                reg1 = new_reg()
+                reg2 = new_reg()
+                reg3 = new_reg()
+                
+                # Load operands
+                if left_op.isdigit():
+                    generated_code.append(f"MOV {reg1}, #{left_op}  ; Load constant {left_op}")
+                else:
+                    generated_code.append(f"LDR {reg1}, [{left_op}] ; Load {left_op}")
+                    
+                if right_op.isdigit():
+                    generated_code.append(f"MOV {reg2}, #{right_op}  ; Load constant {right_op}")
+                else:
+                    generated_code.append(f"LDR {reg2}, [{right_op}] ; Load {right_op}")
+                    
+                # Perform operation
+                if op == '+':
+                    generated_code.append(f"ADD {reg3}, {reg1}, {reg2}  ; Add operands")
+                elif op == '-':
+                    generated_code.append(f"SUB {reg3}, {reg1}, {reg2}  ; Subtract operands")
+                elif op == '*':
+                    generated_code.append(f"MUL {reg3}, {reg1}, {reg2}  ; Multiply operands")
+                elif op == '/':
+                    generated_code.append(f"DIV {reg3}, {reg1}, {reg2}  ; Divide operands")
+                    
+                generated_code.append(f"STR {reg3}, [{left}]   ; Store result in {left}")
+                
+        # Print statement
+        elif code.startswith('print'):
+            reg = new_reg()
+            var = code.split('print', 1)[1].strip()
+            generated_code.append(f"LDR {reg}, [{var}]  ; Load value to print")
+            generated_code.append(f"PUSH {reg}         ; Push to stack for printing")
+            generated_code.append(f"CALL print         ; Call print function")
+            generated_code.append(f"POP {reg}          ; Clean up stack")
+            
+        # Goto statement
+        elif code.startswith('goto'):
+            label = code.split('goto', 1)[1].strip()
+            generated_code.append(f"B {label}          ; Unconditional branch")
+            
+        # Label
+        elif code.endswith(':'):
+            generated_code.append(f"{code}             ; Label")
+            
+        # Function call
+        elif code.startswith('call'):
+            func = code.split('call', 1)[1].split('(')[0].strip()
+            args = code.split('(')[1].rstrip(')').split(',')
+            for arg in args:
+                reg = new_reg()
+                generated_code.append(f"LDR {reg}, [{arg.strip()}]  ; Load argument")
+                generated_code.append(f"PUSH {reg}         ; Push argument to stack")
+            generated_code.append(f"CALL {func}         ; Call function")
+            for _ in args:
+                generated_code.append(f"POP {new_reg()}     ; Clean up stack")
+                
+        # Return statement
+        elif code.startswith('return'):
+            val = code.split('return', 1)[1].strip()
+            reg = new_reg()
+            generated_code.append(f"LDR {reg}, [{val}]  ; Load return value")
+            generated_code.append(f"MOV R0, {reg}      ; Set return register")
+            generated_code.append(f"RET                ; Return from function")
+            
+        i += 1
+        
+    # Format the output
+    output = []
+    output.append("Code Generation (Assembly-like):")
+    output.append("===============================")
+    output.append("")
+    
+    if generated_code:
+        output.append("Generated Code:")
+        output.append("--------------")
+        for i, line in enumerate(generated_code, 1):
+            output.append(f"{i:3d} | {line}")
+            
+        output.append("\nRegister Usage:")
+        output.append("--------------")
+        output.append(f"• Total registers used: {reg_counter[0]}")
+        output.append("• Register naming: R1, R2, R3, ...")
+        
+        output.append("\nLabel Usage:")
+        output.append("-----------")
+        output.append(f"• Total labels used: {label_counter[0]}")
+        output.append("• Label naming: L1, L2, L3, ...")
+        
+        output.append("\nInstruction Types:")
+        output.append("-----------------")
+        output.append("• MOV: Move immediate value to register")
+        output.append("• LDR: Load from memory to register")
+        output.append("• STR: Store from register to memory")
+        output.append("• ADD/SUB/MUL/DIV: Arithmetic operations")
+        output.append("• CMP: Compare operands")
+        output.append("• B/BEQ/BNE/BLT/BGT/BLE/BGE: Branch instructions")
+        output.append("• PUSH/POP: Stack operations")
+        output.append("• CALL/RET: Function calls")
+    else:
+        output.append("No code generated.")
+        
+    return "\n".join(output)
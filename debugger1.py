@@ -0,0 +1,259 @@
+import sys
+
+from interpreter import Interpreter, StringBuilder
+from myparser import parser
+from profiler import interpreted_stack
+
+COMMANDS = ('continue', 'step_into', 'step_over', 'step_out', 'quit')
+
+class DebuggerQuit(BaseException):
+    """Raised in a debugged program to end it. It is not an Exception, so that the program's own
+    try/except blocks cannot catch it."""
+
+class DebugProbe:
+    """Stand-in for a statement where the debugger may pause: checks whether to, then runs it.
+
+    In a covered run it takes the statement's coverage slot, so that the statement is counted
+    once, as the probe."""
+    __slots__ = ('statement', 'coverage_slot')
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.coverage_slot = getattr(statement, 'coverage_slot', 0)
+
+def parse_condition(condition):
+    """AST of a breakpoint condition, an expression in the language; raises SyntaxError."""
+    return parser.parse(f"print({condition})\n")[0].expr
+
+class Breakpoint:
+    def __init__(self, line, condition=None):
+        self.line = line
+        self.condition = condition
+        self.expression = None if condition is None else parse_condition(condition)
+        # Times the debugger paused here
+        self.hits = 0
+
+class DebugFrame:
+    """One level of the interpreted call stack at a pause."""
+    def __init__(self, function, line, environment):
+        self.function = function
+        self.line = line
+        self.environment = environment
+
+    def variables(self):
+        """The frame's variables and their values, by name."""
+        return {name: value.value() if type(value) is StringBuilder else value
+                for name, value in sorted(self.environment.items())}
+
+class Pause:
+    """Where and why a debugged program paused. frames runs from '<module>' to the function
+    paused in; line is the line of the statement about to run."""
+    def __init__(self, line, reason, frames):
+        self.line = line
+        self.reason = reason
+        self.frames = frames
+
+class Debugger:
+    """Line and conditional breakpoints, stepping and variable inspection for Interpreter runs.
+
+    An interpreter created with debugger=Debugger(on_pause) runs the program unchanged until a
+    statement where it may pause. Only those statements are instrumented: each is swapped, in
+    its block's list, for a DebugProbe that checks whether to pause and then runs it. While
+    running to a breakpoint only the statements on breakpoint lines hold probes, so the rest of
+    the program, and all of a program without breakpoints, runs through the normal evaluate path;
+    while stepping every statement holds one, until the next continue. The probes are swapped
+    back out when the run ends.
+
+    At a pause on_pause(pause) is called, in the interpreter's thread, with a Pause giving the
+    line, the reason and the call stack with each frame's variables, and returns the next
+    command: 'continue', 'step_into' (pause at the next statement), 'step_over' (the next one in
+    this function or a caller), 'step_out' (the next one in a caller) or 'quit' (raise
+    DebuggerQuit). Tiered execution is paused for runs that start with breakpoints, as compiled
+    regions would run their statements without the probes; breakpoints set during a run take
+    effect outside compiled regions.
+    """
+    def __init__(self, on_pause):
+        self.on_pause = on_pause
+        # line -> Breakpoint
+        self.breakpoints = {}
+        self.interpreter = None
+        # For the run in progress: line -> [(block, index)] of its statements
+        self.positions = None
+        self.stepping = False
+        self.mode = None
+        # Environments of the frames a step over or step out may stop in, kept alive so that
+        # their ids stay unique
+        self.step_environments = []
+        self.step_ids = frozenset()
+        self.tier_threshold = None
+
+    def set_breakpoint(self, line, condition=None):
+        """Pause before the statements on line, when condition (an expression) is true if given."""
+        self.breakpoints[line] = Breakpoint(line, condition)
+        if self.positions is not None:
+            self.arm(line)
+
+    def clear_breakpoint(self, line):
+        self.breakpoints.pop(line, None)
+        if self.positions is not None and not self.stepping:
+            self.disarm(line)
+
+    def interrupt(self):
+        """Pause at the next statement the running program reaches; may be called from another thread."""
+        if self.positions is not None:
+            self.mode = 'step_into'
+            self.arm_all()
+
+    def start(self, interpreter, statements):
+        """Prepare a debugged run of statements on interpreter."""
+        positions = {}
+
+        def visit_block(block):
+            for index, item in enumerate(block):
+                if not hasattr(item, '__dict__'):
+                    continue
+                line = getattr(item, 'lineno', 0)
+                if line:
+                    positions.setdefault(line, []).append((block, index))
+                visit(item)
+
+        def visit(node):
+            for value in vars(node).values():
+                if type(value) is list:
+                    visit_block(value)
+                elif hasattr(value, '__dict__'):
+                    visit(value)
+
+        visit_block(statements)
+
+        def evaluate_probe(probe):
+            statement = probe.statement
+            reason = self.pause_reason(statement)
+            if reason is not None:
+                self.pause(statement, reason)
+            return interpreter.evaluate(statement)
+
+        self.interpreter = interpreter
+        self.positions = positions
+        self.stepping = False
+        self.mode = None
+        interpreter.evaluate_DebugProbe = evaluate_probe
+        self.tier_threshold = interpreter.tier_threshold
+        if self.breakpoints:
+            interpreter.tier_threshold = None
+        for line in self.breakpoints:
+            self.arm(line)
+
+    def stop(self, interpreter):
+        """Swap the probes back out and restore the interpreter after a debugged run."""
+        for line in self.positions:
+            self.disarm(line)
+        del interpreter.evaluate_DebugProbe
+        interpreter.tier_threshold = self.tier_threshold
+        self.interpreter = None
+        self.positions = None
+        self.stepping = False
+        self.mode = None
+        self.step_environments = []
+        self.step_ids = frozenset()
+
+    def arm(self, line):
+        for block, index in self.positions.get(line, ()):
+            if type(block[index]) is not DebugProbe:
+                block[index] = DebugProbe(block[index])
+
+    def disarm(self, line):
+        for block, index in self.positions.get(line, ()):
+            if type(block[index]) is DebugProbe:
+                block[index] = block[index].statement
+
+    def arm_all(self):
+        if not self.stepping:
+            self.stepping = True
+            for line in self.positions:
+                self.arm(line)
+
+    def disarm_all(self):
+        """Leave probes on breakpoint lines only."""
+        if self.stepping:
+            self.stepping = False
+            for line in self.positions:
+                if line not in self.breakpoints:
+                    self.disarm(line)
+
+    def pause_reason(self, statement):
+        """Why to pause before statement, or None to run on."""
+        if self.mode == 'step_into':
+            return 'step'
+        if self.mode is not None and id(self.interpreter.environment) in self.step_ids:
+            return 'step'
+        breakpoint = self.breakpoints.get(statement.lineno)
+        if breakpoint is None:
+            return None
+        if breakpoint.expression is not None:
+            try:
+                if not self.interpreter.evaluate(breakpoint.expression):
+                    return None
+            except Exception as e:
+                return f"breakpoint condition failed: {e}"
+        breakpoint.hits += 1
+        return 'breakpoint'
+
+    def pause(self, statement, reason):
+        frames = self.call_stack(statement)
+        command = self.on_pause(Pause(statement.lineno, reason, frames))
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown debugger command: {command!r}")
+        if command == 'quit':
+            raise DebuggerQuit()
+        environments = [frame.environment for frame in frames]
+        if command == 'step_out':
+            environments.pop()
+        if command == 'continue' or not environments:
+            self.mode = None
+            self.step_environments = []
+            self.step_ids = frozenset()
+            self.disarm_all()
+            return
+        self.mode = command
+        self.step_environments = environments
+        self.step_ids = frozenset(id(environment) for environment in environments)
+        self.arm_all()
+
+    def call_stack(self, statement):
+        """DebugFrames of the interpreted call stack, outermost first, paused before statement."""
+        call_code = Interpreter.call_function.__code__
+        frame = sys._getframe()
+        stack = interpreted_stack(frame, Interpreter.evaluate.__code__, call_code)
+        calls = []
+        while frame is not None:
+            if frame.f_code is call_code:
+                calls.append(frame)
+            frame = frame.f_back
+        # Each call keeps its caller's environment in old_env; the innermost one is current
+        environments = [call.f_locals['old_env'] for call in reversed(calls)]
+        environments.append(self.interpreter.environment)
+        frames = [DebugFrame(function, line, environment)
+                  for (function, line), environment in zip(stack, environments)]
+        frames[-1].line = statement.lineno
+        return frames
+
+def format_value(value):
+    if type(value) is StringBuilder:
+        value = value.value()
+    return repr(value)
+
+def format_pause(pause, source=None):
+    """Text report of a pause: the line and reason, then each frame, innermost first, with its
+    variables."""
+    source_lines = source.split('\n') if source is not None else []
+    code = source_lines[pause.line - 1].strip() if pause.line <= len(source_lines) else ""
+    lines = [f"Paused at line {pause.line} ({pause.reason})" + (f": {code}" if code else "")]
+    for frame in reversed(pause.frames):
+        lines.append(f"  {frame.function}, line {frame.line}:")
+        variables = frame.variables()
+        for name, value in variables.items():
+            lines.append(f"    {name} = {format_value(value)}")
+        if not variables:
+            lines.append("    no variables")
+    return "\n".join(lines)
@@ -0,0 +1,550 @@
+import ast
+import copy
+import operator
+import re
+import time
+
+from builtin_functions import BUILTINS, call_builtin
+from interpreter import ITERABLE_TYPES, SIZED_TYPES, contains, load_index, load_slice, store_index
+from typed_list import ListView, TypedList
+
+# Opcodes for the flat instruction array
+COPY = 0
+BINOP = 1
+UNOP = 2
+GOTO = 3
+IF_FALSE = 4
+IF_TRUE = 5
+NEXT = 6
+ITER = 7
+CALL = 8
+RETURN = 9
+PRINT = 10
+NEWLIST = 11
+APPEND = 12
+INDEX = 13
+STORE_INDEX = 14
+METHOD = 15
+LEN = 16
+RANGE = 17
+TRY = 18
+END_TRY = 19
+SKIP_FUNCTION = 20
+IF_COMPARE = 21
+NEWDICT = 22
+NEWSET = 23
+SLICE = 24
+
+# Sentinel returned by next() when a loop iterator is exhausted
+_exhausted = object()
+
+def _divide(left, right):
+    if right == 0:
+        raise Exception("Division by zero")
+    return left / right
+
+def _modulo(left, right):
+    if right == 0:
+        raise Exception("Modulo by zero")
+    return left % right
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': _divide,
+    '%': _modulo,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    'and': lambda left, right: left and right,
+    'or': lambda left, right: left or right,
+    'in': contains,
+    'not in': lambda left, right: not contains(left, right),
+}
+
+UNARY_OPERATORS = {
+    '-': operator.neg,
+    'not': operator.not_,
+}
+
+STRING_METHODS = {
+    'upper': str.upper,
+    'lower': str.lower,
+    'strip': str.strip,
+    'replace': str.replace,
+}
+
+def _dict_pop(d, key):
+    value = load_index(d, key)
+    del d[key]
+    return value
+
+def _set_remove(s, element):
+    if element not in s:
+        raise Exception(f"Element not found: {element!r}")
+    s.remove(element)
+
+LIST_METHODS = {
+    'append': list.append,
+    'pop': list.pop,
+    'extend': list.extend,
+}
+
+# Lists returned by builtins such as sorted() are TypedLists
+TYPED_LIST_METHODS = {
+    'append': TypedList.append,
+    'pop': TypedList.pop,
+    'extend': TypedList.extend,
+}
+
+# Slices of a TypedList; each mutating method copies the view's elements first
+LIST_VIEW_METHODS = {
+    'append': ListView.append,
+    'pop': ListView.pop,
+    'extend': ListView.extend,
+}
+
+DICT_METHODS = {
+    'get': dict.get,
+    'keys': lambda d: list(d),
+    'values': lambda d: list(d.values()),
+    'pop': _dict_pop,
+}
+
+SET_METHODS = {
+    'add': set.add,
+    'remove': _set_remove,
+}
+
+# Methods by receiver type; a METHOD instruction looks its method up when it runs
+METHODS = {str: STRING_METHODS, list: LIST_METHODS, TypedList: TYPED_LIST_METHODS,
+           ListView: LIST_VIEW_METHODS, dict: DICT_METHODS, set: SET_METHODS}
+
+LISTING_LINE = re.compile(r'^\s*\d+\s*\|\s?(.*)$')
+LABEL = re.compile(r'^(\w+):$')
+BINARY_EXPR = re.compile(r'^(\S+) (==|!=|<=|>=|<|>|\+|-|\*|/|%|and|or|not in|in) (\S+)$')
+UNARY_EXPR = re.compile(r'^(-|not) (\S+)$')
+CALL_EXPR = re.compile(r'^call (\w+)\((.*)\)$')
+METHOD_EXPR = re.compile(r'^(\w+)\.(\w+)\((.*)\)$')
+INDEX_EXPR = re.compile(r'^(\w+)\[(\S+)\]$')
+SLICE_EXPR = re.compile(r'^(\w+)\[(\w*):(\w*):(\w*)\]$')
+RANGE_EXPR = re.compile(r'^range\((.*)\)$')
+LEN_EXPR = re.compile(r'^len\((\S+)\)$')
+NEXT_EXPR = re.compile(r'^next (\w+) else goto (\w+)$')
+COMPARE_JUMP = re.compile(r'^(ifTrue|ifFalse) (\S+) (==|!=|<=|>=|<|>) (\S+) goto (\w+)$')
+
+def extract_icg_lines(listing):
+    """Pull the three-address instructions out of a numbered ICG listing ("  1 | t1 = 5")."""
+    code = []
+    for line in listing.split('\n'):
+        match = LISTING_LINE.match(line)
+        if match:
+            code.append(match.group(1).strip())
+    return code
+
+def parse_operand(text):
+    """Return (is_variable, value) for an instruction operand."""
+    text = text.strip()
+    try:
+        return False, ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return True, text
+
+def split_args(text):
+    """Split a call argument list, respecting quoted strings."""
+    args = []
+    current = ""
+    quote = None
+    for ch in text:
+        if quote:
+            current += ch
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+            current += ch
+        elif ch == ',':
+            args.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        args.append(current.strip())
+    return args
+
+class ICGProgram:
+    """Three-address code compiled to a flat instruction array with resolved jump targets."""
+    def __init__(self, instructions, source):
+        self.instructions = instructions
+        self.source = source
+
+def compile_icg(code_lines):
+    """Compile ICG instruction strings into an ICGProgram."""
+    labels = {}
+    instructions = []
+    pending_functions = []
+    fixups = []
+
+    def jump(label):
+        fixups.append((len(instructions), label))
+        return label
+
+    for line in code_lines:
+        # Commented-out lines (e.g. from the optimizer) are not executed
+        if not line or line.startswith('#'):
+            continue
+
+        match = LABEL.match(line)
+        if match:
+            labels[match.group(1)] = len(instructions)
+            continue
+
+        if line.startswith('function ') and line.endswith(':'):
+            # Binds the function when it runs, then jumps past the body
+            name = line[len('function '):-1].strip()
+            pending_functions.append(len(instructions))
+            instructions.append([SKIP_FUNCTION, None, name, len(instructions) + 1, []])
+            continue
+        if line.startswith('param '):
+            if pending_functions:
+                instructions[pending_functions[-1]][4].append(line[len('param '):].strip())
+            continue
+        if line.startswith('end function'):
+            if pending_functions:
+                instructions[pending_functions.pop()][1] = len(instructions)
+            continue
+
+        if line.startswith('goto '):
+            instructions.append([GOTO, jump(line[5:].strip())])
+            continue
+        match = COMPARE_JUMP.match(line)
+        if match:
+            left_var, left = parse_operand(match.group(2))
+            right_var, right = parse_operand(match.group(4))
+            instructions.append([IF_COMPARE, BINARY_OPERATORS[match.group(3)], left_var, left,
+                                 right_var, right, match.group(1) == 'ifTrue', jump(match.group(5))])
+            continue
+        if line.startswith('if ') and ' goto ' in line:
+            cond, label = line[3:].rsplit(' goto ', 1)
+            cond = cond.strip()
+            if cond.endswith('== False'):
+                is_var, value = parse_operand(cond[:-len('== False')])
+                instructions.append([IF_FALSE, is_var, value, jump(label.strip())])
+            else:
+                is_var, value = parse_operand(cond)
+                instructions.append([IF_TRUE, is_var, value, jump(label.strip())])
+            continue
+        if line.startswith('print '):
+            is_var, value = parse_operand(line[6:])
+            instructions.append([PRINT, is_var, value])
+            continue
+        if line == 'return' or line.startswith('return '):
+            is_var, value = parse_operand(line[6:] or 'None')
+            instructions.append([RETURN, is_var, value])
+            continue
+        if line.startswith('try '):
+            instructions.append([TRY, jump(line[4:].strip())])
+            continue
+        if line == 'endtry':
+            instructions.append([END_TRY])
+            continue
+        if line in ('break', 'continue'):
+            raise Exception(f"'{line}' outside loop")
+
+        match = re.match(r'^(\w+)\.append\((.*)\)$', line)
+        if match:
+            is_var, value = parse_operand(match.group(2))
+            instructions.append([APPEND, match.group(1), is_var, value])
+            continue
+
+        if '=' not in line:
+            raise Exception(f"Unknown instruction: {line}")
+        dest, expr = line.split('=', 1)
+        dest = dest.strip()
+        expr = expr.strip()
+
+        match = INDEX_EXPR.match(dest)
+        if match:
+            idx_var, idx = parse_operand(match.group(2))
+            val_var, val = parse_operand(expr)
+            instructions.append([STORE_INDEX, match.group(1), idx_var, idx, val_var, val])
+            continue
+
+        # Not constants: every execution creates a new container
+        if expr == '[]':
+            instructions.append([NEWLIST, dest])
+            continue
+        if expr == '{}':
+            instructions.append([NEWDICT, dest])
+            continue
+        if expr == 'set()':
+            instructions.append([NEWSET, dest])
+            continue
+        is_var, value = parse_operand(expr)
+        if not is_var:
+            instructions.append([COPY, dest, False, value])
+            continue
+        match = NEXT_EXPR.match(expr)
+        if match:
+            instructions.append([NEXT, dest, match.group(1), jump(match.group(2))])
+            continue
+        if expr.startswith('iter '):
+            is_var, value = parse_operand(expr[5:])
+            instructions.append([ITER, dest, is_var, value])
+            continue
+        match = CALL_EXPR.match(expr)
+        if match:
+            args = [parse_operand(arg) for arg in split_args(match.group(2))]
+            instructions.append([CALL, dest, match.group(1), args])
+            continue
+        match = RANGE_EXPR.match(expr)
+        if match:
+            args = [parse_operand(arg) for arg in split_args(match.group(1))]
+            instructions.append([RANGE, dest, args])
+            continue
+        match = LEN_EXPR.match(expr)
+        if match:
+            is_var, value = parse_operand(match.group(1))
+            instructions.append([LEN, dest, is_var, value])
+            continue
+        match = METHOD_EXPR.match(expr)
+        if match:
+            if not any(match.group(2) in methods for methods in METHODS.values()):
+                raise Exception(f"Unknown method: {match.group(2)}")
+            args = [parse_operand(arg) for arg in split_args(match.group(3))]
+            instructions.append([METHOD, dest, match.group(1), match.group(2), args])
+            continue
+        match = SLICE_EXPR.match(expr)
+        if match:
+            # An omitted bound is None
+            bounds = [parse_operand(bound) if bound else (False, None) for bound in match.group(2, 3, 4)]
+            instructions.append([SLICE, dest, match.group(1), bounds])
+            continue
+        match = INDEX_EXPR.match(expr)
+        if match:
+            idx_var, idx = parse_operand(match.group(2))
+            instructions.append([INDEX, dest, match.group(1), idx_var, idx])
+            continue
+        match = BINARY_EXPR.match(expr)
+        if match:
+            left_var, left = parse_operand(match.group(1))
+            right_var, right = parse_operand(match.group(3))
+            instructions.append([BINOP, dest, BINARY_OPERATORS[match.group(2)], left_var, left, right_var, right])
+            continue
+        match = UNARY_EXPR.match(expr)
+        if match:
+            is_var, value = parse_operand(match.group(2))
+            instructions.append([UNOP, dest, UNARY_OPERATORS[match.group(1)], is_var, value])
+            continue
+        is_var, value = parse_operand(expr)
+        instructions.append([COPY, dest, is_var, value])
+
+    # Resolve every jump to an instruction index
+    for index, label in fixups:
+        if label not in labels:
+            raise Exception(f"Undefined label: {label}")
+        ins = instructions[index]
+        ins[-1] = labels[label]
+
+    for start in pending_functions:
+        instructions[start][1] = len(instructions)
+
+    return ICGProgram([tuple(ins) for ins in instructions], code_lines)
+
+class ICGExecutor:
+    """Executor for intermediate code, running a flat instruction array without AST recursion."""
+    def __init__(self, max_steps=None):
+        self.max_steps = max_steps
+        self.steps = 0
+        self.output = []
+
+    def execute(self, icg_listing):
+        """Compile a numbered ICG listing (as produced by generate_icg) and run it."""
+        program = compile_icg(extract_icg_lines(icg_listing))
+        return self.run(program)
+
+    def run(self, program):
+        """Run a compiled ICGProgram. Printed values are collected in self.output."""
+        code = program.instructions
+        functions = {}   # name -> (start pc, params), bound as definitions run
+        output = self.output
+        max_steps = self.max_steps
+        env = {}
+        frames = []      # (return pc, destination, caller env)
+        handlers = []    # (except pc, frame depth)
+        pc = 0
+        end = len(code)
+        steps = 0
+
+        while True:
+            try:
+                while pc < end:
+                    ins = code[pc]
+                    op = ins[0]
+                    pc += 1
+                    steps += 1
+                    if op == BINOP:
+                        _, dest, fn, left_var, left, right_var, right = ins
+                        env[dest] = fn(env[left] if left_var else left, env[right] if right_var else right)
+                    elif op == COPY:
+                        env[ins[1]] = env[ins[3]] if ins[2] else ins[3]
+                    elif op == IF_FALSE:
+                        if not (env[ins[2]] if ins[1] else ins[2]):
+                            pc = ins[3]
+                    elif op == GOTO:
+                        pc = ins[1]
+                        if max_steps is not None and steps > max_steps:
+                            raise Exception("Step limit exceeded")
+                    elif op == NEXT:
+                        value = next(env[ins[2]], _exhausted)
+                        if value is _exhausted:
+                            pc = ins[3]
+                        else:
+                            env[ins[1]] = value
+                    elif op == IF_COMPARE:
+                        _, fn, left_var, left, right_var, right, when, target = ins
+                        if bool(fn(env[left] if left_var else left, env[right] if right_var else right)) is when:
+                            pc = target
+                    elif op == IF_TRUE:
+                        if env[ins[2]] if ins[1] else ins[2]:
+                            pc = ins[3]
+                    elif op == UNOP:
+                        env[ins[1]] = ins[2](env[ins[4]] if ins[3] else ins[4])
+                    elif op == INDEX:
+                        env[ins[1]] = load_index(env[ins[2]], env[ins[4]] if ins[3] else ins[4])
+                    elif op == SLICE:
+                        env[ins[1]] = load_slice(env[ins[2]], *[env[value] if is_var else value for is_var, value in ins[3]])
+                    elif op == CALL:
+                        _, dest, name, args = ins
+                        if name in functions:
+                            start, params = functions[name]
+                            if len(args) != len(params):
+                                raise Exception(f"{name}() takes {len(params)} arguments but {len(args)} were given")
+                            new_env = {}
+                            for param, (is_var, value) in zip(params, args):
+                                new_env[param] = env[value] if is_var else value
+                            frames.append((pc, dest, env))
+                            env = new_env
+                            pc = start
+                            if max_steps is not None and steps > max_steps:
+                                raise Exception("Step limit exceeded")
+                        elif name in BUILTINS:
+                            env[dest] = call_builtin(name, [env[value] if is_var else value for is_var, value in args])
+                        else:
+                            raise Exception(f"Undefined function: {name}")
+                    elif op == RETURN:
+                        value = env[ins[2]] if ins[1] else ins[2]
+                        if not frames:
+                            self.steps = steps
+                            return value
+                        pc, dest, env = frames.pop()
+                        while handlers and handlers[-1][1] > len(frames):
+                            handlers.pop()
+                        env[dest] = value
+                    elif op == PRINT:
+                        value = env[ins[2]] if ins[1] else ins[2]
+                        # Containers can change after printing; record what was printed
+                        output.append(copy.deepcopy(value) if isinstance(value, (list, TypedList, ListView, dict, set)) else value)
+                    elif op == ITER:
+                        iterable = env[ins[3]] if ins[2] else ins[3]
+                        if not isinstance(iterable, ITERABLE_TYPES):
+                            raise Exception(f"Cannot iterate over {type(iterable)}")
+                        env[ins[1]] = iter(iterable)
+                    elif op == NEWLIST:
+                        env[ins[1]] = []
+                    elif op == NEWDICT:
+                        env[ins[1]] = {}
+                    elif op == NEWSET:
+                        env[ins[1]] = set()
+                    elif op == APPEND:
+                        env[ins[1]].append(env[ins[3]] if ins[2] else ins[3])
+                    elif op == STORE_INDEX:
+                        store_index(env[ins[1]], env[ins[3]] if ins[2] else ins[3], env[ins[5]] if ins[4] else ins[5])
+                    elif op == LEN:
+                        value = env[ins[3]] if ins[2] else ins[3]
+                        if not isinstance(value, SIZED_TYPES):
+                            raise Exception(f"Cannot get length of {type(value)}")
+                        env[ins[1]] = len(value)
+                    elif op == METHOD:
+                        obj = env[ins[2]]
+                        method = METHODS.get(type(obj), {}).get(ins[3])
+                        if method is None:
+                            raise Exception(f"Cannot call {ins[3]}() on {type(obj)}")
+                        args = [env[value] if is_var else value for is_var, value in ins[4]]
+                        env[ins[1]] = method(obj, *args)
+                    elif op == RANGE:
+                        args = [env[value] if is_var else value for is_var, value in ins[2]]
+                        start, stop, step = (args + [None, None, None])[:3]
+                        start = 0 if start is None else start
+                        step = 1 if step is None else step
+                        if not all(isinstance(x, int) for x in [start, stop, step]):
+                            raise Exception("Range arguments must be integers")
+                        env[ins[1]] = range(start, stop, step)
+                    elif op == TRY:
+                        handlers.append((ins[1], len(frames)))
+                    elif op == END_TRY:
+                        handlers.pop()
+                    elif op == SKIP_FUNCTION:
+                        functions[ins[2]] = (ins[3], ins[4])
+                        pc = ins[1]
+                self.steps = steps
+                return None
+            except Exception as e:
+                # Methods and builtins raise their own errors, so a KeyError is a missing name
+                if isinstance(e, KeyError):
+                    e = Exception(f"Undefined variable or function: {e.args[0]}")
+                if not handlers or str(e) == "Step limit exceeded":
+                    self.steps = steps
+                    raise e
+                # Unwind to the frame that installed the innermost handler
+                pc, depth = handlers.pop()
+                while len(frames) > depth:
+                    _, _, env = frames.pop()
+
+def run_icg_listing(icg_listing, max_steps=1000000):
+    """Run an ICG listing and return (output, steps, seconds, error)."""
+    executor = ICGExecutor(max_steps=max_steps)
+    try:
+        program = compile_icg(extract_icg_lines(icg_listing))
+    except Exception as e:
+        return [], 0, 0.0, str(e)
+    start = time.perf_counter()
+    error = None
+    try:
+        executor.run(program)
+    except Exception as e:
+        error = str(e)
+    elapsed = time.perf_counter() - start
+    return executor.output, executor.steps, elapsed, error
+
+def compare_icg_runs(icg_code, optimized_code, max_steps=1000000):
+    """Execute the ICG before and after optimization and report the runtime effect."""
+    before = run_icg_listing(icg_code, max_steps)
+    after = run_icg_listing(optimized_code, max_steps)
+
+    output = []
+    output.append("Runtime Measurement (ICG Executor):")
+    output.append("==================================")
+    for title, (values, steps, elapsed, error) in (("Original ICG", before), ("Optimized ICG", after)):
+        output.append(f"{title}:")
+        output.append(f"  • Instructions executed: {steps}")
+        output.append(f"  • Execution time: {elapsed * 1000:.3f} ms")
+        if error:
+            output.append(f"  • ❌ Error: {error}")
+        else:
+            output.append(f"  • Printed values: {len(values)}")
+
+    if before[3] is None and after[3] is None:
+        if before[0] == after[0]:
+            output.append("✅ Optimized code produces the same output.")
+        else:
+            output.append("❌ Optimized code produces different output!")
+        if before[1]:
+            saved = before[1] - after[1]
+            output.append(f"• Instructions saved: {saved} ({saved * 100 / before[1]:.1f}%)")
+
+    return "\n".join(output)
@@ -1,14 +1,202 @@
+import time
+
 from ast_nodes import *
+from builtin_functions import call_builtin
+from typed_list import ListView, TypedList, make_list, type_name
+
+class StringBuilder:
+    """String value of a variable built by repeated `s = s + ...`.
+
+    Appends add a part in amortized O(1); the parts are joined into a Python str only when the
+    variable is read (printed, indexed, compared, passed to a method or function, ...).
+    """
+    __slots__ = ('parts',)
+
+    def __init__(self, text):
+        self.parts = [text]
+
+    def append(self, text):
+        self.parts.append(text)
+
+    def value(self):
+        if len(self.parts) > 1:
+            self.parts = [''.join(self.parts)]
+        return self.parts[0]
+
+    # Fast paths that read the environment directly compare and add builders like strings
+    def __str__(self):
+        return self.value()
+
+    def __eq__(self, other):
+        return self.value() == other
+
+    def __ne__(self, other):
+        return self.value() != other
+
+    def __lt__(self, other):
+        return self.value() < other
+
+    def __le__(self, other):
+        return self.value() <= other
+
+    def __gt__(self, other):
+        return self.value() > other
+
+    def __ge__(self, other):
+        return self.value() >= other
+
+    def __add__(self, other):
+        return self.value() + other
+
+    def __radd__(self, other):
+        return other + self.value()
+
+    __hash__ = None
+
+# Values a for loop can iterate over (and extend a list with), and values len() accepts
+ITERABLE_TYPES = (range, list, TypedList, ListView, tuple, dict, set)
+SIZED_TYPES = (list, TypedList, ListView, tuple, str, range, dict, set)
+
+def check_hashable(value):
+    """Raise the interpreter's error for a value that cannot be a dict key or set element."""
+    try:
+        hash(value)
+    except TypeError:
+        raise Exception(f"Unhashable type: {type_name(value)}")
+
+def load_index(container, index):
+    """container[index]: a key lookup for dicts, a non-negative int index for lists, tuples and strings."""
+    if isinstance(container, dict):
+        check_hashable(index)
+        if index not in container:
+            raise Exception(f"Key not found: {index!r}")
+        return container[index]
+    if type(container) is TypedList:
+        container = container.items
+    elif not isinstance(container, (list, ListView, tuple, str)):
+        raise Exception(f"Cannot index {type(container)}")
+    if not isinstance(index, int):
+        raise Exception("Index must be an integer")
+    if index < 0 or index >= len(container):
+        raise Exception("Index out of range")
+    return container[index]
+
+def store_index(container, index, value):
+    """container[index] = value for dicts (any hashable key) and lists (an existing index)."""
+    if isinstance(container, dict):
+        check_hashable(index)
+        container[index] = value
+        return
+    if not isinstance(container, (list, TypedList, ListView)):
+        raise Exception(f"Cannot assign to index of {type(container)}")
+    if not isinstance(index, int):
+        raise Exception("Index must be an integer")
+    if index < 0 or index >= len(container):
+        raise Exception("Index out of range")
+    container[index] = value
+
+def load_slice(container, start, stop, step):
+    """container[start:stop:step] with Python's slice rules; slicing a list returns a ListView sharing its storage."""
+    for bound in (start, stop, step):
+        if bound is not None and not isinstance(bound, int):
+            raise Exception("Slice indices must be integers")
+    if step == 0:
+        raise Exception("Slice step cannot be zero")
+    if not isinstance(container, (list, TypedList, ListView, tuple, str, range)):
+        raise Exception(f"Cannot slice {type(container)}")
+    return container[start:stop:step]
+
+def contains(item, container):
+    """`item in container`; a hash lookup for dicts and sets, a scan for lists."""
+    if isinstance(container, (dict, set)):
+        check_hashable(item)
+    elif isinstance(container, str):
+        if not isinstance(item, str):
+            raise Exception(f"'in <string>' requires a string, not {type(item).__name__}")
+    elif not isinstance(container, (list, TypedList, ListView, tuple, range)):
+        raise Exception(f"Cannot test membership in {type(container)}")
+    return item in container
+
+def make_set(elements):
+    """Set of evaluated elements, checking each can be hashed."""
+    for element in elements:
+        check_hashable(element)
+    return set(elements)
+
+# How a call site gets each argument: a literal's value, a variable read from the environment,
+# or any other expression evaluated
+CONSTANT_ARGUMENT = 0
+NAME_ARGUMENT = 1
+EXPRESSION_ARGUMENT = 2
+
+class CallSite:
+    """A call site's callee, resolved and arity-checked once, and its argument binding plan.
+
+    arguments holds (kind, value, node) per argument in call order: literals keep their value and
+    variables their name, so that only other expressions go through evaluate on each call.
+    """
+    __slots__ = ('func', 'arguments')
+
+    def __init__(self, func, args):
+        self.func = func
+        arguments = []
+        for arg in args:
+            if type(arg) in (Number, String, Boolean):
+                arguments.append((CONSTANT_ARGUMENT, arg.value, arg))
+            elif type(arg) is Identifier:
+                arguments.append((NAME_ARGUMENT, arg.name, arg))
+            else:
+                arguments.append((EXPRESSION_ARGUMENT, None, arg))
+        self.arguments = tuple(arguments)
 
 class Interpreter:
-    """Interpreter for the custom AST."""
-    def __init__(self):
+    """Interpreter for the custom AST.
+
+    With tier_threshold set, function bodies and loops are counted as they run (calls and
+    iterations) and compiled to closures once a region reaches the threshold; see
+    closure_compiler.format_tier_report for the tier-up events and time spent in each tier.
+
+    With profile=True, execute() records calls and time per node type, source line and function
+    in self.profiler; see profiler.format_profile_report and Profiler.to_json.
+
+    With sample_interval set (in seconds), execute() samples the interpreted call stack from a
+    background thread at that interval into self.sampler; see profiler.format_sample_report and
+    SamplingProfiler.collapsed for flamegraph input.
+
+    With coverage=True, execute() counts the runs of each source line and the true and false
+    outcomes of each if and while condition into self.coverage, adding up over runs; see
+    code_coverage.format_coverage_report and Coverage.merge.
+
+    With a debugger (a debugger.Debugger), execute() pauses at its breakpoints and steps, calling
+    back for each pause with the call stack and variables.
+    """
+    def __init__(self, tier_threshold=None, profile=False, sample_interval=None, coverage=False,
+                 debugger=None):
         self.environment = {}
         self.functions = {}
         self.return_value = None
+        self.returning = False
         self.in_loop = False
         self.break_loop = False
         self.continue_loop = False
+        self.deoptimizations = 0
+        self.call_sites = {}
+        self.tier_threshold = tier_threshold
+        self.regions = {}
+        self.tier_events = []
+        self.profiler = None
+        if profile:
+            from profiler import Profiler
+            self.profiler = Profiler()
+        self.sampler = None
+        if sample_interval is not None:
+            from profiler import SamplingProfiler
+            self.sampler = SamplingProfiler(sample_interval)
+        self.coverage = None
+        if coverage:
+            from code_coverage import Coverage
+            self.coverage = Coverage()
+        self.debugger = debugger
 
     def evaluate(self, node):
         """Evaluate an AST node."""
@@ -20,6 +208,15 @@ class Interpreter:
         method = getattr(self, method_name, self.generic_evaluate)
         return method(node)
 
+    def execute_block(self, statements):
+        """Execute a block of statements, stopping early at return, break or continue."""
+        result = None
+        for statement in statements:
+            result = self.evaluate(statement)
+            if self.returning or self.break_loop or self.continue_loop:
+                break
+        return result
+
     def generic_evaluate(self, node):
         raise Exception(f'No evaluate_{node.__class__.__name__} method')
 
@@ -34,46 +231,89 @@ class Interpreter:
 
     def evaluate_Identifier(self, node):
         if node.name in self.environment:
-            return self.environment[node.name]
+            value = self.environment[node.name]
+            if type(value) is StringBuilder:
+                return value.value()
+            return value
         elif node.name in self.functions:
             return self.functions[node.name]
         raise Exception(f"Undefined variable or function: {node.name}")
 
     def evaluate_BinaryOp(self, node):
         left = self.evaluate(node.left)
+        # and/or only evaluate the right operand when the left one does not decide the result
+        if node.op == 'and':
+            return self.evaluate(node.right) if left else left
+        if node.op == 'or':
+            return left if left else self.evaluate(node.right)
         right = self.evaluate(node.right)
-        if node.op == '+':
+        return self.binary_operation(node.op, left, right)
+
+    def evaluate_TypedBinaryOp(self, node):
+        # Variables and literals are read directly instead of going through evaluate()
+        left, right = node.left, node.right
+        if type(left) is Identifier and left.name in self.environment:
+            left = self.environment[left.name]
+        elif type(left) is Number:
+            left = left.value
+        else:
+            left = self.evaluate(left)
+        if type(right) is Identifier and right.name in self.environment:
+            right = self.environment[right.name]
+        elif type(right) is Number:
+            right = right.value
+        else:
+            right = self.evaluate(right)
+        if type(left) is node.left_type and type(right) is node.right_type:
+            return node.operation(left, right)
+        if type(left) is StringBuilder or type(right) is StringBuilder:
+            left = left.value() if type(left) is StringBuilder else left
+            right = right.value() if type(right) is StringBuilder else right
+            if type(left) is node.left_type and type(right) is node.right_type:
+                return node.operation(left, right)
+        # The inferred types were wrong: turn the node back into a generic BinaryOp for good
+        node.__class__ = BinaryOp
+        self.deoptimizations += 1
+        return self.binary_operation(node.op, left, right)
+
+    def binary_operation(self, op, left, right):
+        """Apply a binary operator to evaluated operands, checking the operator at runtime."""
+        if op == '+':
             return left + right
-        elif node.op == '-':
+        elif op == '-':
             return left - right
-        elif node.op == '*':
+        elif op == '*':
             return left * right
-        elif node.op == '/':
+        elif op == '/':
             if right == 0:
                 raise Exception("Division by zero")
             return left / right
-        elif node.op == '%':
+        elif op == '%':
             if right == 0:
                 raise Exception("Modulo by zero")
             return left % right
-        elif node.op == '==':
+        elif op == '==':
             return left == right
-        elif node.op == '!=':
+        elif op == '!=':
             return left != right
-        elif node.op == '<':
+        elif op == '<':
             return left < right
-        elif node.op == '>':
+        elif op == '>':
             return left > right
-        elif node.op == '<=':
+        elif op == '<=':
             return left <= right
-        elif node.op == '>=':
+        elif op == '>=':
             return left >= right
-        elif node.op == 'and':
+        elif op == 'and':
             return left and right
-        elif node.op == 'or':
+        elif op == 'or':
             return left or right
+        elif op == 'in':
+            return contains(left, right)
+        elif op == 'not in':
+            return not contains(left, right)
         else:
-            raise Exception(f"Unknown operator: {node.op}")
+            raise Exception(f"Unknown operator: {op}")
 
     def evaluate_UnaryOp(self, node):
         expr = self.evaluate(node.expr)
@@ -85,10 +325,88 @@ class Interpreter:
             raise Exception(f"Unknown unary operator: {node.op}")
 
     def evaluate_Assign(self, node):
-        value = self.evaluate(node.value)
-        self.environment[node.name.name] = value
+        expr = node.expr
+        name = node.name.name
+        if (isinstance(expr, BinaryOp) and expr.op == '+' and type(expr.left) is Identifier
+                and expr.left.name == name):
+            current = self.environment.get(name)
+            if type(current) is str or type(current) is StringBuilder:
+                return self.concat_in_place(name, current, self.evaluate(expr.right))
+        value = self.evaluate(expr)
+        self.environment[name] = value
         return value
 
+    def concat_in_place(self, name, current, right):
+        """`name = name + right` for a string variable: append to a StringBuilder instead of copying."""
+        if type(right) is not str:
+            # Not a string append (e.g. str + int): the generic operator gives the usual result or error
+            if type(current) is StringBuilder:
+                current = current.value()
+            value = self.binary_operation('+', current, right)
+            self.environment[name] = value
+            return value
+        if type(current) is str:
+            current = StringBuilder(current)
+            self.environment[name] = current
+        current.append(right)
+        return current
+
+    def evaluate_IncrementAssign(self, node):
+        node.hits += 1
+        env = self.environment
+        name = node.name.name
+        operand = node.operand
+        if name in env and (type(operand) is not Identifier or operand.name in env):
+            value = env[operand.name] if type(operand) is Identifier else operand.value
+            current = env[name]
+            if node.op == '+' and (type(current) is str or type(current) is StringBuilder):
+                return self.concat_in_place(name, current, value.value() if type(value) is StringBuilder else value)
+            value = current + value if node.op == '+' else current - value
+            env[name] = value
+            return value
+        # Undefined names: let the generic path raise the usual error
+        return self.evaluate_Assign(node)
+
+    def evaluate_FusedCompare(self, node):
+        node.hits += 1
+        return self.fused_compare(node)
+
+    def fused_compare(self, node):
+        env = self.environment
+        left = node.left.name
+        if left in env:
+            if node.right_name is None:
+                return node.compare(env[left], node.constant)
+            if node.right_name in env:
+                return node.compare(env[left], env[node.right_name])
+        return self.evaluate_BinaryOp(node)
+
+    def evaluate_CompareBranch(self, node):
+        node.hits += 1
+        if self.fused_compare(node.condition):
+            return self.execute_block(node.if_body)
+        elif node.else_body:
+            return self.execute_block(node.else_body)
+        return None
+
+    def evaluate_CompareWhileLoop(self, node):
+        if self.tier_threshold is not None:
+            return self.run_tiered_loop(node)
+        outer_in_loop = self.in_loop
+        self.in_loop = True
+        result = None
+        while self.fused_compare(node.condition):
+            node.hits += 1
+            result = self.execute_block(node.body)
+            if self.break_loop:
+                self.break_loop = False
+                break
+            self.continue_loop = False
+            if self.returning:
+                break
+        self.in_loop = outer_in_loop
+        return result
+
     def evaluate_Print(self, node):
         value = self.evaluate(node.expr)
         print(value)
@@ -97,75 +415,207 @@ class Interpreter:
     def evaluate_IfElse(self, node):
         condition = self.evaluate(node.condition)
         if condition:
-            return self.evaluate(node.if_body)
+            return self.execute_block(node.if_body)
         elif node.else_body:
-            return self.evaluate(node.else_body)
+            return self.execute_block(node.else_body)
         return None
 
     def evaluate_WhileLoop(self, node):
+        if self.tier_threshold is not None:
+            return self.run_tiered_loop(node)
+        outer_in_loop = self.in_loop
         self.in_loop = True
         result = None
         while self.evaluate(node.condition):
+            result = self.execute_block(node.body)
             if self.break_loop:
                 self.break_loop = False
                 break
-            if self.continue_loop:
-                self.continue_loop = False
-                continue
-            result = self.evaluate(node.body)
-        self.in_loop = False
+            self.continue_loop = False
+            if self.returning:
+                break
+        self.in_loop = outer_in_loop
         return result
 
     def evaluate_ForLoop(self, node):
+        if self.tier_threshold is not None:
+            return self.run_tiered_loop(node)
+        outer_in_loop = self.in_loop
         self.in_loop = True
         result = None
         iterable = self.evaluate(node.iterable)
-        if isinstance(iterable, range):
-            for i in iterable:
-                if self.break_loop:
-                    self.break_loop = False
-                    break
-                if self.continue_loop:
-                    self.continue_loop = False
-                    continue
-                self.environment[node.var.name] = i
-                result = self.evaluate(node.body)
-        elif isinstance(iterable, (list, tuple)):
-            for item in iterable:
-                if self.break_loop:
-                    self.break_loop = False
-                    break
-                if self.continue_loop:
-                    self.continue_loop = False
-                    continue
-                self.environment[node.var.name] = item
-                result = self.evaluate(node.body)
-        else:
+        if not isinstance(iterable, ITERABLE_TYPES):
             raise Exception(f"Cannot iterate over {type(iterable)}")
-        self.in_loop = False
+        for item in iterable:
+            self.environment[node.var.name] = item
+            result = self.execute_block(node.body)
+            if self.break_loop:
+                self.break_loop = False
+                break
+            self.continue_loop = False
+            if self.returning:
+                break
+        self.in_loop = outer_in_loop
         return result
 
+    def evaluate_VectorizedLoop(self, node):
+        from vectorizer import run_vectorized
+        if run_vectorized(node, self.environment):
+            return None
+        return self.evaluate_ForLoop(node)
+
     def evaluate_FunctionDef(self, node):
-        self.functions[node.name] = node
+        self.define_function(node)
         return None
 
+    def define_function(self, node):
+        """Bind a function name; replacing an existing definition invalidates the call-site caches."""
+        if self.functions.get(node.name) is not node:
+            if node.name in self.functions:
+                self.call_sites.clear()
+            self.functions[node.name] = node
+
     def evaluate_FunctionCall(self, node):
-        if node.name not in self.functions:
-            raise Exception(f"Undefined function: {node.name}")
-        func = self.functions[node.name]
+        site = self.lookup_function(node)
+        env = self.environment
+        args = []
+        for kind, value, arg in site.arguments:
+            if kind == CONSTANT_ARGUMENT:
+                args.append(value)
+            elif kind == NAME_ARGUMENT and value in env:
+                value = env[value]
+                args.append(value.value() if type(value) is StringBuilder else value)
+            else:
+                # Other expressions, and names that are not variables (a function, or undefined)
+                args.append(self.evaluate(arg))
+        return self.call_function(site.func, args)
+
+    def evaluate_BuiltinCall(self, node):
+        name = node.name.name
+        if name in self.functions:
+            return self.evaluate_FunctionCall(node)
+        return call_builtin(name, [self.evaluate(arg) for arg in node.args])
+
+    def lookup_function(self, node):
+        """CallSite of a call, resolved and arity-checked on the first call and then cached."""
+        site = self.call_sites.get(node)
+        if site is None:
+            site = self.call_sites[node] = self.resolve_call(node)
+        return site
+
+    def resolve_call(self, node):
+        name = node.name.name if isinstance(node.name, Identifier) else node.name
+        if name not in self.functions:
+            raise Exception(f"Undefined function: {name}")
+        func = self.functions[name]
         if not isinstance(func, FunctionDef):
-            raise Exception(f"{node.name} is not a function")
-        old_env = self.environment.copy()
-        self.environment = {}
-        args = [self.evaluate(arg) for arg in node.args]
-        for param, arg in zip(func.params, args):
-            self.environment[param.name] = arg
-        result = self.evaluate(func.body)
-        self.environment = old_env
+            raise Exception(f"{name} is not a function")
+        if len(node.args) != len(func.params):
+            raise Exception(f"{name}() takes {len(func.params)} arguments but {len(node.args)} were given")
+        return CallSite(func, node.args)
+
+    def call_function(self, func, args):
+        """Run a function body in a fresh environment and return its return value."""
+        old_env = self.environment
+        old_in_loop = self.in_loop
+        self.environment = dict(zip(func.params, args))
+        self.in_loop = False
+        try:
+            if self.tier_threshold is not None:
+                self.run_tiered_function(func)
+            else:
+                self.execute_block(func.body)
+            result = self.return_value if self.returning else None
+        finally:
+            self.returning = False
+            self.return_value = None
+            self.environment = old_env
+            self.in_loop = old_in_loop
         return result
 
+    # ---------- Tiered execution ----------
+
+    def hot_region(self, node):
+        """Profile of a function body or loop, compiled once its count reaches tier_threshold."""
+        region = self.regions.get(node)
+        if region is None:
+            from closure_compiler import RegionProfile
+            region = self.regions[node] = RegionProfile(node)
+        if region.code is None and region.count >= self.tier_threshold:
+            from closure_compiler import compile_region
+            compile_region(self, region)
+            self.tier_events.append({'region': region.name, 'executions': region.count,
+                                     'compile_time': region.compile_time})
+        return region
+
+    def run_compiled(self, region, *args):
+        """Run a region's compiled code (or, given an iterator, resume its for loop)."""
+        from closure_compiler import RETURN
+        code = region.resume if args else region.code
+        outer_in_loop = self.in_loop
+        self.in_loop = not isinstance(region.node, FunctionDef)
+        start = time.perf_counter()
+        signal = code(self.environment, *args)
+        region.compiled_time += time.perf_counter() - start
+        self.in_loop = outer_in_loop
+        if signal == RETURN:
+            self.returning = True
+
+    def run_tiered_function(self, func):
+        region = self.hot_region(func)
+        if region.code is not None:
+            return self.run_compiled(region)
+        region.count += 1
+        start = time.perf_counter()
+        self.execute_block(func.body)
+        region.interpreted_time += time.perf_counter() - start
+
+    def run_tiered_loop(self, node):
+        """Interpret a loop, counting iterations and switching to compiled code mid-loop when hot."""
+        region = self.hot_region(node)
+        if region.code is not None:
+            return self.run_compiled(region)
+        if isinstance(node, ForLoop):
+            iterable = self.evaluate(node.iterable)
+            if not isinstance(iterable, ITERABLE_TYPES):
+                raise Exception(f"Cannot iterate over {type(iterable)}")
+            iterator = iter(iterable)
+        outer_in_loop = self.in_loop
+        self.in_loop = True
+        hot = False
+        start = time.perf_counter()
+        while True:
+            if isinstance(node, ForLoop):
+                item = next(iterator, StopIteration)
+                if item is StopIteration:
+                    break
+                self.environment[node.var.name] = item
+            elif not self.evaluate(node.condition):
+                break
+            self.execute_block(node.body)
+            if self.break_loop:
+                self.break_loop = False
+                break
+            self.continue_loop = False
+            if self.returning:
+                break
+            region.count += 1
+            if region.count >= self.tier_threshold:
+                hot = True
+                break
+        self.in_loop = outer_in_loop
+        region.interpreted_time += time.perf_counter() - start
+        if hot:
+            self.hot_region(node)
+            if isinstance(node, ForLoop):
+                self.run_compiled(region, iterator)
+            else:
+                self.run_compiled(region)
+        return None
+
     def evaluate_Return(self, node):
         self.return_value = self.evaluate(node.expr)
+        self.returning = True
         return self.return_value
 
     def evaluate_Break(self, node):
@@ -181,33 +631,51 @@ class Interpreter:
         return None
 
     def evaluate_ListNode(self, node):
-        return [self.evaluate(elem) for elem in node.elements]
+        return make_list([self.evaluate(elem) for elem in node.elements])
+
+    def evaluate_DictNode(self, node):
+        result = {}
+        for key, value in zip(node.keys, node.values):
+            store_index(result, self.evaluate(key), self.evaluate(value))
+        return result
+
+    def evaluate_SetNode(self, node):
+        return make_set([self.evaluate(elem) for elem in node.elements])
 
     def evaluate_IndexNode(self, node):
-        lst = self.evaluate(node.expr)
-        idx = self.evaluate(node.index)
-        if not isinstance(lst, (list, tuple, str)):
-            raise Exception(f"Cannot index {type(lst)}")
-        if not isinstance(idx, int):
-            raise Exception("Index must be an integer")
-        if idx < 0 or idx >= len(lst):
-            raise Exception("Index out of range")
-        return lst[idx]
+        return load_index(self.evaluate(node.expr), self.evaluate(node.index))
+
+    def evaluate_SliceNode(self, node):
+        container = self.evaluate(node.expr)
+        bounds = [None if part is None else self.evaluate(part) for part in (node.start, node.stop, node.step)]
+        return load_slice(container, *bounds)
+
+    def evaluate_ListAssign(self, node):
+        # Like Python, the value is evaluated before the list (or dict) and the index
+        value = self.evaluate(node.value)
+        store_index(self.evaluate(node.expr), self.evaluate(node.index), value)
+        return value
 
     def evaluate_TryExcept(self, node):
         try:
-            return self.evaluate(node.try_body)
+            return self.execute_block(node.try_body)
         except Exception:
-            return self.evaluate(node.except_body)
+            return self.execute_block(node.except_body)
 
     def evaluate_LenFunction(self, node):
         expr = self.evaluate(node.expr)
-        if not isinstance(expr, (list, tuple, str)):
+        if not isinstance(expr, SIZED_TYPES):
             raise Exception(f"Cannot get length of {type(expr)}")
         return len(expr)
 
     def evaluate_StringMethod(self, node):
         string_obj = self.evaluate(node.string_obj)
+        if isinstance(string_obj, (list, TypedList, ListView)):
+            return self.list_method(string_obj, node.method, [self.evaluate(arg) for arg in node.args])
+        if isinstance(string_obj, dict):
+            return self.dict_method(string_obj, node.method, [self.evaluate(arg) for arg in node.args])
+        if isinstance(string_obj, set):
+            return self.set_method(string_obj, node.method, [self.evaluate(arg) for arg in node.args])
         if not isinstance(string_obj, str):
             raise Exception(f"Cannot call string method on {type(string_obj)}")
         args = [self.evaluate(arg) for arg in node.args]
@@ -222,6 +690,60 @@ class Interpreter:
         else:
             raise Exception(f"Unknown string method: {node.method}")
 
+    def list_method(self, lst, method, args):
+        """append/pop/extend on a list, in place; Python lists grow in amortized O(1) per element."""
+        if method == 'append' and len(args) == 1:
+            lst.append(args[0])
+            return None
+        elif method == 'extend' and len(args) == 1:
+            if not isinstance(args[0], ITERABLE_TYPES):
+                raise Exception(f"Cannot extend a list with {type(args[0])}")
+            lst.extend(args[0])
+            return None
+        elif method == 'pop' and len(args) <= 1:
+            if not lst:
+                raise Exception("Pop from empty list")
+            if not args:
+                return lst.pop()
+            if not isinstance(args[0], int):
+                raise Exception("Index must be an integer")
+            if args[0] < 0 or args[0] >= len(lst):
+                raise Exception("Index out of range")
+            return lst.pop(args[0])
+        else:
+            raise Exception(f"Unknown list method: {method}")
+
+    def dict_method(self, d, method, args):
+        """get/keys/values/pop on a dict; keys() and values() return lists."""
+        if method == 'get' and len(args) in (1, 2):
+            check_hashable(args[0])
+            return d.get(args[0], args[1] if len(args) == 2 else None)
+        elif method == 'keys' and not args:
+            return list(d)
+        elif method == 'values' and not args:
+            return list(d.values())
+        elif method == 'pop' and len(args) == 1:
+            value = load_index(d, args[0])
+            del d[args[0]]
+            return value
+        else:
+            raise Exception(f"Unknown dict method: {method}")
+
+    def set_method(self, s, method, args):
+        """add/remove on a set, in place."""
+        if method == 'add' and len(args) == 1:
+            check_hashable(args[0])
+            s.add(args[0])
+            return None
+        elif method == 'remove' and len(args) == 1:
+            check_hashable(args[0])
+            if args[0] not in s:
+                raise Exception(f"Element not found: {args[0]!r}")
+            s.remove(args[0])
+            return None
+        else:
+            raise Exception(f"Unknown set method: {method}")
+
     def evaluate_RangeCall(self, node):
         start = self.evaluate(node.start) if node.start is not None else 0
         stop = self.evaluate(node.stop) if node.stop is not None else None
@@ -235,14 +757,55 @@ class Interpreter:
         result = None
         for statement in statements:
             result = self.evaluate(statement)
-            if self.return_value is not None:
+            if self.returning:
                 return self.return_value
-        return result
+        return self.finish(result)
 
-    def execute(self, code):
-        """Execute code by parsing and interpreting it."""
+    def finish(self, result):
+        """Turn the string builders left in the environment, and the result, into plain strings."""
+        for name, value in self.environment.items():
+            if type(value) is StringBuilder:
+                self.environment[name] = value.value()
+        return result.value() if type(result) is StringBuilder else result
+
+    def execute(self, code, optimize=False, specialize=False, fuse=False, vectorize=False):
+        """Execute code by parsing and interpreting it.
+
+        With optimize=True the AST optimizer runs as a pre-pass before interpretation. With
+        specialize=True, arithmetic on operands of statically inferred types uses typed nodes.
+        With fuse=True, common statement shapes are rewritten into superinstructions. With
+        vectorize=True, element-wise map and reduction loops run on whole lists at once.
+        """
         from myparser import parser
-        ast = parser.parse(code)
+        ast = parser.parse(code, tracking=True)
         if ast is None:
             raise Exception("Failed to parse code")
-        return self.interpret(ast)
+        if optimize:
+            from optimizer import optimize_ast
+            ast, _ = optimize_ast(ast)
+        if specialize:
+            from type_inference import specialize_types
+            ast, _ = specialize_types(ast)
+        if fuse:
+            from superinstructions import fuse_superinstructions
+            ast, _ = fuse_superinstructions(ast)
+        if vectorize:
+            from vectorizer import vectorize_loops
+            ast, _ = vectorize_loops(ast)
+        if self.coverage is not None:
+            self.coverage.start(self, ast)
+        if self.debugger is not None:
+            self.debugger.start(self, ast)
+        if self.sampler is not None:
+            self.sampler.start()
+        try:
+            if self.profiler is not None:
+                return self.profiler.run(self, ast)
+            return self.interpret(ast)
+        finally:
+            if self.debugger is not None:
+                self.debugger.stop(self)
+            if self.coverage is not None:
+                self.coverage.stop(self)
+            if self.sampler is not None:
+                self.sampler.stop()
@@ -16,6 +16,8 @@ tokens = (
     'RPAREN',
     'LBRACKET',
     'RBRACKET',
+    'LBRACE',
+    'RBRACE',
     'COLON',
     'COMMA',
     'DOT',
@@ -44,7 +46,9 @@ tokens = (
     'PRINT',
     'LEN',
     'RANGE',
-    'NEWLINE'
+    'NEWLINE',
+    'INDENT',
+    'DEDENT'
 )
 
 # Regular expression rules for simple tokens
@@ -58,6 +62,8 @@ t_LPAREN = r'\('
 t_RPAREN = r'\)'
 t_LBRACKET = r'\['
 t_RBRACKET = r'\]'
+t_LBRACE = r'\{'
+t_RBRACE = r'\}'
 t_COLON = r':'
 t_COMMA = r','
 t_DOT = r'\.'
@@ -93,21 +99,13 @@ reserved = {
 
 # Track indentation
 indent_stack = [0]
+pending_tokens = []
 
 def t_NEWLINE(t):
-    r'\n+'
+    r'\n[ \t\n]*'
     t.lexer.lineno += t.value.count('\n')
     return t
 
-# Add a function to handle end of file
-def t_eof(t):
-    # Generate DEDENT tokens for any remaining indentation levels
-    while len(indent_stack) > 1:
-        indent_stack.pop()
-        t.type = 'DEDENT'
-        return t
-    return None
-
 # Regular expression rules with some action code
 def t_NUMBER(t):
     r'\d+'
@@ -115,7 +113,7 @@ def t_NUMBER(t):
     return t
 
 def t_STRING(t):
-    r'"[^"\\](\\.[^"\\])"|\'[^\'\\](\\.[^\'\\])\''
+    r'"[^"\\]*(\\.[^"\\]*)*"|\'[^\'\\]*(\\.[^\'\\]*)*\''
     # Remove quotes and handle escape sequences
     t.value = t.value[1:-1].encode().decode('unicode_escape')
     return t
@@ -136,6 +134,51 @@ def t_error(t):
 # Build the lexer
 lexer = lex.lex()
 
+def make_token(type_, value, lineno, lexpos):
+    tok = lex.LexToken()
+    tok.type = type_
+    tok.value = value
+    tok.lineno = lineno
+    tok.lexpos = lexpos
+    return tok
+
+raw_input = lexer.input
+raw_token = lexer.token
+
+def indent_input(data):
+    """Feed new input to the lexer and reset the line count and indentation state."""
+    lexer.lineno = 1
+    indent_stack[:] = [0]
+    pending_tokens.clear()
+    raw_input(data)
+
+def indent_token():
+    """Return the next token, turning indentation changes after a NEWLINE into INDENT/DEDENT tokens."""
+    if pending_tokens:
+        return pending_tokens.pop(0)
+    tok = raw_token()
+    if tok is None:
+        # Close any blocks still open at the end of the input
+        if len(indent_stack) > 1:
+            indent_stack.pop()
+            return make_token('DEDENT', '', lexer.lineno, lexer.lexpos)
+        return None
+    if tok.type == 'NEWLINE':
+        width = len(tok.value) - tok.value.rfind('\n') - 1
+        if lexer.lexpos >= len(lexer.lexdata):
+            width = 0
+        if width > indent_stack[-1]:
+            indent_stack.append(width)
+            pending_tokens.append(make_token('INDENT', width, tok.lineno, tok.lexpos))
+        while width < indent_stack[-1]:
+            indent_stack.pop()
+            pending_tokens.append(make_token('DEDENT', width, tok.lineno, tok.lexpos))
+        tok.value = '\n'
+    return tok
+
+lexer.input = indent_input
+lexer.token = indent_token
+
 def tokenize(code):
     """Tokenize the input code and return a list of tokens with their details."""
     # Reset the lexer state
@@ -188,10 +231,10 @@ def format_token_output(tokens):
     categories = {
         "Keywords": ["IF", "ELSE", "WHILE", "FOR", "IN", "DEF", "RETURN", "BREAK", "CONTINUE", "TRY", "EXCEPT", "PRINT", "LEN", "RANGE", "AND", "OR", "NOT", "TRUE", "FALSE"],
         "Operators": ["PLUS", "MINUS", "TIMES", "DIVIDE", "MODULO", "EQUALS", "GT", "LT", "GE", "LE", "EQ", "NE"],
-        "Delimiters": ["LPAREN", "RPAREN", "LBRACKET", "RBRACKET", "COLON", "COMMA", "DOT"],
+        "Delimiters": ["LPAREN", "RPAREN", "LBRACKET", "RBRACKET", "LBRACE", "RBRACE", "COLON", "COMMA", "DOT"],
         "Literals": ["NUMBER", "STRING"],
         "Identifiers": ["IDENTIFIER"],
-        "Structure": ["NEWLINE"]
+        "Structure": ["NEWLINE", "INDENT", "DEDENT"]
     }
     
     for category, types in categories.items():
@@ -201,7 +244,7 @@ def format_token_output(tokens):
     return "\n".join(output)
 
 # Example usage for testing
-if _name_ == "_main_":
+if __name__ == "__main__":
     test_codes = {
         "Simple Print": 'print("Hello World")',
         "Arithmetic": "x = 5.5 + 3 * 2",
@@ -1,12 +1,13 @@
 from ply import yacc
 from lexer import tokens
 from ast_nodes import *
+from builtin_functions import BUILTINS
 
 # Define operator precedence - from lowest to highest
 precedence = (
     ('left', 'OR'),                    # Lowest precedence
     ('left', 'AND'),
-    ('left', 'EQ', 'NE'),
+    ('left', 'EQ', 'NE', 'IN'),
     ('left', 'LT', 'GT', 'LE', 'GE'),
     ('left', 'PLUS', 'MINUS'),
     ('left', 'TIMES', 'DIVIDE', 'MODULO'),
@@ -39,8 +40,22 @@ def p_statement(p):
                 | break_stmt
                 | continue_stmt
                 | try_except_stmt
+                | method_call_stmt
                 | NEWLINE'''
-    p[0] = p[1]
+    if p.slice[1].type == 'NEWLINE':
+        p[0] = None
+    else:
+        p[0] = p[1]
+        # Source line of the statement's first token; only known when parsing with tracking=True
+        p[0].lineno = p.lineno(1)
+
+def p_block(p):
+    '''block : NEWLINE INDENT statements DEDENT
+             | statement'''
+    if len(p) == 5:
+        p[0] = p[3]
+    else:
+        p[0] = [p[1]] if p[1] is not None else []
 
 def p_print_stmt(p):
     '''print_stmt : PRINT LPAREN expr RPAREN
@@ -58,24 +73,29 @@ def p_assign_stmt(p):
     else:
         p[0] = ListAssign(Identifier(p[1]), p[3], p[6])
 
+def p_method_call_stmt(p):
+    '''method_call_stmt : string_method'''
+    # xs.append(v) and other methods called for their effect
+    p[0] = p[1]
+
 def p_if_stmt(p):
-    '''if_stmt : IF expr COLON statements
-               | IF expr COLON statements ELSE COLON statements'''
+    '''if_stmt : IF expr COLON block
+               | IF expr COLON block ELSE COLON block'''
     if len(p) == 5:
         p[0] = IfElse(p[2], p[4], [])
     else:
         p[0] = IfElse(p[2], p[4], p[7])
 
 def p_while_stmt(p):
-    '''while_stmt : WHILE expr COLON statements'''
+    '''while_stmt : WHILE expr COLON block'''
     p[0] = WhileLoop(p[2], p[4])
 
 def p_for_stmt(p):
-    '''for_stmt : FOR IDENTIFIER IN expr COLON statements'''
+    '''for_stmt : FOR IDENTIFIER IN expr COLON block'''
     p[0] = ForLoop(Identifier(p[2]), p[4], p[6])
 
 def p_function_def(p):
-    '''function_def : DEF IDENTIFIER LPAREN param_list RPAREN COLON statements'''
+    '''function_def : DEF IDENTIFIER LPAREN param_list RPAREN COLON block'''
     p[0] = FunctionDef(p[2], p[4], p[7])
 
 def p_param_list(p):
@@ -104,28 +124,32 @@ def p_continue_stmt(p):
     p[0] = Continue()
 
 def p_try_except_stmt(p):
-    '''try_except_stmt : TRY COLON statements EXCEPT COLON statements'''
+    '''try_except_stmt : TRY COLON block EXCEPT COLON block'''
     p[0] = TryExcept(p[3], p[6])
 
 def p_expr(p):
     '''expr : term
-            | expr PLUS term
-            | expr MINUS term
-            | expr TIMES term
-            | expr DIVIDE term
-            | expr MODULO term
-            | expr GT term
-            | expr LT term
-            | expr GE term
-            | expr LE term
-            | expr EQ term
-            | expr NE term
-            | expr AND term
-            | expr OR term'''
+            | expr PLUS expr
+            | expr MINUS expr
+            | expr TIMES expr
+            | expr DIVIDE expr
+            | expr MODULO expr
+            | expr GT expr
+            | expr LT expr
+            | expr GE expr
+            | expr LE expr
+            | expr EQ expr
+            | expr NE expr
+            | expr AND expr
+            | expr OR expr
+            | expr IN expr
+            | expr NOT IN expr'''
     if len(p) == 2:
         p[0] = p[1]
+    elif len(p) == 5:
+        p[0] = BinaryOp(p[1], 'not in', p[4])
     else:
-        p[0] = BinaryOp(p[2], p[1], p[3])
+        p[0] = BinaryOp(p[1], p[2], p[3])
 
 def p_term(p):
     '''term : factor
@@ -143,23 +167,70 @@ def p_factor(p):
               | FALSE
               | IDENTIFIER
               | list_expr
+              | dict_expr
+              | set_expr
               | function_call
               | string_method
               | len_function
               | range_call
               | LPAREN expr RPAREN'''
     if len(p) == 2:
-        p[0] = p[1]
+        token_type = p.slice[1].type
+        if token_type == 'NUMBER':
+            p[0] = Number(p[1])
+        elif token_type == 'STRING':
+            p[0] = String(p[1])
+        elif token_type in ('TRUE', 'FALSE'):
+            p[0] = Boolean(token_type == 'TRUE')
+        elif token_type == 'IDENTIFIER':
+            p[0] = Identifier(p[1])
+        else:
+            p[0] = p[1]
     else:
         p[0] = p[2]
 
 def p_list_expr(p):
     '''list_expr : LBRACKET expr_list RBRACKET
-                | IDENTIFIER LBRACKET expr RBRACKET'''
+                | IDENTIFIER LBRACKET expr RBRACKET
+                | IDENTIFIER LBRACKET slice_bound COLON slice_bound RBRACKET
+                | IDENTIFIER LBRACKET slice_bound COLON slice_bound COLON slice_bound RBRACKET'''
     if len(p) == 4:
         p[0] = ListNode(p[2])
-    else:
+    elif len(p) == 5:
         p[0] = IndexNode(Identifier(p[1]), p[3])
+    else:
+        p[0] = SliceNode(Identifier(p[1]), p[3], p[5], p[7] if len(p) == 9 else None)
+
+def p_slice_bound(p):
+    '''slice_bound : expr
+                   | empty'''
+    p[0] = p[1]
+
+def p_dict_expr(p):
+    '''dict_expr : LBRACE RBRACE
+                | LBRACE dict_items RBRACE'''
+    items = p[2] if len(p) == 4 else []
+    p[0] = DictNode([key for key, _ in items], [value for _, value in items])
+
+def p_dict_items(p):
+    '''dict_items : expr COLON expr
+                 | dict_items COMMA expr COLON expr'''
+    if len(p) == 4:
+        p[0] = [(p[1], p[3])]
+    else:
+        p[0] = p[1] + [(p[3], p[5])]
+
+def p_set_expr(p):
+    '''set_expr : LBRACE set_items RBRACE'''
+    p[0] = SetNode(p[2])
+
+def p_set_items(p):
+    '''set_items : expr
+                | set_items COMMA expr'''
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[0] = p[1] + [p[3]]
 
 def p_expr_list(p):
     '''expr_list : expr
@@ -173,10 +244,10 @@ def p_expr_list(p):
 def p_function_call(p):
     '''function_call : IDENTIFIER LPAREN expr_list RPAREN
                     | IDENTIFIER LPAREN RPAREN'''
-    if len(p) == 5:
-        p[0] = FunctionCall(Identifier(p[1]), p[3])
-    else:
-        p[0] = FunctionCall(Identifier(p[1]), [])
+    args = p[3] if len(p) == 5 else []
+    # Any registered builtin is recognized here rather than by a grammar rule of its own
+    call = BuiltinCall if p[1] in BUILTINS else FunctionCall
+    p[0] = call(Identifier(p[1]), args)
 
 def p_string_method(p):
     '''string_method : IDENTIFIER DOT IDENTIFIER LPAREN expr_list RPAREN
@@ -195,6 +266,9 @@ def p_range_call(p):
                  | RANGE LPAREN RPAREN'''
     if len(p) == 5:
         args = p[3]
+        if len(args) == 1:
+            # range(stop) counts from zero, like Python's range
+            args = [None, args[0]]
         while len(args) < 3:
             args.append(None)
         p[0] = RangeCall(args[0], args[1], args[2])
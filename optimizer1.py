@@ -0,0 +1,1410 @@
+import copy
+from ast_nodes import *
+
+# Folded string literals longer than this are left to be built at runtime
+MAX_FOLDED_STRING = 1000
+
+# Methods that change the list, dict or set they are called on
+MUTATING_METHODS = ('append', 'pop', 'extend', 'add', 'remove')
+
+# Builtins that return an existing or immutable value; calling them once for the whole loop
+# is unobservable, unlike sorted() or zip() whose fresh lists the loop body could keep
+HOISTABLE_BUILTINS = ('sum', 'min', 'max', 'abs', 'str', 'int')
+
+def is_literal(node):
+    return isinstance(node, (Number, String, Boolean))
+
+def make_literal(value):
+    """Wrap a Python value in the matching literal node, or return None if it has none."""
+    if isinstance(value, bool):
+        return Boolean(value)
+    if isinstance(value, (int, float)):
+        return Number(value)
+    if isinstance(value, str) and len(value) <= MAX_FOLDED_STRING:
+        return String(value)
+    return None
+
+def node_name(name):
+    """Return the plain name of an Identifier or a raw name string."""
+    return name.name if isinstance(name, Identifier) else name
+
+def assigned_names(statements):
+    """Collect every variable name assigned anywhere in a block (including loop variables)."""
+    names = set()
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, Assign):
+            names.add(node_name(node.name))
+        elif isinstance(node, ForLoop):
+            names.add(node_name(node.var))
+            visit(node.body)
+        elif isinstance(node, IfElse):
+            visit(node.if_body)
+            visit(node.else_body or [])
+        elif isinstance(node, WhileLoop):
+            visit(node.body)
+        elif isinstance(node, TryExcept):
+            visit(node.try_body)
+            visit(node.except_body)
+
+    visit(statements)
+    return names
+
+def mutates_lists(statements, mutating_functions=()):
+    """Check whether a block may change a list, dict or set in place: element assignment, a mutating
+    method, or a call to one of mutating_functions (not looking into nested functions)."""
+    found = False
+
+    def visit(node):
+        nonlocal found
+        if found:
+            return
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, ListAssign):
+            found = True
+        elif isinstance(node, StringMethod) and node.method in MUTATING_METHODS:
+            found = True
+        elif isinstance(node, FunctionCall) and node_name(node.name) in mutating_functions:
+            found = True
+        elif isinstance(node, FunctionDef):
+            return
+        elif hasattr(node, '__dict__') and not callable(node):
+            for value in vars(node).values():
+                visit(value)
+
+    visit(statements)
+    return found
+
+def function_definitions(statements):
+    """Map each function name to the bodies of all its definitions, nested ones included."""
+    bodies = {}
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, FunctionDef):
+            bodies.setdefault(node.name, []).append(node.body)
+            visit(node.body)
+        elif hasattr(node, '__dict__') and not callable(node):
+            for value in vars(node).values():
+                visit(value)
+
+    visit(statements)
+    return bodies
+
+def list_mutating_functions(statements):
+    """Names of functions that may change a list, dict or set in place, directly or through the
+    functions they call."""
+    bodies = function_definitions(statements)
+    mutating = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, definitions in bodies.items():
+            if name not in mutating and any(mutates_lists(body, mutating) for body in definitions):
+                mutating.add(name)
+                changed = True
+    return mutating
+
+def all_names(statements):
+    """Collect every variable, parameter and function name used in a program."""
+    names = set()
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, str):
+            names.add(node)
+        elif hasattr(node, '__dict__'):
+            if isinstance(node, (Number, String, Boolean)):
+                return
+            for value in vars(node).values():
+                visit(value)
+
+    visit(statements)
+    return names
+
+def expr_key(node):
+    """Structural key of an expression, used to recognize repeated expressions."""
+    if isinstance(node, list):
+        return tuple(expr_key(n) for n in node)
+    if hasattr(node, '__dict__'):
+        return (node.__class__.__name__,) + tuple(expr_key(v) for v in vars(node).values())
+    return (type(node).__name__, node)
+
+def contains(statements, node_types):
+    """Check whether a block contains a node of the given types (not looking into nested functions)."""
+    found = False
+
+    def visit(node):
+        nonlocal found
+        if found:
+            return
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, node_types):
+            found = True
+        elif isinstance(node, FunctionDef):
+            return
+        elif hasattr(node, '__dict__'):
+            for value in vars(node).values():
+                visit(value)
+
+    visit(statements)
+    return found
+
+def has_side_effects(node):
+    """Check whether evaluating an expression may do more than compute a value: call a function
+    (which can print or change variables) or change a list, dict or set in place."""
+    return contains([node], (FunctionCall,)) or mutates_lists([node])
+
+def fold_binary(op, left, right):
+    """Fold a binary operator on two Python constants. Returns None when it cannot be folded."""
+    try:
+        if op == '+':
+            return left + right
+        elif op == '-':
+            return left - right
+        elif op == '*':
+            if isinstance(left, str) or isinstance(right, str):
+                # Avoid materializing huge repeated strings at compile time
+                count = right if isinstance(left, str) else left
+                if len(left if isinstance(left, str) else right) * count > MAX_FOLDED_STRING:
+                    return None
+            return left * right
+        elif op == '/':
+            return None if right == 0 else left / right
+        elif op == '%':
+            return None if right == 0 else left % right
+        elif op == '==':
+            return left == right
+        elif op == '!=':
+            return left != right
+        elif op == '<':
+            return left < right
+        elif op == '>':
+            return left > right
+        elif op == '<=':
+            return left <= right
+        elif op == '>=':
+            return left >= right
+        elif op == 'and':
+            return left and right
+        elif op == 'or':
+            return left or right
+    except TypeError:
+        # Invalid operand types are reported by the interpreter at runtime
+        return None
+    return None
+
+class ASTTransformer:
+    """Base class for AST passes. Dispatches to transform_<NodeClass> and rebuilds children by default."""
+    def __init__(self):
+        self.changed = False
+        self.report = []
+        self.decisions = []
+
+    def note(self, message):
+        self.changed = True
+        self.report.append(message)
+
+    def decide(self, message):
+        """Record a decision that does not change the program (reported once)."""
+        if message not in self.decisions:
+            self.decisions.append(message)
+
+    def run(self, statements):
+        """Transform a whole program."""
+        self.used_names = all_names(statements)
+        return self.transform_block(statements)
+
+    def new_temp(self, prefix):
+        """Return a fresh variable name that does not clash with any name in the program."""
+        counter = 1
+        while f"{prefix}{counter}" in self.used_names:
+            counter += 1
+        name = f"{prefix}{counter}"
+        self.used_names.add(name)
+        return name
+
+    def transform(self, node):
+        if isinstance(node, list):
+            return self.transform_block(node)
+        if node is None or not hasattr(node, '__dict__'):
+            return node
+        method = getattr(self, f'transform_{node.__class__.__name__}', self.generic_transform)
+        new = method(node)
+        if new is not node and hasattr(node, 'lineno') and hasattr(new, '__dict__') and not hasattr(new, 'lineno'):
+            # A statement rewritten into a new node keeps its source line
+            new.lineno = node.lineno
+        return new
+
+    def transform_block(self, statements):
+        """Transform a list of statements, splicing in statements that expand to lists."""
+        result = []
+        for stmt in statements:
+            new = self.transform(stmt)
+            if isinstance(new, list):
+                result.extend(new)
+            elif new is not None:
+                result.append(new)
+        return result
+
+    def generic_transform(self, node):
+        for field, value in vars(node).items():
+            setattr(node, field, self.transform(value))
+        return node
+
+class ConstantPropagator(ASTTransformer):
+    """Constant propagation and folding, dead-branch and unreachable-statement removal."""
+    def __init__(self):
+        super().__init__()
+        self.constants = {}
+
+    def transform_block(self, statements):
+        result = []
+        for i, stmt in enumerate(statements):
+            new = self.transform(stmt)
+            if isinstance(new, list):
+                result.extend(new)
+            elif new is not None:
+                result.append(new)
+            if result and isinstance(result[-1], (Return, Break, Continue)) and i + 1 < len(statements):
+                kind = result[-1].__class__.__name__.lower()
+                self.note(f"Unreachable code removed: {len(statements) - i - 1} statement(s) after {kind}")
+                break
+        return result
+
+    def transform_Identifier(self, node):
+        if node.name in self.constants:
+            value = self.constants[node.name]
+            self.note(f"Constant propagation: {node.name} → {value!r}")
+            return make_literal(value)
+        return node
+
+    def transform_Assign(self, node):
+        node.expr = self.transform(node.expr)
+        name = node_name(node.name)
+        if is_literal(node.expr):
+            self.constants[name] = node.expr.value
+        else:
+            self.constants.pop(name, None)
+        return node
+
+    def transform_BinaryOp(self, node):
+        node.left = self.transform(node.left)
+        node.right = self.transform(node.right)
+        if is_literal(node.left) and is_literal(node.right):
+            value = fold_binary(node.op, node.left.value, node.right.value)
+            literal = make_literal(value) if value is not None else None
+            if literal is not None:
+                self.note(f"Constant folding: {node.left.value!r} {node.op} {node.right.value!r} → {value!r}")
+                return literal
+        # True and x / False or x evaluate to x
+        if node.op in ('and', 'or') and isinstance(node.left, Boolean) and node.left.value == (node.op == 'and'):
+            self.note(f"Boolean simplification: {node.left.value} {node.op} x → x")
+            return node.right
+        return node
+
+    def transform_UnaryOp(self, node):
+        node.expr = self.transform(node.expr)
+        if is_literal(node.expr):
+            if node.op == 'not':
+                self.note(f"Constant folding: not {node.expr.value!r} → {not node.expr.value!r}")
+                return Boolean(not node.expr.value)
+            if node.op == '-' and isinstance(node.expr, Number):
+                self.note(f"Constant folding: -{node.expr.value!r} → {-node.expr.value!r}")
+                return Number(-node.expr.value)
+        return node
+
+    def transform_LenFunction(self, node):
+        node.expr = self.transform(node.expr)
+        if isinstance(node.expr, String):
+            self.note(f"Constant folding: len({node.expr.value!r}) → {len(node.expr.value)}")
+            return Number(len(node.expr.value))
+        if isinstance(node.expr, ListNode) and all(is_literal(e) for e in node.expr.elements):
+            self.note(f"Constant folding: len of {len(node.expr.elements)}-element list literal")
+            return Number(len(node.expr.elements))
+        return node
+
+    def transform_StringMethod(self, node):
+        node.string_obj = self.transform(node.string_obj)
+        node.args = self.transform_block(node.args)
+        if isinstance(node.string_obj, String) and all(isinstance(a, String) for a in node.args):
+            value = node.string_obj.value
+            args = [a.value for a in node.args]
+            if node.method in ('upper', 'lower', 'strip') and not args:
+                result = getattr(value, node.method)()
+            elif node.method == 'replace' and len(args) == 2:
+                result = value.replace(args[0], args[1])
+            else:
+                return node
+            literal = make_literal(result)
+            if literal is not None:
+                self.note(f"Constant folding: {value!r}.{node.method}() → {result!r}")
+                return literal
+        return node
+
+    def transform_FunctionCall(self, node):
+        node.args = self.transform_block(node.args)
+        return node
+
+    transform_BuiltinCall = transform_FunctionCall
+
+    def transform_ListAssign(self, node):
+        # The list is changed in place, so only the index and the value are expressions to fold
+        node.index = self.transform(node.index)
+        node.value = self.transform(node.value)
+        return node
+
+    def transform_IfElse(self, node):
+        node.condition = self.transform(node.condition)
+        if is_literal(node.condition):
+            taken = node.if_body if node.condition.value else (node.else_body or [])
+            self.note(f"Dead branch eliminated: if {node.condition.value!r}")
+            return self.transform_block(taken)
+        before = dict(self.constants)
+        node.if_body = self.transform_block(node.if_body)
+        after_if = self.constants
+        self.constants = dict(before)
+        if node.else_body:
+            node.else_body = self.transform_block(node.else_body)
+        after_else = self.constants
+        # Only constants that agree on both paths survive the join
+        self.constants = {k: v for k, v in after_if.items()
+                          if k in after_else and after_else[k] == v and type(after_else[k]) is type(v)}
+        return node
+
+    def transform_WhileLoop(self, node):
+        for name in assigned_names(node.body):
+            self.constants.pop(name, None)
+        node.condition = self.transform(node.condition)
+        if is_literal(node.condition) and not node.condition.value:
+            self.note(f"Dead loop eliminated: while {node.condition.value!r}")
+            return []
+        saved = dict(self.constants)
+        node.body = self.transform_block(node.body)
+        self.constants = saved
+        return node
+
+    def transform_ForLoop(self, node):
+        node.iterable = self.transform(node.iterable)
+        if literal_trip_count(node.iterable) == 0:
+            self.note("Dead loop eliminated: for loop with no iterations")
+            return []
+        killed = assigned_names(node.body) | {node_name(node.var)}
+        for name in killed:
+            self.constants.pop(name, None)
+        saved = dict(self.constants)
+        node.body = self.transform_block(node.body)
+        self.constants = saved
+        return node
+
+    def transform_FunctionDef(self, node):
+        # Function bodies run in a fresh environment, so nothing propagates in or out
+        saved = self.constants
+        self.constants = {}
+        node.body = self.transform_block(node.body)
+        self.constants = saved
+        return node
+
+    def transform_TryExcept(self, node):
+        # The try body may stop at any statement, so its assignments are unknown afterwards
+        killed = assigned_names(node.try_body) | assigned_names(node.except_body)
+        saved = dict(self.constants)
+        node.try_body = self.transform_block(node.try_body)
+        self.constants = {k: v for k, v in saved.items() if k not in killed}
+        node.except_body = self.transform_block(node.except_body)
+        self.constants = {k: v for k, v in saved.items() if k not in killed}
+        return node
+
+class LoopOptimizer(ASTTransformer):
+    """Loop-invariant code motion and strength reduction of induction-variable multiplications.
+
+    An expression is invariant when it is pure and none of the variables it reads are assigned in
+    the loop. Invariants from a while condition are hoisted unconditionally, since the condition is
+    always evaluated at least once. Invariants from the body are only taken from its first statement,
+    and are computed under a guard that checks the loop is entered at all. In both, only invariants
+    evaluated before any other operation are hoisted: one moved ahead of an operation that can fail
+    or has a side effect (a print, a division, a call) would reorder the program's output and errors.
+    A list, dict or set can be reached through several names, so in a loop that changes one in place
+    (directly or by calling a function that does) no expression reading a variable is invariant.
+    """
+    TEMP_PREFIX = "_inv"
+
+    def __init__(self):
+        super().__init__()
+        self.known_ints = {}
+
+    def run(self, statements):
+        self.mutating_functions = list_mutating_functions(statements)
+        self.function_names = set(function_definitions(statements))
+        return super().run(statements)
+
+    def loop_variant(self, node, assigned):
+        """Variables that may change while a loop runs."""
+        if mutates_lists([node], self.mutating_functions):
+            return assigned | read_names([node])
+        return assigned
+
+    def transform_block(self, statements):
+        saved = self.known_ints
+        self.known_ints = {}
+        result = []
+        for stmt in statements:
+            new = self.transform(stmt)
+            for node in new if isinstance(new, list) else [new]:
+                if node is None:
+                    continue
+                result.append(node)
+                # Track variables holding a known int, used to seed while-loop induction variables
+                if isinstance(node, Assign):
+                    value = node.expr.value if isinstance(node.expr, Number) else None
+                    if isinstance(value, int) and not isinstance(value, bool):
+                        self.known_ints[node_name(node.name)] = value
+                    else:
+                        self.known_ints.pop(node_name(node.name), None)
+                else:
+                    for name in assigned_names([node]):
+                        self.known_ints.pop(name, None)
+        self.known_ints = saved
+        return result
+
+    def transform_FunctionDef(self, node):
+        node.body = self.transform_block(node.body)
+        return node
+
+    def is_invariant(self, node, variant):
+        if is_literal(node):
+            return True
+        if isinstance(node, Identifier):
+            return node.name not in variant
+        if isinstance(node, BinaryOp):
+            return self.is_invariant(node.left, variant) and self.is_invariant(node.right, variant)
+        if isinstance(node, UnaryOp):
+            return self.is_invariant(node.expr, variant)
+        if isinstance(node, LenFunction):
+            return self.is_invariant(node.expr, variant)
+        if isinstance(node, StringMethod):
+            return (node.method not in MUTATING_METHODS and self.is_invariant(node.string_obj, variant) and
+                    all(self.is_invariant(arg, variant) for arg in node.args))
+        if isinstance(node, RangeCall):
+            return all(self.is_invariant(arg, variant) for arg in (node.start, node.stop, node.step) if arg is not None)
+        if isinstance(node, BuiltinCall):
+            name = node.name.name
+            return (name in HOISTABLE_BUILTINS and name not in self.function_names and
+                    all(self.is_invariant(arg, variant) for arg in node.args))
+        return False
+
+    def hoist_expr(self, node, variant, hoisted, kind):
+        """Replace maximal invariant subexpressions of node, evaluated before any of its other
+        operations, with temporaries."""
+        blocked = False
+
+        def visit(node):
+            nonlocal blocked
+            if node is None or isinstance(node, (Number, String, Boolean, Identifier)):
+                return node
+            if blocked or not hasattr(node, '__dict__'):
+                return node
+            if self.is_invariant(node, variant):
+                key = expr_key(node)
+                if key not in hoisted:
+                    hoisted[key] = (self.new_temp(self.TEMP_PREFIX), node, kind)
+                return Identifier(hoisted[key][0])
+            if isinstance(node, BinaryOp) and node.op in ('and', 'or'):
+                # The right operand of and/or is only conditionally evaluated
+                node.left = visit(node.left)
+            elif isinstance(node, DictNode):
+                # Keys and values are evaluated in pairs
+                for index, (key, value) in enumerate(zip(node.keys, node.values)):
+                    node.keys[index] = visit(key)
+                    node.values[index] = visit(value)
+            else:
+                for field, value in vars(node).items():
+                    if isinstance(value, list):
+                        setattr(node, field, [visit(v) for v in value])
+                    elif hasattr(value, '__dict__'):
+                        setattr(node, field, visit(value))
+            # The node's own operation runs after its operands, and anything after it stays put
+            blocked = True
+            return node
+
+        return visit(node)
+
+    def hoist_body(self, body, variant, hoisted):
+        """Hoist invariants from the first statement of the loop body, which runs on every iteration
+        before anything else in it."""
+        stmt = body[0] if body else None
+        if isinstance(stmt, (Assign, Print, Return)):
+            stmt.expr = self.hoist_expr(stmt.expr, variant, hoisted, 'body')
+        elif isinstance(stmt, (IfElse, WhileLoop)):
+            stmt.condition = self.hoist_expr(stmt.condition, variant, hoisted, 'body')
+        elif isinstance(stmt, ForLoop):
+            stmt.iterable = self.hoist_expr(stmt.iterable, variant, hoisted, 'body')
+
+    def emit_hoisted(self, hoisted, loop_kind, guard):
+        """Build the statements computing hoisted temporaries before the loop."""
+        unguarded = []
+        guarded = []
+        for temp, expr, kind in hoisted.values():
+            from_body = kind == 'body'
+            self.note(f"Loop-invariant code motion: hoisted {describe(expr)} out of {loop_kind} loop into {temp}")
+            (guarded if from_body else unguarded).append(Assign(Identifier(temp), expr))
+        if guarded:
+            unguarded.append(IfElse(guard, guarded, []))
+        return unguarded
+
+    def induction_products(self, body, var, extra=None):
+        """Find `var * c` / `c * var` products with an int literal c in the loop."""
+        products = {}
+
+        def visit(node):
+            if isinstance(node, list):
+                for n in node:
+                    visit(n)
+            elif isinstance(node, FunctionDef):
+                return
+            elif hasattr(node, '__dict__'):
+                if isinstance(node, BinaryOp) and node.op == '*':
+                    for a, b in ((node.left, node.right), (node.right, node.left)):
+                        if (isinstance(a, Identifier) and a.name == var and isinstance(b, Number) and
+                                isinstance(b.value, int) and not isinstance(b.value, bool)):
+                            products.setdefault(b.value, None)
+                for value in vars(node).values():
+                    visit(value)
+
+        visit(body)
+        if extra is not None:
+            visit(extra)
+        return list(products)
+
+    def replace_products(self, node, var, temps):
+        """Replace `var * c` products with their strength-reduced temporaries."""
+        if isinstance(node, list):
+            return [self.replace_products(n, var, temps) for n in node]
+        if isinstance(node, FunctionDef) or not hasattr(node, '__dict__'):
+            return node
+        if isinstance(node, BinaryOp) and node.op == '*':
+            for a, b in ((node.left, node.right), (node.right, node.left)):
+                if (isinstance(a, Identifier) and a.name == var and isinstance(b, Number) and
+                        b.value in temps and type(b.value) is int):
+                    return Identifier(temps[b.value])
+        for field, value in vars(node).items():
+            setattr(node, field, self.replace_products(value, var, temps))
+        return node
+
+    def transform_WhileLoop(self, node):
+        node.body = self.transform_block(node.body)
+        variant = self.loop_variant(node, assigned_names(node.body))
+        hoisted = {}
+        node.condition = self.hoist_expr(node.condition, variant, hoisted, 'condition')
+        guard = None
+        # The guard evaluates the condition once more, so it must have no side effects
+        if not has_side_effects(node.condition):
+            self.hoist_body(node.body, variant, hoisted)
+            guard = copy.deepcopy(node.condition)
+        else:
+            hoisted = {k: v for k, v in hoisted.items() if v[2] == 'condition'}
+        before = self.emit_hoisted(hoisted, "while", guard)
+        before.extend(self.reduce_while(node))
+        return before + [node]
+
+    def reduce_while(self, node):
+        """Strength-reduce `i * c` where i changes only by `i = i + k` at the top level of the body."""
+        init = []
+        for index, stmt in enumerate(node.body):
+            if not (isinstance(stmt, Assign) and isinstance(stmt.expr, BinaryOp) and stmt.expr.op in ('+', '-')):
+                continue
+            var = node_name(stmt.name)
+            expr = stmt.expr
+            if not (isinstance(expr.left, Identifier) and expr.left.name == var and isinstance(expr.right, Number)
+                    and type(expr.right.value) is int):
+                continue
+            if var not in self.known_ints or count_assignments(node.body, var) != 1:
+                continue
+            step = expr.right.value if expr.op == '+' else -expr.right.value
+            factors = self.induction_products(node.body, var, node.condition)
+            if not factors:
+                continue
+            temps = {c: self.new_temp(self.TEMP_PREFIX) for c in factors}
+            node.condition = self.replace_products(node.condition, var, temps)
+            node.body = self.replace_products(node.body, var, temps)
+            updates = []
+            for c, temp in temps.items():
+                init.append(Assign(Identifier(temp), BinaryOp(Identifier(var), '*', Number(c))))
+                updates.append(Assign(Identifier(temp), BinaryOp(Identifier(temp), '+', Number(step * c))))
+                self.note(f"Strength reduction: {var} * {c} → {temp}, incremented by {step * c} per iteration")
+            node.body[index + 1:index + 1] = updates
+            break
+        return init
+
+    def transform_ForLoop(self, node):
+        node.body = self.transform_block(node.body)
+        var = node_name(node.var)
+        before = self.reduce_for(node, var)
+        variant = self.loop_variant(node, assigned_names(node.body) | {var})
+        hoisted = {}
+        self.hoist_body(node.body, variant, hoisted)
+        guard = None
+        if hoisted:
+            trip_count = literal_trip_count(node.iterable)
+            if trip_count is None:
+                seq = self.new_temp(self.TEMP_PREFIX)
+                before.append(Assign(Identifier(seq), node.iterable))
+                node.iterable = Identifier(seq)
+                guard = BinaryOp(LenFunction(Identifier(seq)), '>', Number(0))
+            elif trip_count > 0:
+                guard = Boolean(True)
+            else:
+                hoisted = {}
+        before.extend(self.emit_hoisted(hoisted, "for", guard))
+        return before + [node]
+
+    def reduce_for(self, node, var):
+        """Strength-reduce `i * c` in a `for i in range(...)` loop with literal start and step."""
+        iterable = node.iterable
+        if not isinstance(iterable, RangeCall) or var in assigned_names(node.body):
+            return []
+        start = iterable.start.value if isinstance(iterable.start, Number) else (0 if iterable.start is None else None)
+        step = iterable.step.value if isinstance(iterable.step, Number) else (1 if iterable.step is None else None)
+        if type(start) is not int or type(step) is not int:
+            return []
+        factors = self.induction_products(node.body, var)
+        if not factors:
+            return []
+        temps = {c: self.new_temp(self.TEMP_PREFIX) for c in factors}
+        node.body = self.replace_products(node.body, var, temps)
+        init = []
+        updates = []
+        for c, temp in temps.items():
+            # Start one step early and advance at the top of the body, so continue stays correct
+            init.append(Assign(Identifier(temp), Number((start - step) * c)))
+            updates.append(Assign(Identifier(temp), BinaryOp(Identifier(temp), '+', Number(step * c))))
+            self.note(f"Strength reduction: {var} * {c} → {temp}, incremented by {step * c} per iteration")
+        node.body = updates + node.body
+        return init
+
+def count_assignments(statements, name):
+    """Count the assignments to a variable anywhere in a block."""
+    count = 0
+
+    def visit(node):
+        nonlocal count
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, Assign):
+            count += node_name(node.name) == name
+        elif isinstance(node, ForLoop):
+            count += node_name(node.var) == name
+            visit(node.body)
+        elif isinstance(node, IfElse):
+            visit(node.if_body)
+            visit(node.else_body or [])
+        elif isinstance(node, WhileLoop):
+            visit(node.body)
+        elif isinstance(node, TryExcept):
+            visit(node.try_body)
+            visit(node.except_body)
+
+    visit(statements)
+    return count
+
+def literal_trip_count(iterable):
+    """Number of iterations of a loop over range() with literal arguments or a list literal, else None."""
+    if isinstance(iterable, ListNode):
+        return len(iterable.elements)
+    if isinstance(iterable, RangeCall):
+        args = [iterable.start, iterable.stop, iterable.step]
+        defaults = [0, None, 1]
+        values = []
+        for arg, default in zip(args, defaults):
+            if arg is None:
+                values.append(default)
+            elif isinstance(arg, Number) and type(arg.value) is int:
+                values.append(arg.value)
+            else:
+                return None
+        if values[1] is None or values[2] == 0:
+            return None
+        return len(range(*values))
+    return None
+
+def describe(node):
+    """Short source-like rendering of an expression for optimization reports."""
+    if isinstance(node, Number):
+        return str(node.value)
+    if isinstance(node, String):
+        return repr(node.value)
+    if isinstance(node, Boolean):
+        return str(node.value)
+    if isinstance(node, Identifier):
+        return node.name
+    if isinstance(node, BinaryOp):
+        return f"({describe(node.left)} {node.op} {describe(node.right)})"
+    if isinstance(node, UnaryOp):
+        return f"{node.op} {describe(node.expr)}" if node.op == 'not' else f"-{describe(node.expr)}"
+    if isinstance(node, LenFunction):
+        return f"len({describe(node.expr)})"
+    if isinstance(node, StringMethod):
+        return f"{describe(node.string_obj)}.{node.method}({', '.join(describe(a) for a in node.args)})"
+    if isinstance(node, RangeCall):
+        return f"range({', '.join(describe(a) for a in (node.start, node.stop, node.step) if a is not None)})"
+    if isinstance(node, FunctionCall):
+        return f"{describe(node.name)}({', '.join(describe(a) for a in node.args)})"
+    if isinstance(node, IndexNode):
+        return f"{describe(node.expr)}[{describe(node.index)}]"
+    if isinstance(node, SliceNode):
+        parts = (node.start, node.stop) if node.step is None else (node.start, node.stop, node.step)
+        return f"{describe(node.expr)}[{':'.join('' if p is None else describe(p) for p in parts)}]"
+    if isinstance(node, ListNode):
+        return f"[{', '.join(describe(e) for e in node.elements)}]"
+    if isinstance(node, DictNode):
+        return f"{{{', '.join(f'{describe(k)}: {describe(v)}' for k, v in zip(node.keys, node.values))}}}"
+    if isinstance(node, SetNode):
+        return f"{{{', '.join(describe(e) for e in node.elements)}}}"
+    return node.__class__.__name__
+
+def count_nodes(node):
+    """Number of AST nodes in a node or block, used as the size measure for inlining."""
+    if isinstance(node, list):
+        return sum(count_nodes(n) for n in node)
+    if not hasattr(node, '__dict__'):
+        return 0
+    return 1 + sum(count_nodes(v) for v in vars(node).values())
+
+def called_names(statements):
+    """Names of all functions called in a block."""
+    names = set()
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif hasattr(node, '__dict__'):
+            if isinstance(node, FunctionCall):
+                names.add(node_name(node.name))
+            for value in vars(node).values():
+                visit(value)
+
+    visit(statements)
+    return names
+
+def read_names(node):
+    """Names of all variables read in an expression or block."""
+    names = set()
+
+    def visit(n):
+        if isinstance(n, list):
+            for x in n:
+                visit(x)
+        elif isinstance(n, Identifier):
+            names.add(n.name)
+        elif isinstance(n, FunctionCall):
+            visit(n.args)
+        elif isinstance(n, FunctionDef):
+            return
+        elif hasattr(n, '__dict__'):
+            for value in vars(n).values():
+                visit(value)
+
+    visit(node)
+    return names
+
+def unassigned_reads(statements, assigned):
+    """Names a block may read before assigning them, given the names assigned on entry.
+
+    A name counts as assigned after an if only when both branches assign it, and after a loop only
+    when it was before the loop, since the body may not run.
+    """
+    found = set()
+
+    def block(statements, assigned):
+        assigned = set(assigned)
+        for stmt in statements:
+            if isinstance(stmt, IfElse):
+                found.update(read_names(stmt.condition) - assigned)
+                assigned |= block(stmt.if_body, assigned) & block(stmt.else_body or [], assigned)
+            elif isinstance(stmt, WhileLoop):
+                found.update(read_names(stmt.condition) - assigned)
+                block(stmt.body, assigned)
+            elif isinstance(stmt, ForLoop):
+                found.update(read_names(stmt.iterable) - assigned)
+                block(stmt.body, assigned | {node_name(stmt.var)})
+            elif isinstance(stmt, Assign):
+                found.update(read_names(stmt.expr) - assigned)
+                assigned.add(node_name(stmt.name))
+            else:
+                found.update(read_names([stmt]) - assigned)
+                assigned |= assigned_names([stmt])
+        return assigned
+
+    block(statements, assigned)
+    return found
+
+def rename_variables(node, mapping):
+    """Deep-copy a node or block, renaming variables (and substituting expressions) per mapping.
+
+    Mapping values are names or expression nodes; expression nodes are copied at every use.
+    """
+    if isinstance(node, list):
+        return [rename_variables(n, mapping) for n in node]
+    if isinstance(node, Identifier):
+        target = mapping.get(node.name)
+        if target is None:
+            return Identifier(node.name)
+        return Identifier(target) if isinstance(target, str) else copy.deepcopy(target)
+    if isinstance(node, FunctionCall):
+        return node.__class__(copy.deepcopy(node.name), rename_variables(node.args, mapping))
+    if not hasattr(node, '__dict__'):
+        return node
+    new = copy.copy(node)
+    for field, value in vars(node).items():
+        setattr(new, field, rename_variables(value, mapping))
+    return new
+
+class FunctionInliner(ASTTransformer):
+    """Inline small, non-recursive user functions at their call sites.
+
+    A body of a single `return expr` is substituted into the calling expression when no argument has
+    side effects. Otherwise, and for other bodies ending in `return expr` (which may contain ifs and
+    loops, but no early returns, prints, exception handling or break/continue outside a loop), the
+    body is spliced in before the calling statement, with arguments bound to fresh variables in call
+    order and locals renamed. Functions are only inlined where the call would find the same
+    definition at runtime: defined once at the top level, before the calling top-level statement or
+    the definition of the calling function.
+    """
+    MAX_INLINE_NODES = 30
+    MAX_GROWTH = 300
+
+    def run(self, statements):
+        self.used_names = all_names(statements)
+        self.candidates = self.find_candidates(statements)
+        self.budget = max(self.MAX_GROWTH, count_nodes(statements))
+        self.defined = set()
+        self.inlined = {}
+        result = []
+        for stmt in statements:
+            result.extend(self.transform_block([stmt]))
+            if isinstance(stmt, FunctionDef):
+                self.defined.add(stmt.name)
+        for name, count in self.inlined.items():
+            self.report.append(f"Function inlining: inlined {name} at {count} call site(s)")
+        return result
+
+    def find_candidates(self, statements):
+        definitions = {}
+        nested = set()
+        for stmt in statements:
+            if isinstance(stmt, FunctionDef):
+                definitions.setdefault(stmt.name, []).append(stmt)
+
+        def find_nested(node):
+            if isinstance(node, list):
+                for n in node:
+                    find_nested(n)
+            elif isinstance(node, FunctionDef):
+                nested.add(node.name)
+                find_nested(node.body)
+            elif hasattr(node, '__dict__'):
+                for value in vars(node).values():
+                    find_nested(value)
+
+        for stmt in statements:
+            if isinstance(stmt, FunctionDef):
+                find_nested(stmt.body)
+            else:
+                find_nested(stmt)
+
+        calls = {name: called_names(defs[0].body) for name, defs in definitions.items()}
+
+        def recursive(name):
+            seen = set()
+            stack = list(calls.get(name, ()))
+            while stack:
+                callee = stack.pop()
+                if callee == name:
+                    return True
+                if callee in seen:
+                    continue
+                seen.add(callee)
+                stack.extend(calls.get(callee, ()))
+            return False
+
+        candidates = {}
+        for name, defs in definitions.items():
+            func = defs[0]
+            size = count_nodes(func.body)
+            if len(defs) > 1 or name in nested:
+                self.decide(f"Not inlined {name}: defined more than once")
+            elif recursive(name):
+                self.decide(f"Not inlined {name}: recursive")
+            elif size > self.MAX_INLINE_NODES:
+                self.decide(f"Not inlined {name}: body too large ({size} nodes > {self.MAX_INLINE_NODES})")
+            elif read_names(func.body) - set(func.params) - assigned_names(func.body):
+                free = ', '.join(sorted(read_names(func.body) - set(func.params) - assigned_names(func.body)))
+                self.decide(f"Not inlined {name}: reads non-local names ({free})")
+            elif unassigned_reads(func.body, func.params):
+                # Renamed locals keep their values between inlined calls, where the call would fail
+                unassigned = ', '.join(sorted(unassigned_reads(func.body, func.params)))
+                self.decide(f"Not inlined {name}: may read locals before assigning them ({unassigned})")
+            elif not (func.body and isinstance(func.body[-1], Return) and func.body[-1].expr is not None):
+                self.decide(f"Not inlined {name}: does not end with return of a value")
+            elif contains(func.body[:-1], (Return, Print, TryExcept, FunctionDef)):
+                self.decide(f"Not inlined {name}: body has early returns, prints or exception handling")
+            elif loop_level_contains(func.body, (Break, Continue)):
+                # Spliced into a loop of the caller, it would break or continue that loop
+                self.decide(f"Not inlined {name}: break or continue outside a loop")
+            else:
+                candidates[name] = func
+        return candidates
+
+    def inlinable(self, node):
+        """Return the candidate FunctionDef for a call, if it can be inlined at this site."""
+        name = node_name(node.name)
+        func = self.candidates.get(name)
+        if func is None or name not in self.defined:
+            # Inside a function body, defined holds the functions defined before that function
+            return None
+        if len(node.args) != len(func.params):
+            self.decide(f"Not inlined {name}: call with {len(node.args)} argument(s) for {len(func.params)} parameter(s)")
+            return None
+        growth = count_nodes(func.body)
+        if growth > self.budget:
+            self.decide(f"Not inlined {name}: code growth limit reached")
+            return None
+        return func
+
+    def record(self, func):
+        self.budget -= count_nodes(func.body)
+        self.inlined[func.name] = self.inlined.get(func.name, 0) + 1
+        self.changed = True
+
+    def transform_FunctionDef(self, node):
+        node.body = self.transform_block(node.body)
+        return node
+
+    def transform_FunctionCall(self, node):
+        node.args = self.transform_block(node.args)
+        func = self.inlinable(node)
+        if func is None or len(func.body) != 1:
+            return node
+        if has_side_effects(node.args):
+            # Substituted arguments run in the order the body uses them; inline_statement binds
+            # them to temporaries in call order instead
+            return node
+        expr = func.body[0].expr
+        uses = {}
+        for ident in walk_identifiers(expr):
+            uses[ident] = uses.get(ident, 0) + 1
+        for param, arg in zip(func.params, node.args):
+            # Arguments used other than exactly once must be cheap and safe to duplicate or drop
+            if uses.get(param, 0) != 1 and not isinstance(arg, (Number, String, Boolean, Identifier)):
+                return node
+        self.record(func)
+        return rename_variables(expr, dict(zip(func.params, node.args)))
+
+    def transform_block(self, statements):
+        result = []
+        for stmt in statements:
+            new = self.transform(stmt)
+            for node in new if isinstance(new, list) else [new]:
+                if node is not None:
+                    result.extend(self.inline_statement(node))
+        return result
+
+    def inline_statement(self, stmt):
+        """Splice a multi-statement function body in before the statement that calls it."""
+        if isinstance(stmt, (Assign, Print, Return)):
+            field = 'expr'
+        elif isinstance(stmt, IfElse):
+            field = 'condition'
+        else:
+            return [stmt]
+        expr = getattr(stmt, field)
+        calls = find_calls(expr)
+        if len(calls) != 1 or calls[0][1]:
+            return [stmt]
+        call = calls[0][0]
+        func = self.inlinable(call)
+        if func is None:
+            return [stmt]
+        # The arguments and body are moved ahead of whatever the statement evaluates before the
+        # call, which must not notice: it must have no side effects, and if the moved code has
+        # some, it may only read variables and literals
+        before = evaluated_before(expr, call)
+        if has_side_effects(before):
+            self.decide(f"Not inlined {func.name}: statement has side effects before the call")
+            return [stmt]
+        if (has_side_effects(call.args) or has_side_effects(func.body)) and not all(
+                isinstance(n, (Number, String, Boolean, Identifier)) for n in before):
+            self.decide(f"Not inlined {func.name}: call has side effects and follows other operations")
+            return [stmt]
+        mapping = {}
+        prologue = []
+        prefix = f"_{func.name}_"
+        assigned = assigned_names(func.body)
+        for param, arg in zip(func.params, call.args):
+            if param not in assigned and isinstance(arg, (Number, String, Boolean, Identifier)):
+                # Simple arguments are substituted directly instead of copied into a temporary
+                mapping[param] = arg
+                continue
+            mapping[param] = self.new_temp(prefix + param)
+            prologue.append(Assign(Identifier(mapping[param]), arg))
+        for local in sorted(assigned - set(func.params)):
+            mapping[local] = self.new_temp(prefix + local)
+        body = rename_variables(func.body, mapping)
+        result_expr = body[-1].expr
+        setattr(stmt, field, replace_node(expr, call, result_expr))
+        self.record(func)
+        return prologue + body[:-1] + [stmt]
+
+def walk_identifiers(node):
+    """Yield the names of all Identifier nodes read in an expression."""
+    if isinstance(node, list):
+        for n in node:
+            yield from walk_identifiers(n)
+    elif isinstance(node, Identifier):
+        yield node.name
+    elif isinstance(node, FunctionCall):
+        yield from walk_identifiers(node.args)
+    elif hasattr(node, '__dict__'):
+        for value in vars(node).values():
+            yield from walk_identifiers(value)
+
+def find_calls(expr, conditional=False):
+    """List (FunctionCall, is_conditional) pairs in an expression, in evaluation order."""
+    if isinstance(expr, list):
+        calls = []
+        for e in expr:
+            calls.extend(find_calls(e, conditional))
+        return calls
+    if not hasattr(expr, '__dict__'):
+        return []
+    if isinstance(expr, FunctionCall):
+        return find_calls(expr.args, conditional) + [(expr, conditional)]
+    if isinstance(expr, BinaryOp) and expr.op in ('and', 'or'):
+        return find_calls(expr.left, conditional) + find_calls(expr.right, True)
+    calls = []
+    for value in vars(expr).values():
+        calls.extend(find_calls(value, conditional))
+    return calls
+
+def evaluated_before(expr, target):
+    """Subexpressions of expr evaluated completely before the target node is, in evaluation order.
+
+    The target's own operands are not included; returns None if target is not in expr.
+    """
+    if expr is target:
+        return []
+    if isinstance(expr, DictNode):
+        # Keys and values are evaluated in pairs
+        operands = [n for pair in zip(expr.keys, expr.values) for n in pair]
+    elif hasattr(expr, '__dict__'):
+        operands = []
+        for value in vars(expr).values():
+            if isinstance(value, list):
+                operands.extend(value)
+            elif hasattr(value, '__dict__'):
+                operands.append(value)
+    else:
+        return None
+    for index, operand in enumerate(operands):
+        before = evaluated_before(operand, target)
+        if before is not None:
+            return operands[:index] + before
+    return None
+
+def replace_node(expr, target, replacement):
+    """Replace a specific node object inside an expression."""
+    if expr is target:
+        return replacement
+    if isinstance(expr, list):
+        return [replace_node(e, target, replacement) for e in expr]
+    if hasattr(expr, '__dict__'):
+        for field, value in vars(expr).items():
+            setattr(expr, field, replace_node(value, target, replacement))
+    return expr
+
+def loop_level_contains(statements, node_types):
+    """Check for nodes (e.g. Break) that belong to this loop, not to nested loops or functions."""
+    found = False
+
+    def visit(node):
+        nonlocal found
+        if found:
+            return
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, node_types):
+            found = True
+        elif isinstance(node, (WhileLoop, ForLoop, FunctionDef)):
+            return
+        elif isinstance(node, IfElse):
+            visit(node.if_body)
+            visit(node.else_body or [])
+        elif isinstance(node, TryExcept):
+            visit(node.try_body)
+            visit(node.except_body)
+
+    visit(statements)
+    return found
+
+def replace_loop_breaks(statements, before_break):
+    """Copy a loop body, inserting the statements before_break() returns ahead of each break of this loop."""
+    result = []
+    for stmt in statements:
+        if isinstance(stmt, Break):
+            result.extend(before_break())
+            result.append(Break())
+        elif isinstance(stmt, IfElse):
+            result.append(IfElse(stmt.condition, replace_loop_breaks(stmt.if_body, before_break),
+                                 replace_loop_breaks(stmt.else_body or [], before_break)))
+        elif isinstance(stmt, TryExcept):
+            result.append(TryExcept(replace_loop_breaks(stmt.try_body, before_break),
+                                    replace_loop_breaks(stmt.except_body, before_break)))
+        else:
+            result.append(stmt)
+    return result
+
+class LoopUnroller(ASTTransformer):
+    """Unroll `for` loops over range() with literal bounds.
+
+    Loops with at most FULL_UNROLL_MAX_TRIPS iterations are replaced by one copy of the body per
+    iteration, with the loop variable replaced by its value. Longer loops are unrolled UNROLL_FACTOR
+    times: copy k reads `var + k*step`, and a remainder loop runs the last iterations. The loop
+    variable is set to its final value after the loop, or before a break; a break also sets a flag
+    so the remainder is skipped. Loops using continue are left alone, since skipping the rest of
+    one copy cannot be expressed without a loop, and so are loops inside try blocks, where an
+    exception would see a stale loop variable.
+    """
+    UNROLL_FACTOR = 4
+    FULL_UNROLL_MAX_TRIPS = 8
+    MAX_UNROLLED_NODES = 400
+
+    def run(self, statements):
+        self.try_depth = 0
+        return super().run(statements)
+
+    def transform_TryExcept(self, node):
+        self.try_depth += 1
+        node.try_body = self.transform_block(node.try_body)
+        self.try_depth -= 1
+        node.except_body = self.transform_block(node.except_body)
+        return node
+
+    def transform_ForLoop(self, node):
+        node.body = self.transform_block(node.body)
+        trips = literal_trip_count(node.iterable)
+        if (trips is None or trips < 2 or not isinstance(node.iterable, RangeCall)
+                or getattr(node, 'unrolled', False) or self.try_depth):
+            return node
+        var = node_name(node.var)
+        if var in assigned_names(node.body) or contains(node.body, (FunctionDef, Return)):
+            return node
+        if loop_level_contains(node.body, (Continue,)):
+            self.decide(f"Not unrolled for {var} in {describe(node.iterable)}: uses continue")
+            return node
+        start = node.iterable.start.value if node.iterable.start is not None else 0
+        step = node.iterable.step.value if node.iterable.step is not None else 1
+        last = start + (trips - 1) * step
+        body_size = count_nodes(node.body)
+        has_break = loop_level_contains(node.body, (Break,))
+
+        if trips <= self.FULL_UNROLL_MAX_TRIPS and not has_break and trips * body_size <= self.MAX_UNROLLED_NODES:
+            self.note(f"Loop unrolling: fully unrolled for {var} in {describe(node.iterable)} ({trips} iterations)")
+            result = []
+            for k in range(trips):
+                result.extend(rename_variables(node.body, {var: Number(start + k * step)}))
+            result.append(Assign(Identifier(var), Number(last)))
+            return result
+
+        factor = self.UNROLL_FACTOR
+        if trips < factor or factor < 2 or factor * body_size > self.MAX_UNROLLED_NODES:
+            return node
+        main_trips = trips - trips % factor
+        main_stop = start + main_trips * step
+        flag = self.new_temp("_unroll_break") if has_break else None
+        body = []
+        for k in range(factor):
+            offset = k * step
+            copy_body = rename_variables(node.body, {var: BinaryOp(Identifier(var), '+', Number(offset))} if k else {})
+            if has_break:
+                def before_break(offset=offset):
+                    stmts = [Assign(Identifier(flag), Boolean(True))]
+                    if offset:
+                        stmts.append(Assign(Identifier(var), BinaryOp(Identifier(var), '+', Number(offset))))
+                    return stmts
+                copy_body = replace_loop_breaks(copy_body, before_break)
+            body.extend(copy_body)
+        main_loop = ForLoop(Identifier(var), RangeCall(Number(start), Number(main_stop), Number(step * factor)), body)
+        main_loop.unrolled = True
+        if main_trips < trips:
+            after = [ForLoop(Identifier(var), RangeCall(Number(main_stop), copy.deepcopy(node.iterable.stop),
+                                                        Number(step)), copy.deepcopy(node.body))]
+        else:
+            after = [Assign(Identifier(var), Number(last))]
+        result = [main_loop]
+        if flag:
+            result = [Assign(Identifier(flag), Boolean(False)), main_loop,
+                      IfElse(UnaryOp('not', Identifier(flag)), after, [])]
+        else:
+            result = [main_loop] + after
+        self.note(f"Loop unrolling: unrolled for {var} in {describe(node.iterable)} by {factor}"
+                  f" ({main_trips // factor} unrolled iterations, {trips - main_trips} remaining)")
+        return result
+
+# Fields where reading a variable leaves no second reference to its value (a returned local is
+# never used again)
+NON_ALIASING_FIELDS = {
+    (IndexNode, 'expr'), (SliceNode, 'expr'), (LenFunction, 'expr'), (StringMethod, 'string_obj'), (ListAssign, 'expr'),
+    (Print, 'expr'), (IfElse, 'condition'), (WhileLoop, 'condition'), (Return, 'expr'),
+}
+
+def list_append(node):
+    """The list literal appended by an `xs = xs + [...]` statement, or None for other statements."""
+    if not isinstance(node, Assign):
+        return None
+    expr = node.expr
+    if (isinstance(expr, BinaryOp) and expr.op == '+' and isinstance(expr.left, Identifier)
+            and expr.left.name == node_name(node.name) and isinstance(expr.right, ListNode)):
+        return expr.right
+    return None
+
+def appended_names(statements):
+    """Names of the lists grown by `xs = xs + [...]` anywhere in a block."""
+    names = set()
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif list_append(node) is not None:
+            names.add(node_name(node.name))
+        elif hasattr(node, '__dict__') and not callable(node) and not isinstance(node, FunctionDef):
+            for value in vars(node).values():
+                visit(value)
+
+    visit(statements)
+    return names
+
+def unaliased_lists(statements, params=()):
+    """Variables of one scope that always hold a list no other variable or value refers to.
+
+    Every assignment must build a new list (a list literal or `xs = xs + [...]`), and the variable
+    may only be read where no second reference is made: indexing, len(), method calls, print,
+    return, conditions and operators other than and/or. A list a for loop iterates over is excluded
+    when the loop grows it, since the loop would then see the appended elements.
+    """
+    lists = set()
+    excluded = set(params)
+
+    def read(value, parent, field):
+        if isinstance(value, Identifier):
+            if not ((type(parent), field) in NON_ALIASING_FIELDS
+                    or (isinstance(parent, BinaryOp) and parent.op not in ('and', 'or'))):
+                excluded.add(value.name)
+        else:
+            visit(value)
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                read(n, None, None)
+        elif isinstance(node, FunctionDef):
+            # Function bodies are scopes of their own
+            excluded.add(node.name)
+        elif list_append(node) is not None:
+            visit(list_append(node).elements)
+        elif isinstance(node, Assign):
+            name = node_name(node.name)
+            (lists if isinstance(node.expr, ListNode) else excluded).add(name)
+            read(node.expr, node, 'expr')
+        elif isinstance(node, ForLoop):
+            excluded.add(node_name(node.var))
+            if isinstance(node.iterable, Identifier):
+                if node.iterable.name in appended_names(node.body):
+                    excluded.add(node.iterable.name)
+            else:
+                visit(node.iterable)
+            visit(node.body)
+        elif hasattr(node, '__dict__') and not callable(node):
+            for field, value in vars(node).items():
+                read(value, node, field)
+
+    visit(statements)
+    return lists - excluded
+
+class ListAppendRewriter(ASTTransformer):
+    """Rewrite `xs = xs + [v]` into `xs.append(v)` (several elements into `xs.extend([...])`).
+
+    `xs + [v]` copies the whole list, so growing a list this way in a loop takes quadratic time.
+    Appending in place gives the same result only when nothing else refers to the list; see
+    unaliased_lists for the conditions checked in each scope.
+    """
+    def run(self, statements):
+        self.used_names = all_names(statements)
+        # Names that may refer to a function are never rewritten
+        self.functions = set(function_definitions(statements))
+        self.lists = unaliased_lists(statements) - self.functions
+        return self.transform_block(statements)
+
+    def transform_FunctionDef(self, node):
+        saved = self.lists
+        self.lists = unaliased_lists(node.body, node.params) - self.functions
+        node.body = self.transform_block(node.body)
+        self.lists = saved
+        return node
+
+    def transform_Assign(self, node):
+        appended = list_append(node)
+        name = node_name(node.name)
+        if appended is None or name not in self.lists:
+            return node
+        if len(appended.elements) == 1:
+            element = appended.elements[0]
+            self.note(f"List append: {name} = {describe(node.expr)} → {name}.append({describe(element)})")
+            return StringMethod(Identifier(name), 'append', [element])
+        self.note(f"List append: {name} = {describe(node.expr)} → {name}.extend({describe(appended)})")
+        return StringMethod(Identifier(name), 'extend', [appended])
+
+# Passes run in order on every iteration of optimize_ast
+OPTIMIZATION_PASSES = [
+    FunctionInliner,
+    ConstantPropagator,
+    LoopUnroller,
+    LoopOptimizer,
+    ListAppendRewriter,
+]
+
+def optimize_ast(ast, max_passes=10, passes=None):
+    """Run the optimization passes over a program until nothing changes.
+
+    passes defaults to OPTIMIZATION_PASSES. Returns the optimized statement list and a report of
+    the applied optimizations.
+    """
+    if ast is None:
+        return [], []
+    statements = ast if isinstance(ast, list) else [ast]
+    report = []
+    for _ in range(max_passes):
+        changed = False
+        for pass_class in passes if passes is not None else OPTIMIZATION_PASSES:
+            optimization = pass_class()
+            statements = optimization.run(statements)
+            report.extend(optimization.report)
+            report.extend(d for d in optimization.decisions if d not in report)
+            changed = changed or optimization.changed
+        if not changed:
+            break
+    return statements, report
@@ -0,0 +1,104 @@
+import json
+import os
+import time
+import tracemalloc
+
+class PhaseMetrics:
+    """Wall time, CPU time, peak memory and output size of each compiler phase of one analysis.
+
+    With trace_memory=True (the default) each phase runs under tracemalloc and records the peak
+    memory it allocated on top of what was in use when it started. Its times then include
+    tracemalloc's bookkeeping, so they compare with other traced runs, not with untraced ones.
+    """
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.timestamp = time.time()
+        # One dict per phase, in the order they ran
+        self.phases = []
+
+    def measure(self, phase, function, *args, size=None, unit=None):
+        """Run function(*args) as the named phase, record its metrics and return its result.
+
+        size(result) gives the phase's output size in units (tokens, nodes, instructions). A phase
+        that raises is recorded with ok set to False and no output size, and the error propagates.
+        """
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        entry = {'phase': phase, 'ok': False}
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            result = function(*args)
+            entry['ok'] = True
+        finally:
+            entry['wall_seconds'] = time.perf_counter() - wall_start
+            entry['cpu_seconds'] = time.process_time() - cpu_start
+            if self.trace_memory:
+                entry['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1] - memory_before
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phases.append(entry)
+        if size is not None:
+            entry['output_size'] = size(result)
+            entry['output_unit'] = unit
+        return result
+
+    def to_json_lines(self):
+        """One JSON object per phase, each on its own line and stamped with the analysis time."""
+        return "\n".join(json.dumps({'timestamp': self.timestamp, **entry}) for entry in self.phases)
+
+    def write_json_lines(self, path):
+        """Append this analysis's phases to a JSON lines file."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(self.to_json_lines() + "\n")
+
+    def to_prometheus(self):
+        """The phases as gauges in Prometheus' text exposition format."""
+        gauges = [
+            ('compiler_phase_wall_seconds', "Wall-clock time of the compiler phase.", 'wall_seconds'),
+            ('compiler_phase_cpu_seconds', "CPU time of the compiler phase.", 'cpu_seconds'),
+            ('compiler_phase_peak_memory_bytes', "Peak memory allocated by the compiler phase.",
+             'peak_memory_bytes'),
+            ('compiler_phase_output_size', "Size of the compiler phase's output, in the given unit.",
+             'output_size'),
+            ('compiler_phase_ok', "1 if the compiler phase completed, 0 if it raised an error.", 'ok'),
+        ]
+        lines = []
+        for name, description, field in gauges:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            for entry in self.phases:
+                if field not in entry:
+                    continue
+                labels = f'phase="{entry["phase"]}"'
+                if field == 'output_size':
+                    labels += f',unit="{entry["output_unit"]}"'
+                lines.append(f"{name}{{{labels}}} {float(entry[field]):g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write the gauges to a file for node_exporter's textfile collector, replacing it atomically."""
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temporary, path)
+
+def format_phase_metrics(metrics):
+    """Text report of the time, memory and output size of each phase."""
+    lines = ["Compiler phase metrics:"]
+    for entry in metrics.phases:
+        parts = [f"{entry['wall_seconds'] * 1000:.2f}ms wall", f"{entry['cpu_seconds'] * 1000:.2f}ms CPU"]
+        if 'peak_memory_bytes' in entry:
+            parts.append(f"{entry['peak_memory_bytes'] / 1024:.1f} KB peak")
+        if 'output_size' in entry:
+            parts.append(f"{entry['output_size']} {entry['output_unit']}")
+        if not entry['ok']:
+            parts.append("failed")
+        lines.append(f"  {entry['phase']}: " + ", ".join(parts))
+    if not metrics.phases:
+        lines.append("  none")
+    return "\n".join(lines)
@@ -0,0 +1,256 @@
+import collections
+import json
+import sys
+import threading
+import time
+
+class ProfileTable:
+    """Calls, cumulative time and self time per key (a node type, a source line or a function)."""
+    def __init__(self):
+        # key -> [calls, cumulative seconds, self seconds]
+        self.stats = {}
+        # [key, seconds spent in nested entries] for each entry currently running, innermost last
+        self.stack = []
+        # key -> number of its entries currently running
+        self.active = {}
+
+    def enter(self, key):
+        self.stack.append([key, 0.0])
+        self.active[key] = self.active.get(key, 0) + 1
+
+    def leave(self, elapsed):
+        key, nested = self.stack.pop()
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[2] += elapsed - nested
+        self.active[key] -= 1
+        if not self.active[key]:
+            # Recursive entries run inside the outermost one, whose time already includes theirs
+            stats[1] += elapsed
+        if self.stack:
+            self.stack[-1][1] += elapsed
+
+    def rows(self):
+        """(key, calls, cumulative, self) tuples, largest self time first."""
+        rows = [(key, calls, cumulative, own) for key, (calls, cumulative, own) in self.stats.items()]
+        return sorted(rows, key=lambda row: -row[3])
+
+class ProfileLimitExceeded(BaseException):
+    """Raised in a profiled program to end it once it has run its profiler's max_steps nodes. It
+    is not an Exception, so that the program's own try/except blocks cannot catch it."""
+
+class Profiler:
+    """Deterministic profile of an Interpreter run per AST node type, source line and user function.
+
+    While a run is profiled, the interpreter's evaluate and call_function methods are replaced on
+    that instance by timing wrappers; an interpreter created without profile=True keeps the plain
+    methods and pays nothing. Lines are those of statements parsed with tracking=True, as
+    Interpreter.execute does. Cumulative time includes nested entries, self time excludes them;
+    the profiled program's top level counts as the function '<module>'. Regions compiled by tiered
+    execution run without calling evaluate and show up as the statement that entered them.
+
+    With max_steps set, a run that evaluates more nodes than that is ended by
+    ProfileLimitExceeded; the tables keep the profile of the run up to that point.
+    """
+    def __init__(self, max_steps=None):
+        self.node_types = ProfileTable()
+        self.lines = ProfileTable()
+        self.functions = ProfileTable()
+        self.total_time = 0.0
+        self.max_steps = max_steps
+
+    def run(self, interpreter, statements):
+        """Interpret statements, timing every node and function call, and return the result."""
+        evaluate = interpreter.evaluate
+        call_function = interpreter.call_function
+        node_types, lines, functions = self.node_types, self.lines, self.functions
+        clock = time.perf_counter
+        max_steps = self.max_steps
+        steps = 0
+
+        def profiled_evaluate(node):
+            nonlocal steps
+            if node is None or type(node) is list:
+                return evaluate(node)
+            steps += 1
+            if max_steps is not None and steps > max_steps:
+                raise ProfileLimitExceeded(f"Step limit of {max_steps} exceeded")
+            line = getattr(node, 'lineno', 0)
+            node_types.enter(node.__class__.__name__)
+            if line:
+                lines.enter(line)
+            start = clock()
+            try:
+                return evaluate(node)
+            finally:
+                elapsed = clock() - start
+                if line:
+                    lines.leave(elapsed)
+                node_types.leave(elapsed)
+
+        def profiled_call_function(func, args):
+            functions.enter(func.name)
+            start = clock()
+            try:
+                return call_function(func, args)
+            finally:
+                functions.leave(clock() - start)
+
+        interpreter.evaluate = profiled_evaluate
+        interpreter.call_function = profiled_call_function
+        functions.enter('<module>')
+        start = clock()
+        try:
+            return interpreter.interpret(statements)
+        finally:
+            elapsed = clock() - start
+            functions.leave(elapsed)
+            self.total_time += elapsed
+            del interpreter.evaluate
+            del interpreter.call_function
+
+    def to_dict(self):
+        """The profile as plain data: total seconds and rows per node type, line and function."""
+        def rows(table, field):
+            return [{field: key, 'calls': calls, 'cumulative_time': cumulative, 'self_time': own}
+                    for key, calls, cumulative, own in table.rows()]
+        return {
+            'total_time': self.total_time,
+            'node_types': rows(self.node_types, 'node_type'),
+            'lines': rows(self.lines, 'line'),
+            'functions': rows(self.functions, 'function'),
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+def format_profile_report(profiler, source=None, limit=10):
+    """Text report of a profiled run: the node types, lines and functions with the most self time.
+
+    With the program's source, each line is shown with its code.
+    """
+    source_lines = source.split('\n') if source is not None else []
+    lines = [f"Execution profile ({profiler.total_time:.4f}s total; calls, cumulative, self):"]
+    for title, table in (("Node types", profiler.node_types), ("Lines", profiler.lines),
+                         ("Functions", profiler.functions)):
+        lines.append(f"  {title}:")
+        rows = table.rows()
+        for key, calls, cumulative, own in rows[:limit]:
+            label = key
+            if table is profiler.lines:
+                code = source_lines[key - 1].strip() if key <= len(source_lines) else ""
+                label = f"line {key}" + (f" ({code})" if code else "")
+            lines.append(f"    {label}: {calls} call(s), {cumulative:.4f}s cumulative, {own:.4f}s self")
+        if len(rows) > limit:
+            lines.append(f"    ... {len(rows) - limit} more")
+        if not rows:
+            lines.append("    none")
+    return "\n".join(lines)
+
+def interpreted_stack(frame, evaluate_code, call_code):
+    """The interpreted call stack at a host frame: (function, line) pairs, outermost first.
+
+    Each call_function frame is a user function; the innermost statement with a line that an
+    evaluate frame is running within it is that function's current line (0 if none is known).
+    """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        if code is evaluate_code or code is call_code:
+            frames.append(frame)
+        frame = frame.f_back
+    stack = [['<module>', 0]]
+    for frame in reversed(frames):
+        if frame.f_code is call_code:
+            stack.append([frame.f_locals['func'].name, 0])
+        else:
+            line = getattr(frame.f_locals['node'], 'lineno', 0)
+            if line:
+                stack[-1][1] = line
+    return tuple(map(tuple, stack))
+
+class SamplingProfiler:
+    """Statistical profile of Interpreter runs from the interpreted call stack, sampled periodically.
+
+    While a run executes, a background thread wakes every interval seconds and reads the
+    interpreter thread's host Python stack, keeping only the user functions and source lines it
+    stands for. Nothing in the interpreter is instrumented, so hot loops run at full speed and
+    are not distorted by per-node timers; the cost is that of the samples alone. Regions compiled
+    by tiered execution show the line of the statement that entered them.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        # ((function, line), ...) from the program's top level inwards -> number of samples
+        self.stacks = collections.Counter()
+        self.thread = None
+        self.stopping = threading.Event()
+
+    def start(self):
+        """Start sampling the calling thread, which is about to run the interpreter."""
+        from interpreter import Interpreter
+        codes = (Interpreter.evaluate.__code__, Interpreter.call_function.__code__)
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.sample_loop, args=(threading.get_ident(), codes),
+                                       name="interpreter-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+
+    def sample_loop(self, thread_id, codes):
+        while not self.stopping.wait(self.interval):
+            self.take_sample(thread_id, codes)
+
+    def take_sample(self, thread_id, codes):
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            self.stacks[interpreted_stack(frame, *codes)] += 1
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self, lines=True):
+        """The samples in collapsed-stack format ("outer;...;inner count" per line), as read by
+        flamegraph.pl, inferno and speedscope. Frames are "function:line", or just "function"
+        with lines=False."""
+        counts = collections.Counter()
+        for stack, count in self.stacks.items():
+            counts[";".join(f"{name}:{line}" if lines and line else name for name, line in stack)] += count
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(counts.items()))
+
+    def write_collapsed(self, path, lines=True):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed(lines) + "\n")
+
+def format_sample_report(sampler, source=None, limit=10):
+    """Text report of a sampled run: the functions and lines most often running when sampled.
+
+    Functions show the samples in which they were innermost and those in which they were
+    anywhere on the stack; with the program's source, each line is shown with its code.
+    """
+    source_lines = source.split('\n') if source is not None else []
+    innermost, on_stack, line_counts = collections.Counter(), collections.Counter(), collections.Counter()
+    for stack, count in sampler.stacks.items():
+        name, line = stack[-1]
+        innermost[name] += count
+        if line:
+            line_counts[line] += count
+        for name in set(name for name, _ in stack):
+            on_stack[name] += count
+    lines = [f"Sampled profile ({sampler.samples} sample(s) every {sampler.interval * 1000:g}ms):"]
+    lines.append("  Functions:")
+    for name, count in innermost.most_common(limit):
+        lines.append(f"    {name}: {count} innermost, {on_stack[name]} on stack")
+    lines.append("  Lines:")
+    for line, count in line_counts.most_common(limit):
+        code = source_lines[line - 1].strip() if line <= len(source_lines) else ""
+        lines.append(f"    line {line}" + (f" ({code})" if code else "") + f": {count} sample(s)")
+    for title, counts in (("Functions", innermost), ("Lines", line_counts)):
+        if not counts:
+            lines.insert(lines.index(f"  {title}:") + 1, "    none")
+    return "\n".join(lines)
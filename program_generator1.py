@@ -0,0 +1,217 @@
+import random
+
+# Relative weights of the statement kinds; kinds left out of a mix are never generated
+DEFAULT_MIX = {
+    'assign': 6,
+    'print': 2,
+    'if': 2,
+    'while': 1,
+    'for': 2,
+    'append': 2,
+    'concat': 1,
+    'try': 1,
+}
+
+# Values stay below this, so that arithmetic never builds up huge ints
+MODULUS = 1009
+
+# Most times a statement can run per call of its function (or per program), over all its loops
+MAX_ITERATIONS = 64
+
+class ProgramGenerator:
+    """Random programs for the language's grammar, the same for the same seed and options.
+
+    Every program parses, runs to completion without errors and prints the same output under the
+    interpreter as under Python: variables are assigned before they are read, integer values are
+    kept small with % MODULUS, list indexes are taken modulo the list's length, nested loops
+    together run at most MAX_ITERATIONS times, and calls are made outside loops only, to functions
+    defined earlier, at most once per function body, so they cannot recurse or multiply. Wrapping
+    code in try/except then never changes the output.
+    """
+    def __init__(self, seed=0, statements=50, functions=5, depth=3, function_statements=8, mix=None):
+        self.random = random.Random(seed)
+        self.statements = statements
+        self.functions = functions
+        self.depth = depth
+        self.function_statements = function_statements
+        self.mix = dict(DEFAULT_MIX if mix is None else mix)
+        self.lines = []
+        # Functions defined so far: name -> number of parameters
+        self.defined = {}
+
+    def generate(self):
+        """The program's source."""
+        for number in range(self.functions):
+            self.function(f"f{number}")
+        self.scope(["a", "b", "c"], "xs", "s")
+        for name in ("a", "b", "c"):
+            self.emit(0, f"{name} = {self.random.randrange(10)}")
+        self.emit(0, f"xs = [{self.random.randrange(10)}, {self.random.randrange(10)}]")
+        self.emit(0, 's = ""')
+        self.block(0, self.statements, in_loop=False, depth=0)
+        for name in ("a", "b", "c"):
+            self.emit(0, f"print({name})")
+        self.emit(0, "print(len(xs))")
+        self.emit(0, "print(len(s))")
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, indent, text):
+        self.lines.append("    " * indent + text)
+
+    def scope(self, variables, list_name, string_name, counters=()):
+        self.variables = list(variables)
+        self.list_name = list_name
+        self.string_name = string_name
+        # Loop counters can be read but not assigned
+        self.counters = list(counters)
+        self.loop_number = 0
+        # Product of the iteration counts of the loops around the current statement
+        self.iterations = 1
+        # Calls still allowed in this body; None for any number
+        self.calls_left = None
+
+    def function(self, name):
+        params = [f"p{k}" for k in range(self.random.randint(1, 3))]
+        self.emit(0, f"def {name}({', '.join(params)}):")
+        self.scope(params + ["v"], "ys", "t")
+        self.calls_left = 1
+        self.emit(1, f"v = {self.random.randrange(10)}")
+        self.emit(1, f"ys = [{self.random.randrange(10)}]")
+        self.emit(1, 't = ""')
+        self.block(1, self.function_statements, in_loop=False, depth=0)
+        self.emit(1, f"return ({self.expression(2)} + len(ys) + len(t)) % {MODULUS}")
+        self.defined[name] = len(params)
+
+    def block(self, indent, count, in_loop, depth):
+        for _ in range(count):
+            self.statement(indent, in_loop, depth)
+
+    def statement(self, indent, in_loop, depth):
+        kinds = [kind for kind in self.mix if self.mix[kind] > 0 and
+                 (depth < self.depth or kind not in ('if', 'while', 'for', 'try'))]
+        if not kinds:
+            self.emit(indent, f"print({self.expression(1)})")
+            return
+        kind = self.random.choices(kinds, [self.mix[kind] for kind in kinds])[0]
+        getattr(self, f"statement_{kind}")(indent, in_loop, depth)
+
+    def statement_assign(self, indent, in_loop, depth):
+        target = self.random.choice(self.variables)
+        self.emit(indent, f"{target} = {self.expression(2, in_loop)} % {MODULUS}")
+
+    def statement_print(self, indent, in_loop, depth):
+        self.emit(indent, f"print({self.expression(2, in_loop)})")
+
+    def statement_append(self, indent, in_loop, depth):
+        self.emit(indent, f"{self.list_name}.append({self.expression(1, in_loop)} % {MODULUS})")
+
+    def statement_concat(self, indent, in_loop, depth):
+        text = "".join(self.random.choice("abcxyz") for _ in range(self.random.randint(1, 3)))
+        self.emit(indent, f'{self.string_name} = {self.string_name} + "{text}"')
+
+    def statement_if(self, indent, in_loop, depth):
+        self.emit(indent, f"if {self.condition(in_loop)}:")
+        self.body(indent + 1, in_loop, depth + 1)
+        if in_loop and self.random.random() < 0.2:
+            self.emit(indent + 1, self.random.choice(["break", "continue"]))
+        if self.random.random() < 0.5:
+            self.emit(indent, "else:")
+            self.body(indent + 1, in_loop, depth + 1)
+
+    def statement_for(self, indent, in_loop, depth):
+        counter = self.new_counter("i")
+        count = self.iteration_count()
+        if self.random.random() < 0.3:
+            self.emit(indent, f"for {counter} in {self.list_name}[:{count}]:")
+        else:
+            self.emit(indent, f"for {counter} in range({count}):")
+        self.loop_body(indent + 1, counter, count, depth)
+
+    def statement_while(self, indent, in_loop, depth):
+        counter = self.new_counter("w")
+        count = self.iteration_count()
+        self.emit(indent, f"{counter} = 0")
+        self.emit(indent, f"while {counter} < {count}:")
+        # Counted first, so that continue cannot skip the increment
+        self.emit(indent + 1, f"{counter} = {counter} + 1")
+        self.loop_body(indent + 1, counter, count, depth)
+
+    def statement_try(self, indent, in_loop, depth):
+        self.emit(indent, "try:")
+        self.body(indent + 1, in_loop, depth + 1)
+        self.emit(indent, "except:")
+        self.emit(indent + 1, f"print({self.random.randrange(10)})")
+
+    def new_counter(self, prefix):
+        self.loop_number += 1
+        return f"{prefix}{self.loop_number}"
+
+    def iteration_count(self):
+        """Iterations for a new loop: up to 4, as long as the loops around it leave room."""
+        return self.random.randint(1, max(1, min(4, MAX_ITERATIONS // self.iterations)))
+
+    def loop_body(self, indent, counter, count, depth):
+        self.counters.append(counter)
+        self.iterations *= count
+        self.body(indent, True, depth + 1)
+        self.iterations //= count
+        self.counters.remove(counter)
+
+    def body(self, indent, in_loop, depth):
+        self.block(indent, self.random.randint(1, 3), in_loop, depth)
+
+    def expression(self, depth, in_loop=False):
+        """An int-valued expression of at most depth levels of operators."""
+        choice = self.random.random()
+        if depth <= 0 or choice < 0.3:
+            return self.operand(in_loop)
+        if choice < 0.8:
+            op = self.random.choice(["+", "-", "*", "+", "-"])
+            return f"({self.expression(depth - 1, in_loop)} {op} {self.expression(depth - 1, in_loop)})"
+        if choice < 0.9:
+            return f"({self.expression(depth - 1, in_loop)} % {self.random.randint(2, 9)})"
+        return f"{self.list_name}[{self.expression(depth - 1, in_loop)} % len({self.list_name})]"
+
+    def operand(self, in_loop):
+        choice = self.random.random()
+        if choice < 0.05 and self.defined and self.may_call(in_loop):
+            name = self.random.choice(sorted(self.defined))
+            args = ", ".join(self.operand(in_loop) for _ in range(self.defined[name]))
+            return f"{name}({args})"
+        if choice < 0.1:
+            return f"len({self.random.choice([self.list_name, self.string_name])})"
+        if choice < 0.5:
+            return str(self.random.randrange(10))
+        return self.random.choice(self.variables + self.counters)
+
+    def may_call(self, in_loop):
+        """Whether a call may go here: outside loops, and once per function body."""
+        if in_loop:
+            return False
+        if self.calls_left is None:
+            return True
+        if not self.calls_left:
+            return False
+        self.calls_left -= 1
+        return True
+
+    def condition(self, in_loop):
+        comparison = self.random.choice(["<", ">", "<=", ">=", "==", "!="])
+        test = f"{self.expression(1, in_loop)} {comparison} {self.expression(1, in_loop)}"
+        choice = self.random.random()
+        if choice < 0.15:
+            return f"not ({test})"
+        if choice < 0.3:
+            other = f"{self.operand(in_loop)} {self.random.choice(['<', '>', '=='])} {self.random.randrange(10)}"
+            return f"({test}) {self.random.choice(['and', 'or'])} ({other})"
+        return test
+
+def generate_program(seed=0, statements=50, functions=5, depth=3, function_statements=8, mix=None):
+    """Source of a random program that parses and runs without errors; see ProgramGenerator.
+
+    statements is the number of top-level statements (nested blocks add more), functions the
+    number of functions defined before them, each with function_statements statements, and depth
+    the deepest nesting of if, for, while and try blocks. mix maps statement kinds to relative
+    weights (see DEFAULT_MIX).
+    """
+    return ProgramGenerator(seed, statements, functions, depth, function_statements, mix).generate()
@@ -0,0 +1,101 @@
+import operator
+
+from ast_nodes import *
+from optimizer import ASTTransformer, describe
+
+COMPARISONS = {
+    '==': operator.eq, '!=': operator.ne, '<': operator.lt,
+    '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+}
+
+FUSED_NODES = (IncrementAssign, FusedCompare, CompareBranch, CompareWhileLoop)
+
+def is_simple_operand(node):
+    """Literals and variables, which fused nodes read without calling evaluate()."""
+    return isinstance(node, (Number, String, Boolean, Identifier))
+
+class SuperinstructionFuser(ASTTransformer):
+    """Rewrite common statement shapes into fused nodes the interpreter runs in one step.
+
+    x = x + y / x = x - y     -> IncrementAssign
+    a < b (variable vs. literal or variable) -> FusedCompare
+    if a < b: / while a < b:  -> CompareBranch / CompareWhileLoop
+    """
+    def transform_Assign(self, node):
+        node.expr = self.transform(node.expr)
+        expr = node.expr
+        if (isinstance(expr, BinaryOp) and expr.op in ('+', '-') and isinstance(expr.left, Identifier)
+                and expr.left.name == node.name.name and is_simple_operand(expr.right)):
+            self.note(f"Superinstruction: {node.name.name} = {describe(expr)} → IncrementAssign")
+            return IncrementAssign(node.name, expr, expr.op, expr.right)
+        return node
+
+    def fused_compare(self, node):
+        """FusedCompare for a comparison of a variable with a simple operand, else None."""
+        if (isinstance(node, BinaryOp) and node.op in COMPARISONS and isinstance(node.left, Identifier)
+                and is_simple_operand(node.right)):
+            return FusedCompare(node.left, node.op, node.right, COMPARISONS[node.op])
+        return None
+
+    def transform_BinaryOp(self, node):
+        node.left = self.transform(node.left)
+        node.right = self.transform(node.right)
+        fused = self.fused_compare(node)
+        if fused is None:
+            return node
+        self.note(f"Superinstruction: {describe(node)} → FusedCompare")
+        return fused
+
+    transform_TypedBinaryOp = transform_BinaryOp
+
+    def transform_IfElse(self, node):
+        condition = self.fused_compare(node.condition)
+        if condition is None:
+            return self.generic_transform(node)
+        self.note(f"Superinstruction: if {describe(node.condition)} → CompareBranch")
+        return CompareBranch(condition, self.transform_block(node.if_body), self.transform(node.else_body))
+
+    def transform_WhileLoop(self, node):
+        condition = self.fused_compare(node.condition)
+        if condition is None:
+            return self.generic_transform(node)
+        self.note(f"Superinstruction: while {describe(node.condition)} → CompareWhileLoop")
+        return CompareWhileLoop(condition, self.transform_block(node.body))
+
+def fuse_superinstructions(statements):
+    """Rewrite a program to use fused nodes; returns the statements and a report of rewrites."""
+    fuser = SuperinstructionFuser()
+    statements = fuser.run(statements)
+    return statements, fuser.report
+
+def superinstruction_counts(statements):
+    """Per fused node type: (number of sites, total executions in the tree walker)."""
+    counts = {}
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+            return
+        if not hasattr(node, '__dict__') or callable(node):
+            return
+        if isinstance(node, FUSED_NODES):
+            sites, hits = counts.get(node.__class__.__name__, (0, 0))
+            counts[node.__class__.__name__] = (sites + 1, hits + node.hits)
+        for field, value in vars(node).items():
+            # A fused branch or loop runs its condition itself, without counting it
+            if not (field == 'condition' and isinstance(node, (CompareBranch, CompareWhileLoop))):
+                visit(value)
+
+    visit(statements)
+    return counts
+
+def format_superinstruction_report(statements):
+    """Text report of which fused forms ran and how often, most executed first."""
+    counts = superinstruction_counts(statements)
+    lines = ["Superinstructions (sites, executions):"]
+    for name, (sites, hits) in sorted(counts.items(), key=lambda item: -item[1][1]):
+        lines.append(f"  {name}: {sites} site(s), {hits} execution(s)")
+    if not counts:
+        lines.append("  none")
+    return "\n".join(lines)
@@ -0,0 +1,253 @@
+import re
+
+from lexer import lexer, reserved, t_STRING
+
+# Highlighting tag of each token type from lexer1; other tokens keep the editor's colours
+TOKEN_TAGS = {'NUMBER': 'number', 'STRING': 'string', 'TRUE': 'constant', 'FALSE': 'constant',
+              'PRINT': 'builtin', 'LEN': 'builtin', 'RANGE': 'builtin'}
+for token_type in reserved.values():
+    TOKEN_TAGS.setdefault(token_type, 'keyword')
+
+TAG_COLORS = {
+    'keyword': '#C678DD',
+    'builtin': '#61AFEF',
+    'constant': '#D19A66',
+    'number': '#D19A66',
+    'string': '#98C379',
+}
+
+# A copy of the language's lexer for single lines. The copy would keep lexer1's
+# indentation-tracking input and token, which drive the original lexer, so PLY's own are used
+line_lexer = lexer.clone()
+del line_lexer.input, line_lexer.token
+
+# A string the lexer matches can run over several lines. For each quote, the rest of a string
+# opened on an earlier line, built from the STRING rule with its opening quote left out
+STRING_REST = {}
+for alternative in t_STRING.__doc__.split('|'):
+    opening = re.match(r'\\?.', alternative).group()
+    STRING_REST[opening[-1]] = re.compile(alternative[len(opening):])
+
+QUOTE = re.compile('["\']')
+
+# Start state of a line not tokenized since it was edited; equal to no real state
+UNKNOWN = object()
+
+def tokenize_line(text, state=None):
+    """Highlighted spans of one line, as (start, end, tag), and the state the line ends in.
+
+    The state is None, or the quote of a string still open at the end of the line, which the
+    next line continues. A quote the lexer cannot match on its line (it skips it as an error)
+    opens such a string, as the STRING rule would match on to a closing quote on a later line.
+    """
+    spans = []
+    position = 0
+    if state is not None:
+        match = STRING_REST[state].match(text)
+        if match is None:
+            return ([(0, len(text), 'string')] if text else []), state
+        position = match.end()
+        spans.append((0, position, 'string'))
+    line_lexer.input(text)
+    line_lexer.lexpos = position
+    while True:
+        try:
+            token = line_lexer.token()
+        except Exception:
+            # The rule matched but could not convert the text (a bad escape, a too-long number)
+            start = position
+            while text[start] in lexer.lexignore:
+                start += 1
+            spans.append((start, line_lexer.lexpos, 'string' if text[start] in '"\'' else 'number'))
+            position = line_lexer.lexpos
+            continue
+        end = len(text) if token is None else token.lexpos
+        quote = QUOTE.search(text, position, end)
+        if quote is not None:
+            spans.append((quote.start(), len(text), 'string'))
+            return spans, quote.group()
+        if token is None:
+            return spans, None
+        position = line_lexer.lexpos
+        tag = TOKEN_TAGS.get(token.type)
+        if tag is not None:
+            spans.append((token.lexpos, position, tag))
+
+class LineHighlighter:
+    """Highlighting of a text kept up to date line by line as it is edited.
+
+    Each line's tokens depend only on its own text and the state it starts in (whether a string
+    is open), so an edit only makes the lines it touched dirty. retokenize() relexes from the
+    first dirty line, whose start state is known, and carries on past the last one only while
+    the state a line ends in differs from the one the next line was last tokenized with.
+    """
+    def __init__(self, text=""):
+        self.lines = [""]
+        # states[i] is the state line i + 1 starts in; states[-1] the one the text ends in
+        self.states = [None, UNKNOWN]
+        # First and last line (from 1) still to tokenize, or None
+        self.dirty = (1, 1)
+        if text:
+            self.set_text(text)
+
+    def replace_lines(self, first, last, new_lines):
+        """Replace lines first to last (from 1, inclusive) by new_lines (at least one)."""
+        count = len(new_lines)
+        self.lines[first - 1:last] = new_lines
+        self.states[first:last] = [UNKNOWN] * (count - 1)
+        new_last = first + count - 1
+        delta = new_last - last
+
+        def moved(line):
+            if line > last:
+                return line + delta
+            return min(line, new_last) if line >= first else line
+
+        if self.dirty is None:
+            self.dirty = (first, new_last)
+        else:
+            low, high = self.dirty
+            self.dirty = (min(moved(low), first), max(moved(high), new_last))
+
+    def set_text(self, text):
+        self.replace_lines(1, len(self.lines), text.split('\n'))
+
+    def sync(self, text):
+        """Catch up with text after changes whose place is not known: the lines between the
+        common start and end of the old and new text become dirty."""
+        old, new = self.lines, text.split('\n')
+        start, limit = 0, min(len(old), len(new))
+        while start < limit and old[start] == new[start]:
+            start += 1
+        old_end, new_end = len(old), len(new)
+        while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        if start == old_end == new_end:
+            return
+        if start == old_end or start == new_end:
+            # Whole lines were inserted or removed; take in a neighbouring line to replace
+            if start > 0:
+                start -= 1
+            else:
+                old_end += 1
+                new_end += 1
+        self.replace_lines(start + 1, old_end, new[start:new_end])
+
+    def retokenize(self, limit=None):
+        """Tokenize dirty lines, at most limit of them, and return (first line, spans of each
+        line from it), or None if nothing was dirty. Lines left over stay dirty."""
+        if self.dirty is None:
+            return None
+        first, last = self.dirty
+        line, state = first, self.states[first - 1]
+        lines, states = self.lines, self.states
+        spans = []
+        while True:
+            line_spans, state = tokenize_line(lines[line - 1], state)
+            spans.append(line_spans)
+            line += 1
+            known = states[line - 1]
+            states[line - 1] = state
+            if line > len(lines) or (line > last and known == state):
+                self.dirty = None
+                break
+            if limit is not None and len(spans) >= limit:
+                self.dirty = (line, max(last, line))
+                break
+        return first, spans
+
+class TextHighlighter:
+    """Incremental syntax highlighting of a Tk Text widget.
+
+    The widget's Tcl command is wrapped so that every insert, delete and replace reports the
+    lines it changed to a LineHighlighter (undo and redo, whose place Tk does not report, are
+    found by comparing lines). Highlighting then waits until no edit has come for delay
+    milliseconds and retokenizes only the dirty lines, applying each tag to all of their spans
+    in one Tk call; long runs of lines (a first load, a quote that opens a string over the rest
+    of the file) are done batch_lines at a time with the event loop running in between.
+    """
+    def __init__(self, text, delay=30, batch_lines=400, colors=None):
+        self.text = text
+        self.delay = delay
+        self.batch_lines = batch_lines
+        self.tags = dict(TAG_COLORS if colors is None else colors)
+        for tag, color in self.tags.items():
+            text.tag_configure(tag, foreground=color)
+        self.original = text._w + "_unhighlighted"
+        text.tk.call("rename", text._w, self.original)
+        text.tk.createcommand(text._w, self.dispatch)
+        self.model = LineHighlighter(self.call("get", "1.0", "end-1c"))
+        self.pending = None
+        self.schedule()
+
+    def call(self, *args):
+        """Run a command of the wrapped widget itself."""
+        return self.text.tk.call((self.original,) + args)
+
+    def line_of(self, index):
+        return int(str(self.call("index", index)).split('.')[0])
+
+    def line_count(self):
+        return self.line_of("end-1c")
+
+    def dispatch(self, command, *args):
+        if command not in ('insert', 'delete', 'replace', 'edit'):
+            return self.call(command, *args)
+        if command == 'edit':
+            result = self.call(command, *args)
+            if args and args[0] in ('undo', 'redo'):
+                self.model.sync(self.call("get", "1.0", "end-1c"))
+                self.schedule()
+            return result
+        count = self.line_count()
+        if command == 'insert':
+            lines = [self.line_of(args[0])]
+        elif command == 'delete' and len(args) == 1:
+            lines = [self.line_of(args[0]), self.line_of(f"{args[0]} +1c")]
+        elif command == 'delete':
+            lines = [self.line_of(index) for index in args]
+        else:
+            lines = [self.line_of(args[0]), self.line_of(args[1])]
+        first, last = min(min(lines), count), min(max(lines), count)
+        result = self.call(command, *args)
+        new_last = last + self.line_count() - count
+        self.model.replace_lines(first, last, str(self.call("get", f"{first}.0", f"{new_last}.end")).split('\n'))
+        self.schedule()
+        return result
+
+    def schedule(self):
+        """Highlight the dirty lines once no edit has come for the delay."""
+        if self.pending is not None:
+            self.text.after_cancel(self.pending)
+        self.pending = self.text.after(self.delay, self.refresh)
+
+    def refresh(self):
+        self.pending = None
+        self.highlight(self.batch_lines)
+        if self.model.dirty is not None:
+            self.pending = self.text.after(1, self.refresh)
+
+    def flush(self):
+        """Highlight all dirty lines now rather than after the delay."""
+        if self.pending is not None:
+            self.text.after_cancel(self.pending)
+            self.pending = None
+        self.highlight(None)
+
+    def highlight(self, limit):
+        """Retokenize up to limit dirty lines and retag them."""
+        result = self.model.retokenize(limit)
+        if result is None:
+            return
+        first, spans = result
+        ranges = {tag: [] for tag in self.tags}
+        for line, line_spans in enumerate(spans, first):
+            for start, end, tag in line_spans:
+                if tag in ranges:
+                    ranges[tag] += (f"{line}.{start}", f"{line}.{end}")
+        last = first + len(spans) - 1
+        for tag, indices in ranges.items():
+            self.call("tag", "remove", tag, f"{first}.0", f"{last}.end")
+            if indices:
+                self.call("tag", "add", tag, *indices)
@@ -1,11 +1,20 @@
 import tkinter as tk
-from tkinter import ttk, font, filedialog
+from tkinter import ttk, font, filedialog, simpledialog, messagebox
 import sys
 import io
+import queue
+import threading
 from lexer import lexer, tokenize, format_token_output
 from myparser import parser
 from interpreter import Interpreter
-import re
+from icg_executor import compare_icg_runs
+from optimizer import optimize_ast, count_nodes
+from compiler_phases import (pretty_print_ast, semantic_analysis, generate_icg, optimize_code_icg,
+                             generate_code, listing_size, parse_program)
+from phase_metrics import PhaseMetrics, format_phase_metrics
+from profiler import ProfileLimitExceeded, format_profile_report
+from debugger import Debugger, DebuggerQuit, format_pause, parse_condition
+from syntax_highlighter import TextHighlighter
 from ast_nodes import *  # Import all AST node classes at the top of script.py
 
 # ---------- Functions ----------
@@ -60,64 +69,25 @@ def execute_code():
         sys.stdout = old_stdout
     output_box.config(state=tk.DISABLED)
 
-def optimize_ast(node):
-    # Recursively optimize AST nodes (constant folding, etc.)
-    if isinstance(node, BinaryOp):
-        left = optimize_ast(node.left)
-        right = optimize_ast(node.right)
-        if isinstance(left, Number) and isinstance(right, Number):
-            if node.op == '+': return Number(left.value + right.value)
-            if node.op == '-': return Number(left.value - right.value)
-            if node.op == '*': return Number(left.value * right.value)
-            if node.op == '/': return Number(left.value / right.value)
-        return BinaryOp(left, node.op, right)
-    elif isinstance(node, UnaryOp):
-        expr = optimize_ast(node.expr)
-        if isinstance(expr, Number):
-            if node.op == '-': return Number(-expr.value)
-        return UnaryOp(node.op, expr)
-    elif isinstance(node, Assign):
-        return Assign(node.name, optimize_ast(node.expr))
-    elif isinstance(node, Print):
-        return Print(optimize_ast(node.expr))
-    elif isinstance(node, IfElse):
-        cond = optimize_ast(node.condition)
-        if isinstance(cond, Boolean):
-            if cond.value:
-                return [optimize_ast(stmt) for stmt in node.if_body]
-            elif node.else_body:
-                return [optimize_ast(stmt) for stmt in node.else_body]
-            else:
-                return []
-        return IfElse(cond, [optimize_ast(stmt) for stmt in node.if_body], [optimize_ast(stmt) for stmt in node.else_body] if node.else_body else None)
-    elif isinstance(node, WhileLoop):
-        return WhileLoop(optimize_ast(node.condition), [optimize_ast(stmt) for stmt in node.body])
-    elif isinstance(node, ForLoop):
-        return ForLoop(node.var, optimize_ast(node.iterable), [optimize_ast(stmt) for stmt in node.body])
-    elif isinstance(node, FunctionDef):
-        return FunctionDef(node.name, node.params, [optimize_ast(stmt) for stmt in node.body])
-    elif isinstance(node, FunctionCall):
-        return FunctionCall(node.name, [optimize_ast(arg) for arg in node.args])
-    elif isinstance(node, ListNode):
-        return ListNode([optimize_ast(elem) for elem in node.elements])
-    elif isinstance(node, IndexNode):
-        return IndexNode(optimize_ast(node.expr), optimize_ast(node.index))
-    elif isinstance(node, StringMethod):
-        return StringMethod(optimize_ast(node.expr), node.method, [optimize_ast(arg) for arg in node.args])
-    elif isinstance(node, LenFunction):
-        return LenFunction(optimize_ast(node.expr))
-    elif isinstance(node, RangeCall):
-        return RangeCall(optimize_ast(node.start) if node.start else None, optimize_ast(node.stop) if node.stop else None, optimize_ast(node.step) if node.step else None)
-    else:
-        return node
+def indent_code(statements):
+    # Convert a block of statements to code, indenting every line (including nested blocks)
+    lines = []
+    for stmt in statements:
+        for line in ast_to_code(stmt).split("\n"):
+            lines.append(f"    {line}")
+    return "\n".join(lines) + "\n"
 
 def ast_to_code(node):
     # Recursively convert AST back to code
-    if isinstance(node, Assign):
+    if isinstance(node, str):
+        return node
+    elif isinstance(node, Assign):
         return f"{ast_to_code(node.name)} = {ast_to_code(node.expr)}"
     elif isinstance(node, BinaryOp):
         return f"({ast_to_code(node.left)} {node.op} {ast_to_code(node.right)})"
     elif isinstance(node, UnaryOp):
+        if node.op == 'not':
+            return f"not {ast_to_code(node.expr)}"
         return f"{node.op}{ast_to_code(node.expr)}"
     elif isinstance(node, Number):
         return str(node.value)
@@ -131,54 +101,56 @@ def ast_to_code(node):
         return f"print({ast_to_code(node.expr)})"
     elif isinstance(node, IfElse):
         code = f"if {ast_to_code(node.condition)}:\n"
-        for stmt in node.if_body:
-            code += f"    {ast_to_code(stmt)}\n"
+        code += indent_code(node.if_body)
         if node.else_body:
             code += f"else:\n"
-            for stmt in node.else_body:
-                code += f"    {ast_to_code(stmt)}\n"
+            code += indent_code(node.else_body)
         return code.rstrip()
     elif isinstance(node, WhileLoop):
         code = f"while {ast_to_code(node.condition)}:\n"
-        for stmt in node.body:
-            code += f"    {ast_to_code(stmt)}\n"
+        code += indent_code(node.body)
         return code.rstrip()
     elif isinstance(node, ForLoop):
         code = f"for {ast_to_code(node.var)} in {ast_to_code(node.iterable)}:\n"
-        for stmt in node.body:
-            code += f"    {ast_to_code(stmt)}\n"
+        code += indent_code(node.body)
         return code.rstrip()
     elif isinstance(node, FunctionDef):
         code = f"def {node.name}({', '.join(ast_to_code(param) for param in node.params)}):\n"
-        for stmt in node.body:
-            code += f"    {ast_to_code(stmt)}\n"
+        code += indent_code(node.body)
         return code.rstrip()
     elif isinstance(node, FunctionCall):
         return f"{ast_to_code(node.name)}({', '.join(ast_to_code(arg) for arg in node.args)})"
     elif isinstance(node, ListNode):
         return f"[{', '.join(ast_to_code(elem) for elem in node.elements)}]"
+    elif isinstance(node, DictNode):
+        return f"{{{', '.join(f'{ast_to_code(k)}: {ast_to_code(v)}' for k, v in zip(node.keys, node.values))}}}"
+    elif isinstance(node, SetNode):
+        return f"{{{', '.join(ast_to_code(elem) for elem in node.elements)}}}"
     elif isinstance(node, IndexNode):
         return f"{ast_to_code(node.expr)}[{ast_to_code(node.index)}]"
+    elif isinstance(node, SliceNode):
+        parts = (node.start, node.stop) if node.step is None else (node.start, node.stop, node.step)
+        return f"{ast_to_code(node.expr)}[{':'.join('' if part is None else ast_to_code(part) for part in parts)}]"
+    elif isinstance(node, ListAssign):
+        return f"{ast_to_code(node.expr)}[{ast_to_code(node.index)}] = {ast_to_code(node.value)}"
     elif isinstance(node, StringMethod):
-        return f"{ast_to_code(node.expr)}.{node.method}({', '.join(ast_to_code(arg) for arg in node.args)})"
+        return f"{ast_to_code(node.string_obj)}.{node.method}({', '.join(ast_to_code(arg) for arg in node.args)})"
     elif isinstance(node, LenFunction):
         return f"len({ast_to_code(node.expr)})"
     elif isinstance(node, RangeCall):
         args = [ast_to_code(arg) for arg in [node.start, node.stop, node.step] if arg is not None]
         return f"range({', '.join(args)})"
     elif isinstance(node, Return):
-        return f"return {ast_to_code(node.expr)}"
+        return f"return {ast_to_code(node.expr)}".rstrip()
     elif isinstance(node, Break):
         return "break"
     elif isinstance(node, Continue):
         return "continue"
     elif isinstance(node, TryExcept):
         code = f"try:\n"
-        for stmt in node.try_body:
-            code += f"    {ast_to_code(stmt)}\n"
+        code += indent_code(node.try_body)
         code += f"except:\n"
-        for stmt in node.except_body:
-            code += f"    {ast_to_code(stmt)}\n"
+        code += indent_code(node.except_body)
         return code.rstrip()
     else:
         return ""
@@ -197,17 +169,14 @@ def optimize_code():
         ast = parser.parse(raw_code)
         if ast is None:
             raise Exception("Failed to parse code")
-        # Optimize each statement in the AST
-        optimized_ast = []
-        for node in ast:
-            opt = optimize_ast(node)
-            if isinstance(opt, list):
-                optimized_ast.extend(opt)
-            else:
-                optimized_ast.append(opt)
+        # Optimize the whole program until no pass changes it any more
+        optimized_ast, report = optimize_ast(ast)
         # Convert optimized AST back to code
         optimized_code = "\n".join(ast_to_code(node) for node in optimized_ast if node)
         optimizer_output.insert(tk.END, optimized_code)
+        if report:
+            optimizer_output.insert(tk.END, "\n\n# Applied optimizations:\n")
+            optimizer_output.insert(tk.END, "\n".join(f"# ✓ {line}" for line in report))
     except Exception as e:
         optimizer_output.insert(tk.END, f"❌ Error during optimization:\n{str(e)}")
 
@@ -233,6 +202,34 @@ def download_optimized_code():
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(optimized_code)
 
+def download_profile_json():
+    if last_profile_json is None:
+        return
+
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".json",
+        filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")],
+        title="Save Execution Profile"
+    )
+    if file_path:
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(last_profile_json)
+
+def download_phase_metrics():
+    if last_phase_metrics is None:
+        return
+
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".jsonl",
+        filetypes=[("JSON Lines", "*.jsonl"), ("Prometheus Text File", "*.prom"), ("All Files", "*.*")],
+        title="Save Phase Metrics"
+    )
+    if file_path:
+        if file_path.endswith(".prom"):
+            last_phase_metrics.write_prometheus(file_path)
+        else:
+            last_phase_metrics.write_json_lines(file_path)
+
 def on_mousewheel(event):
     canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
@@ -242,609 +239,6 @@ def toggle_section(frame):
     else:
         frame.pack(fill="x", padx=20, pady=(0, 10))
 
-# --- Helper to ensure all phase functions handle both lists and single nodes ---
-def ensure_list(ast):
-    if isinstance(ast, list):
-        return ast
-    elif ast is None:
-        return []
-    else:
-        return [ast]
-
-# Define the original pretty_print_ast function first
-def pretty_print_ast(node, indent="", is_last=True):
-    # Define prefix based on whether it's the last child
-    prefix = "└── " if is_last else "├── "
-    
-    if isinstance(node, list):
-        result = []
-        for i, n in enumerate(node):
-            result.append(pretty_print_ast(n, indent, i == len(node) - 1))
-        return "\n".join(result)
-    elif hasattr(node, "__class__"):
-        cname = node.__class__.__name__
-        
-        if cname == "Assign":
-            return f"{indent}{prefix}Assignment\n{indent}    ├── Variable: {node.name}\n{indent}    └── Value: {pretty_print_ast(node.expr, indent + '    ', True)}"
-        elif cname == "BinaryOp":
-            return f"{indent}{prefix}Binary Operation: {node.op}\n{indent}    ├── Left: {pretty_print_ast(node.left, indent + '    ', False)}\n{indent}    └── Right: {pretty_print_ast(node.right, indent + '    ', True)}"
-        elif cname == "UnaryOp":
-            return f"{indent}{prefix}Unary Operation: {node.op}\n{indent}    └── Expression: {pretty_print_ast(node.expr, indent + '    ', True)}"
-        elif cname == "Number":
-            return f"{indent}{prefix}Number: {node.value}"
-        elif cname == "String":
-            return f"{indent}{prefix}String: '{node.value}'"
-        elif cname == "Boolean":
-            return f"{indent}{prefix}Boolean: {node.value}"
-        elif cname == "Identifier":
-            return f"{indent}{prefix}Identifier: {node.name}"
-        elif cname == "Print":
-            return f"{indent}{prefix}Print Statement\n{indent}    └── Expression: {pretty_print_ast(node.expr, indent + '    ', True)}"
-        elif cname == "IfElse":
-            result = [f"{indent}{prefix}If-Else Statement"]
-            result.append(f"{indent}    ├── Condition: {pretty_print_ast(node.condition, indent + '    ', False)}")
-            result.append(f"{indent}    ├── If Body:")
-            for i, stmt in enumerate(node.if_body):
-                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.if_body) - 1 and not node.else_body))
-            if node.else_body:
-                result.append(f"{indent}    └── Else Body:")
-                for i, stmt in enumerate(node.else_body):
-                    result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.else_body) - 1))
-            return "\n".join(result)
-        elif cname == "WhileLoop":
-            result = [f"{indent}{prefix}While Loop"]
-            result.append(f"{indent}    ├── Condition: {pretty_print_ast(node.condition, indent + '    ', False)}")
-            result.append(f"{indent}    └── Body:")
-            for i, stmt in enumerate(node.body):
-                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.body) - 1))
-            return "\n".join(result)
-        elif cname == "ForLoop":
-            result = [f"{indent}{prefix}For Loop"]
-            result.append(f"{indent}    ├── Variable: {node.var}")
-            result.append(f"{indent}    ├── Iterable: {pretty_print_ast(node.iterable, indent + '    ', False)}")
-            result.append(f"{indent}    └── Body:")
-            for i, stmt in enumerate(node.body):
-                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.body) - 1))
-            return "\n".join(result)
-        elif cname == "FunctionDef":
-            result = [f"{indent}{prefix}Function Definition: {node.name}"]
-            result.append(f"{indent}    ├── Parameters: {', '.join(str(p) for p in node.params)}")
-            result.append(f"{indent}    └── Body:")
-            for i, stmt in enumerate(node.body):
-                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.body) - 1))
-            return "\n".join(result)
-        elif cname == "FunctionCall":
-            result = [f"{indent}{prefix}Function Call: {node.name}"]
-            result.append(f"{indent}    └── Arguments:")
-            for i, arg in enumerate(node.args):
-                result.append(pretty_print_ast(arg, indent + '        ', i == len(node.args) - 1))
-            return "\n".join(result)
-        elif cname == "ListNode":
-            result = [f"{indent}{prefix}List"]
-            for i, elem in enumerate(node.elements):
-                result.append(pretty_print_ast(elem, indent + '    ', i == len(node.elements) - 1))
-            return "\n".join(result)
-        elif cname == "IndexNode":
-            return f"{indent}{prefix}List Index\n{indent}    ├── List: {pretty_print_ast(node.list_expr, indent + '    ', False)}\n{indent}    └── Index: {pretty_print_ast(node.index_expr, indent + '    ', True)}"
-        elif cname == "ListAssign":
-            return f"{indent}{prefix}List Assignment\n{indent}    ├── List: {pretty_print_ast(node.list_expr, indent + '    ', False)}\n{indent}    ├── Index: {pretty_print_ast(node.index_expr, indent + '    ', False)}\n{indent}    └── Value: {pretty_print_ast(node.value, indent + '    ', True)}"
-        elif cname == "Return":
-            return f"{indent}{prefix}Return Statement\n{indent}    └── Value: {pretty_print_ast(node.expr, indent + '    ', True)}"
-        elif cname == "Break":
-            return f"{indent}{prefix}Break Statement"
-        elif cname == "Continue":
-            return f"{indent}{prefix}Continue Statement"
-        elif cname == "TryExcept":
-            result = [f"{indent}{prefix}Try-Except Block"]
-            result.append(f"{indent}    ├── Try Block:")
-            for i, stmt in enumerate(node.try_block):
-                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.try_block) - 1))
-            result.append(f"{indent}    └── Except Block:")
-            for i, stmt in enumerate(node.except_block):
-                result.append(pretty_print_ast(stmt, indent + '        ', i == len(node.except_block) - 1))
-            return "\n".join(result)
-        elif cname == "StringMethod":
-            result = [f"{indent}{prefix}String Method: {node.method}"]
-            result.append(f"{indent}    ├── String: {pretty_print_ast(node.string_obj, indent + '    ', False)}")
-            if hasattr(node, 'args') and node.args:
-                result.append(f"{indent}    └── Arguments:")
-                for i, arg in enumerate(node.args):
-                    result.append(pretty_print_ast(arg, indent + '        ', i == len(node.args) - 1))
-            return "\n".join(result)
-        elif cname == "LenFunction":
-            return f"{indent}{prefix}Length Function\n{indent}    └── Expression: {pretty_print_ast(node.expr, indent + '    ', True)}"
-        elif cname == "RangeCall":
-            result = [f"{indent}{prefix}Range Function"]
-            if node.start:
-                result.append(f"{indent}    ├── Start: {pretty_print_ast(node.start, indent + '    ', False)}")
-            if node.stop:
-                result.append(f"{indent}    ├── Stop: {pretty_print_ast(node.stop, indent + '    ', False)}")
-            if node.step:
-                result.append(f"{indent}    └── Step: {pretty_print_ast(node.step, indent + '    ', True)}")
-            return "\n".join(result)
-        else:
-            return f"{indent}{prefix}Unknown Node: {cname}"
-    else:
-        return f"{indent}{prefix}Unknown: {str(node)}"
-
-# Now patch the functions after they're defined
-old_pretty_print_ast = pretty_print_ast
-def pretty_print_ast(node, indent="", is_last=True):
-    node = ensure_list(node)
-    if isinstance(node, list) and len(node) == 1:
-        return old_pretty_print_ast(node[0], indent, is_last)
-    elif isinstance(node, list):
-        result = []
-        for i, n in enumerate(node):
-            result.append(old_pretty_print_ast(n, indent, i == len(node) - 1))
-        return "\n".join(result)
-    else:
-        return old_pretty_print_ast(node, indent, is_last)
-
-# Define the original semantic_analysis function
-def semantic_analysis(ast):
-    symbol_table = {}
-    errors = []
-    type_info = {}
-    
-    def get_type(value):
-        if isinstance(value, int):
-            return "int"
-        elif isinstance(value, float):
-            return "float"
-        elif isinstance(value, str):
-            return "str"
-        elif isinstance(value, bool):
-            return "bool"
-        elif isinstance(value, list):
-            return "list"
-        elif value is None:
-            return "None"
-        return str(type(value).__name__)
-
-    def visit(node):
-        if isinstance(node, list):
-            for n in node:
-                visit(n)
-            return None
-        elif hasattr(node, "__class__"):
-            cname = node.__class__.__name__
-            
-            if cname == "Assign":
-                value = visit(node.expr)
-                var_name = node.name.name if hasattr(node.name, 'name') else node.name
-                type_info[var_name] = get_type(value)
-                symbol_table[var_name] = value
-                return value
-                
-            elif cname == "Identifier":
-                var_name = node.name
-                if var_name not in symbol_table:
-                    errors.append(f"❌ Undeclared variable: '{var_name}'")
-                    return None
-                return symbol_table[var_name]
-                
-            elif cname == "BinaryOp":
-                left = visit(node.left)
-                right = visit(node.right)
-                left_type = get_type(left)
-                right_type = get_type(right)
-                
-                if left is not None and right is not None:
-                    if node.op in ['+', '-', '*', '/', '%']:
-                        if left_type not in ['int', 'float'] or right_type not in ['int', 'float']:
-                            errors.append(f"❌ Type mismatch in arithmetic operation '{node.op}': {left_type} and {right_type}")
-                    elif node.op in ['<', '>', '<=', '>=', '==', '!=']:
-                        if left_type != right_type:
-                            errors.append(f"❌ Type mismatch in comparison '{node.op}': {left_type} and {right_type}")
-                    elif node.op in ['and', 'or']:
-                        if left_type != 'bool' or right_type != 'bool':
-                            errors.append(f"❌ Type mismatch in logical operation '{node.op}': {left_type} and {right_type}")
-                return None
-                
-            elif cname == "Number":
-                return node.value
-                
-            elif cname == "String":
-                return node.value
-                
-            elif cname == "Boolean":
-                return node.value
-                
-            elif cname == "Print":
-                expr = visit(node.expr)
-                if expr is not None:
-                    type_info['print_expr'] = get_type(expr)
-                return None
-                
-            elif cname == "IfElse":
-                cond = visit(node.condition)
-                if cond is not None and get_type(cond) != 'bool':
-                    errors.append(f"❌ Condition must be a boolean, got {get_type(cond)}")
-                visit(node.if_body)
-                if node.else_body:
-                    visit(node.else_body)
-                return None
-                
-            elif cname == "WhileLoop":
-                cond = visit(node.condition)
-                if cond is not None and get_type(cond) != 'bool':
-                    errors.append(f"❌ While loop condition must be a boolean, got {get_type(cond)}")
-                visit(node.body)
-                return None
-                
-            elif cname == "ForLoop":
-                var_name = node.var.name if hasattr(node.var, 'name') else node.var
-                iterable = visit(node.iterable)
-                if iterable is not None:
-                    iter_type = get_type(iterable)
-                    if iter_type not in ['list', 'range']:
-                        errors.append(f"❌ For loop iterable must be a list or range, got {iter_type}")
-                old_symbol_table = symbol_table.copy()
-                symbol_table[var_name] = None
-                visit(node.body)
-                symbol_table.clear()
-                symbol_table.update(old_symbol_table)
-                return None
-                
-            elif cname == "FunctionDef":
-                func_name = node.name
-                symbol_table[func_name] = "function"
-                type_info[func_name] = "function"
-                old_symbol_table = symbol_table.copy()
-                for param in node.params:
-                    symbol_table[param] = None
-                    type_info[param] = "parameter"
-                visit(node.body)
-                symbol_table.clear()
-                symbol_table.update(old_symbol_table)
-                return None
-                
-            elif cname == "FunctionCall":
-                func_name = node.name.name if hasattr(node.name, 'name') else node.name
-                if func_name not in symbol_table:
-                    errors.append(f"❌ Undeclared function: '{func_name}'")
-                for arg in node.args:
-                    visit(arg)
-                return None
-                
-            elif cname == "ListNode":
-                elements = [visit(elem) for elem in node.elements]
-                return elements
-                
-            elif cname == "IndexNode":
-                lst = visit(node.expr)
-                idx = visit(node.index)
-                if lst is not None and get_type(lst) != 'list':
-                    errors.append(f"❌ Indexing requires a list, got {get_type(lst)}")
-                if idx is not None and get_type(idx) != 'int':
-                    errors.append(f"❌ List index must be an integer, got {get_type(idx)}")
-                return None
-                
-            elif cname == "StringMethod":
-                string_obj = visit(node.string_obj)
-                if string_obj is not None and get_type(string_obj) != 'str':
-                    errors.append(f"❌ String method '{node.method}' called on non-string type: {get_type(string_obj)}")
-                for arg in getattr(node, 'args', []) or []:
-                    visit(arg)
-                return None
-                
-            elif cname == "RangeCall":
-                args = [node.start, node.stop, node.step]
-                for i, arg in enumerate(args):
-                    val = visit(arg) if arg is not None else None
-                    if val is not None and get_type(val) != 'int':
-                        errors.append(f"❌ Range argument {i+1} must be an integer, got {get_type(val)}")
-                return None
-                
-            elif cname == "Return":
-                value = visit(node.expr)
-                if value is not None:
-                    type_info['return_value'] = get_type(value)
-                return None
-                
-            elif cname == "TryExcept":
-                visit(node.try_body)
-                visit(node.except_body)
-                return None
-                
-            elif cname == "LenFunction":
-                expr = visit(node.expr)
-                if expr is not None:
-                    expr_type = get_type(expr)
-                    if expr_type not in ['list', 'str']:
-                        errors.append(f"❌ len() requires a list or string, got {expr_type}")
-                return None
-                
-            elif cname == "UnaryOp":
-                expr = visit(node.expr)
-                if expr is not None:
-                    expr_type = get_type(expr)
-                    if node.op == '-' and expr_type not in ['int', 'float']:
-                        errors.append(f"❌ Unary minus requires a number, got {expr_type}")
-                    elif node.op == 'not' and expr_type != 'bool':
-                        errors.append(f"❌ Logical not requires a boolean, got {expr_type}")
-                return None
-                
-            return None
-        return None
-
-    visit(ast)
-    
-    # Format the output
-    output = []
-    if errors:
-        output.append("❌ Semantic Errors Found:")
-        for error in errors:
-            output.append(f"  {error}")
-    else:
-        output.append("✅ No semantic errors found!")
-        
-    output.append("\nType Information:")
-    output.append("----------------")
-    for var, type_name in type_info.items():
-        output.append(f"  {var}: {type_name}")
-        
-    output.append("\nSymbol Table:")
-    output.append("-------------")
-    for var, value in symbol_table.items():
-        if value == "function":
-            output.append(f"  {var}: function")
-        else:
-            output.append(f"  {var}: {get_type(value)}")
-            
-    return len(errors) == 0, "\n".join(output)
-
-# Define the original generate_icg function
-def generate_icg(ast):
-    code_lines = []
-    temp_counter = [0]
-    label_counter = [0]
-    
-    def new_temp():
-        temp_counter[0] += 1
-        return f"t{temp_counter[0]}"
-        
-    def new_label():
-        label_counter[0] += 1
-        return f"L{label_counter[0]}"
-        
-    def visit(node):
-        if isinstance(node, list):
-            for n in node:
-                visit(n)
-            return None
-        elif hasattr(node, "__class__"):
-            cname = node.__class__.__name__
-            
-            if cname == "Assign":
-                rhs = visit(node.expr)
-                code_lines.append(f"{node.name} = {rhs}")
-                return node.name
-                
-            elif cname == "Number":
-                temp = new_temp()
-                code_lines.append(f"{temp} = {node.value}")
-                return temp
-                
-            elif cname == "String":
-                temp = new_temp()
-                code_lines.append(f"{temp} = '{node.value}'")
-                return temp
-                
-            elif cname == "Boolean":
-                temp = new_temp()
-                code_lines.append(f"{temp} = {node.value}")
-                return temp
-                
-            elif cname == "Identifier":
-                temp = new_temp()
-                code_lines.append(f"{temp} = {node.name}")
-                return temp
-                
-            elif cname == "BinaryOp":
-                left = visit(node.left)
-                right = visit(node.right)
-                temp = new_temp()
-                code_lines.append(f"{temp} = {left} {node.op} {right}")
-                return temp
-                
-            elif cname == "UnaryOp":
-                expr = visit(node.expr)
-                temp = new_temp()
-                code_lines.append(f"{temp} = {node.op} {expr}")
-                return temp
-                
-            elif cname == "Print":
-                val = visit(node.expr)
-                code_lines.append(f"print {val}")
-                return None
-                
-            elif cname == "IfElse":
-                cond = visit(node.condition)
-                else_label = new_label()
-                end_label = new_label()
-                
-                code_lines.append(f"if {cond} == False goto {else_label}")
-                for stmt in node.if_body:
-                    visit(stmt)
-                code_lines.append(f"goto {end_label}")
-                code_lines.append(f"{else_label}:")
-                if node.else_body:
-                    for stmt in node.else_body:
-                        visit(stmt)
-                code_lines.append(f"{end_label}:")
-                return None
-                
-            elif cname == "WhileLoop":
-                start_label = new_label()
-                end_label = new_label()
-                
-                code_lines.append(f"{start_label}:")
-                cond = visit(node.condition)
-                code_lines.append(f"if {cond} == False goto {end_label}")
-                for stmt in node.body:
-                    visit(stmt)
-                code_lines.append(f"goto {start_label}")
-                code_lines.append(f"{end_label}:")
-                return None
-                
-            elif cname == "ForLoop":
-                start_label = new_label()
-                end_label = new_label()
-                iter_var = new_temp()
-                
-                # Initialize iterator
-                iter_expr = visit(node.iterable)
-                code_lines.append(f"{iter_var} = {iter_expr}")
-                
-                code_lines.append(f"{start_label}:")
-                # Check if iteration is complete
-                code_lines.append(f"if {iter_var} == None goto {end_label}")
-                
-                # Assign current value to loop variable
-                code_lines.append(f"{node.var} = {iter_var}")
-                
-                # Execute loop body
-                for stmt in node.body:
-                    visit(stmt)
-                    
-                # Move to next iteration
-                code_lines.append(f"goto {start_label}")
-                code_lines.append(f"{end_label}:")
-                return None
-                
-            elif cname == "FunctionDef":
-                code_lines.append(f"function {node.name}:")
-                for param in node.params:
-                    code_lines.append(f"param {param}")
-                for stmt in node.body:
-                    visit(stmt)
-                return None
-                
-            elif cname == "FunctionCall":
-                args = [visit(arg) for arg in node.args]
-                # Convert None to 'None' string to avoid join error
-                safe_args = [str(a) if a is not None else "None" for a in args]
-                temp = new_temp()
-                code_lines.append(f"{temp} = call {node.name}({', '.join(safe_args)})")
-                return temp
-                
-            elif cname == "ListNode":
-                temp = new_temp()
-                code_lines.append(f"{temp} = []")
-                for elem in node.elements:
-                    elem_temp = visit(elem)
-                    code_lines.append(f"{temp}.append({elem_temp})")
-                return temp
-                
-            elif cname == "IndexNode":
-                lst = visit(node.expr)
-                idx = visit(node.index)
-                temp = new_temp()
-                code_lines.append(f"{temp} = {lst}[{idx}]")
-                return temp
-                
-            elif cname == "ListAssign":
-                lst = visit(node.expr)
-                idx = visit(node.index)
-                val = visit(node.value)
-                code_lines.append(f"{lst}[{idx}] = {val}")
-                return None
-                
-            elif cname == "Return":
-                val = visit(node.expr)
-                code_lines.append(f"return {val}")
-                return None
-                
-            elif cname == "Break":
-                code_lines.append("break")
-                return None
-                
-            elif cname == "Continue":
-                code_lines.append("continue")
-                return None
-                
-            elif cname == "TryExcept":
-                try_label = new_label()
-                except_label = new_label()
-                end_label = new_label()
-                
-                code_lines.append(f"{try_label}:")
-                for stmt in node.try_block:
-                    visit(stmt)
-                code_lines.append(f"goto {end_label}")
-                
-                code_lines.append(f"{except_label}:")
-                for stmt in node.except_block:
-                    visit(stmt)
-                    
-                code_lines.append(f"{end_label}:")
-                return None
-                
-            elif cname == "StringMethod":
-                string_obj = visit(node.string_obj)
-                temp = new_temp()
-                if node.method == "upper":
-                    code_lines.append(f"{temp} = {string_obj}.upper()")
-                elif node.method == "lower":
-                    code_lines.append(f"{temp} = {string_obj}.lower()")
-                elif node.method == "strip":
-                    code_lines.append(f"{temp} = {string_obj}.strip()")
-                elif node.method == "replace":
-                    args = [visit(arg) for arg in node.args]
-                    code_lines.append(f"{temp} = {string_obj}.replace({args[0]}, {args[1]})")
-                return temp
-                
-            elif cname == "LenFunction":
-                expr = visit(node.expr)
-                temp = new_temp()
-                code_lines.append(f"{temp} = len({expr})")
-                return temp
-                
-            elif cname == "RangeCall":
-                start = visit(node.start) if node.start else "0"
-                stop = visit(node.stop) if node.stop else "None"
-                step = visit(node.step) if node.step else "1"
-                temp = new_temp()
-                code_lines.append(f"{temp} = range({start}, {stop}, {step})")
-                return temp
-                
-            return None
-        return None
-
-    visit(ast)
-    
-    # Format the output
-    output = []
-    output.append("Intermediate Code (Three-Address Code):")
-    output.append("=====================================")
-    output.append("")
-    
-    for i, line in enumerate(code_lines, 1):
-        output.append(f"{i:3d} | {line}")
-        
-    output.append("\nLegend:")
-    output.append("-------")
-    output.append("tN    : Temporary variable")
-    output.append("LN    : Label")
-    output.append("goto  : Jump instruction")
-    output.append("call  : Function call")
-    output.append("param : Function parameter")
-    
-    return "\n".join(output)
-
-# Now patch semantic_analysis and generate_icg
-old_semantic_analysis = semantic_analysis
-def semantic_analysis(ast):
-    ast = ensure_list(ast)
-    return old_semantic_analysis(ast)
-
-old_generate_icg = generate_icg
-def generate_icg(ast):
-    ast = ensure_list(ast)
-    return old_generate_icg(ast)
-
 def update_phase_output(phase_name, content):
     text_widget = phase_sections[phase_name]["text"]
     text_widget.config(state=tk.NORMAL)
@@ -852,343 +246,39 @@ def update_phase_output(phase_name, content):
     text_widget.insert("1.0", content)
     text_widget.config(state=tk.DISABLED)
 
-def optimize_code_icg(icg_code):
-    if not icg_code or icg_code == "<no intermediate code generated>":
-        return "⚠️ No intermediate code to optimize."
-        
-    lines = icg_code.split('\n')
-    optimized_lines = []
-    optimizations = []
-    
-    # Skip header and legend
-    start_idx = 0
-    for i, line in enumerate(lines):
-        if line.strip() and not line.startswith('Legend:'):
-            start_idx = i
-            break
-            
-    # Process each line
-    i = start_idx
-    while i < len(lines):
-        line = lines[i].strip()
-        if not line or line.startswith('Legend:'):
-            break
-            
-        # Extract the actual code part (after line number)
-        code = line.split('|', 1)[1].strip() if '|' in line else line
-        
-        # Constant Folding
-        if '=' in code and any(op in code for op in ['+', '-', '*', '/']):
-            try:
-                # Try to evaluate constant expressions
-                left, right = code.split('=', 1)
-                left = left.strip()
-                right = right.strip()
-                
-                # Check if right side is a constant expression
-                if all(c.isdigit() or c in '+-*/() ' for c in right):
-                    result = eval(right)
-                    optimized_lines.append(f"{left} = {result}")
-                    optimizations.append(f"Constant folding: {right} → {result}")
-                    i += 1
-                    continue
-            except:
-                pass
-                
-        # Copy Propagation
-        if '=' in code and not any(op in code for op in ['+', '-', '*', '/']):
-            left, right = code.split('=', 1)
-            left = left.strip()
-            right = right.strip()
-            
-            # Check if right side is just a variable
-            if right.isidentifier():
-                # Look ahead for uses of left
-                for j in range(i + 1, len(lines)):
-                    next_line = lines[j].split('|', 1)[1].strip() if '|' in lines[j] else lines[j]
-                    if left in next_line and '=' not in next_line:
-                        optimized_lines.append(f"# {code}  # Copy propagated")
-                        optimizations.append(f"Copy propagation: {left} → {right}")
-                        i += 1
-                        break
-                else:
-                    optimized_lines.append(code)
-                    i += 1
-                    continue
-                    
-        # Common Subexpression Elimination
-        if i > 0 and i < len(lines) - 1:
-            prev_code = lines[i-1].split('|', 1)[1].strip() if '|' in lines[i-1] else lines[i-1]
-            next_code = lines[i+1].split('|', 1)[1].strip() if '|' in lines[i+1] else lines[i+1]
-            
-            if '=' in code and '=' in prev_code and '=' in next_code:
-                prev_left, prev_right = prev_code.split('=', 1)
-                curr_left, curr_right = code.split('=', 1)
-                next_left, next_right = next_code.split('=', 1)
-                
-                if prev_right.strip() == curr_right.strip():
-                    optimized_lines.append(f"# {code}  # Common subexpression eliminated")
-                    optimizations.append(f"Common subexpression elimination: {curr_right} → {prev_left}")
-                    i += 1
-                    continue
-                    
-        # Loop Optimization
-        if 'goto' in code and 'L' in code:
-            # Check if this is a loop
-            if i > 0 and 'if' in lines[i-1]:
-                # Try to move loop-invariant code outside
-                loop_start = i
-                while i < len(lines) and 'goto' not in lines[i]:
-                    i += 1
-                loop_end = i
-                
-                # Check for loop-invariant code
-                for j in range(loop_start, loop_end):
-                    loop_line = lines[j].split('|', 1)[1].strip() if '|' in lines[j] else lines[j]
-                    if '=' in loop_line and not any(var in loop_line for var in ['i', 'j', 'k']):
-                        optimized_lines.append(f"# {loop_line}  # Moved outside loop")
-                        optimizations.append(f"Loop optimization: Moved invariant code outside loop")
-                        continue
-                    optimized_lines.append(loop_line)
-                i += 1
-                continue
-                
-        # Dead Code Elimination
-        if '=' in code:
-            left = code.split('=', 1)[0].strip()
-            # Check if variable is used later
-            used = False
-            for j in range(i + 1, len(lines)):
-                next_line = lines[j].split('|', 1)[1].strip() if '|' in lines[j] else lines[j]
-                if left in next_line and '=' not in next_line:
-                    used = True
-                    break
-            if not used:
-                optimized_lines.append(f"# {code}  # Dead code eliminated")
-                optimizations.append(f"Dead code elimination: {left} is never used")
-                i += 1
-                continue
-                
-        optimized_lines.append(code)
-        i += 1
-        
-    # Format the output
-    output = []
-    output.append("Code Optimization Analysis:")
-    output.append("==========================")
-    output.append("")
-    
-    if optimizations:
-        output.append("Applied Optimizations:")
-        output.append("---------------------")
-        for opt in optimizations:
-            output.append(f"✓ {opt}")
-        output.append("")
-        
-    output.append("Optimized Code:")
-    output.append("--------------")
-    for i, line in enumerate(optimized_lines, 1):
-        output.append(f"{i:3d} | {line}")
-        
-    output.append("\nOptimization Summary:")
-    output.append("-------------------")
-    output.append(f"• Total optimizations applied: {len(optimizations)}")
-    output.append("• Types of optimizations:")
-    output.append("  - Constant folding")
-    output.append("  - Copy propagation")
-    output.append("  - Common subexpression elimination")
-    output.append("  - Loop optimization")
-    output.append("  - Dead code elimination")
-    
-    return "\n".join(output)
-
-def generate_code(optimized_code):
-    if not optimized_code or "No intermediate code" in optimized_code:
-        return "⚠️ No code to generate."
-        
-    lines = optimized_code.split('\n')
-    generated_code = []
-    reg_counter = [0]
-    label_counter = [0]
-    
-    def new_reg():
-        reg_counter[0] += 1
-        return f"R{reg_counter[0]}"
-        
-    def new_label():
-        label_counter[0] += 1
-        return f"L{label_counter[0]}"
-        
-    # Skip header and summary
-    start_idx = 0
-    for i, line in enumerate(lines):
-        if "Optimized Code:" in line:
-            start_idx = i + 2
-            break
-            
-    # Process each line
-    i = start_idx
-    while i < len(lines):
-        line = lines[i].strip()
-        if not line or "Optimization Summary" in line:
-            break
-            
-        # Extract the actual code part (after line number)
-        code = line.split('|', 1)[1].strip() if '|' in line else line
-        
-        # Skip commented lines
-        if code.startswith('#'):
-            i += 1
-            continue
-            
-        # Assignment
-        if '=' in code:
-            left, right = code.split('=', 1)
-            left = left.strip()
-            right = right.strip()
-            
-            # Constant assignment
-            if right.isdigit():
-                reg = new_reg()
-                generated_code.append(f"MOV {reg}, #{right}    ; Load constant {right}")
-                generated_code.append(f"STR {reg}, [{left}]   ; Store in {left}")
-                
-            # Variable assignment
-            elif right.isidentifier():
-                reg1 = new_reg()
-                reg2 = new_reg()
-                generated_code.append(f"LDR {reg1}, [{right}]  ; Load {right}")
-                generated_code.append(f"STR {reg1}, [{left}]   ; Store in {left}")
-                
-            # Arithmetic operation
-            elif any(op in right for op in ['+', '-', '*', '/']):
-                op = next(op for op in ['+', '-', '*', '/'] if op in right)
-                left_op, right_op = right.split(op)
-                left_op = left_op.strip()
-                right_op = right_op.strip()
-                
-                reg1 = new_reg()
-                reg2 = new_reg()
-                reg3 = new_reg()
-                
-                # Load operands
-                if left_op.isdigit():
-                    generated_code.append(f"MOV {reg1}, #{left_op}  ; Load constant {left_op}")
-                else:
-                    generated_code.append(f"LDR {reg1}, [{left_op}] ; Load {left_op}")
-                    
-                if right_op.isdigit():
-                    generated_code.append(f"MOV {reg2}, #{right_op}  ; Load constant {right_op}")
-                else:
-                    generated_code.append(f"LDR {reg2}, [{right_op}] ; Load {right_op}")
-                    
-                # Perform operation
-                if op == '+':
-                    generated_code.append(f"ADD {reg3}, {reg1}, {reg2}  ; Add operands")
-                elif op == '-':
-                    generated_code.append(f"SUB {reg3}, {reg1}, {reg2}  ; Subtract operands")
-                elif op == '*':
-                    generated_code.append(f"MUL {reg3}, {reg1}, {reg2}  ; Multiply operands")
-                elif op == '/':
-                    generated_code.append(f"DIV {reg3}, {reg1}, {reg2}  ; Divide operands")
-                    
-                generated_code.append(f"STR {reg3}, [{left}]   ; Store result in {left}")
-                
-        # Print statement
-        elif code.startswith('print'):
-            reg = new_reg()
-            var = code.split('print', 1)[1].strip()
-            generated_code.append(f"LDR {reg}, [{var}]  ; Load value to print")
-            generated_code.append(f"PUSH {reg}         ; Push to stack for printing")
-            generated_code.append(f"CALL print         ; Call print function")
-            generated_code.append(f"POP {reg}          ; Clean up stack")
-            
-        # If statement
-        elif code.startswith('if'):
-            cond = code.split('goto', 1)[0].split('if', 1)[1].strip()
-            label = code.split('goto', 1)[1].strip()
-            
-            if '==' in cond:
-                left, right = cond.split('==')
-                reg1 = new_reg()
-                reg2 = new_reg()
-                generated_code.append(f"LDR {reg1}, [{left.strip()}]  ; Load left operand")
-                if right.strip().isdigit():
-                    generated_code.append(f"MOV {reg2}, #{right.strip()}  ; Load constant")
-                else:
-                    generated_code.append(f"LDR {reg2}, [{right.strip()}]  ; Load right operand")
-                generated_code.append(f"CMP {reg1}, {reg2}  ; Compare operands")
-                generated_code.append(f"BNE {label}      ; Branch if not equal")
-                
-        # Goto statement
-        elif code.startswith('goto'):
-            label = code.split('goto', 1)[1].strip()
-            generated_code.append(f"B {label}          ; Unconditional branch")
-            
-        # Label
-        elif code.endswith(':'):
-            generated_code.append(f"{code}             ; Label")
-            
-        # Function call
-        elif code.startswith('call'):
-            func = code.split('call', 1)[1].split('(')[0].strip()
-            args = code.split('(')[1].rstrip(')').split(',')
-            for arg in args:
-                reg = new_reg()
-                generated_code.append(f"LDR {reg}, [{arg.strip()}]  ; Load argument")
-                generated_code.append(f"PUSH {reg}         ; Push argument to stack")
-            generated_code.append(f"CALL {func}         ; Call function")
-            for _ in args:
-                generated_code.append(f"POP {new_reg()}     ; Clean up stack")
-                
-        # Return statement
-        elif code.startswith('return'):
-            val = code.split('return', 1)[1].strip()
-            reg = new_reg()
-            generated_code.append(f"LDR {reg}, [{val}]  ; Load return value")
-            generated_code.append(f"MOV R0, {reg}      ; Set return register")
-            generated_code.append(f"RET                ; Return from function")
-            
-        i += 1
-        
-    # Format the output
-    output = []
-    output.append("Code Generation (Assembly-like):")
-    output.append("===============================")
-    output.append("")
-    
-    if generated_code:
-        output.append("Generated Code:")
-        output.append("--------------")
-        for i, line in enumerate(generated_code, 1):
-            output.append(f"{i:3d} | {line}")
-            
-        output.append("\nRegister Usage:")
-        output.append("--------------")
-        output.append(f"• Total registers used: {reg_counter[0]}")
-        output.append("• Register naming: R1, R2, R3, ...")
-        
-        output.append("\nLabel Usage:")
-        output.append("-----------")
-        output.append(f"• Total labels used: {label_counter[0]}")
-        output.append("• Label naming: L1, L2, L3, ...")
-        
-        output.append("\nInstruction Types:")
-        output.append("-----------------")
-        output.append("• MOV: Move immediate value to register")
-        output.append("• LDR: Load from memory to register")
-        output.append("• STR: Store from register to memory")
-        output.append("• ADD/SUB/MUL/DIV: Arithmetic operations")
-        output.append("• CMP: Compare operands")
-        output.append("• B/BNE: Branch instructions")
-        output.append("• PUSH/POP: Stack operations")
-        output.append("• CALL/RET: Function calls")
-    else:
-        output.append("No code generated.")
-        
-    return "\n".join(output)
+# JSON of the last execution profile shown on the compiler phases screen
+last_profile_json = None
+# Nodes the profiled run may evaluate (well under a second) before it is stopped, so that a
+# long or endless loop cannot freeze the window
+PROFILE_MAX_STEPS = 200000
+
+def profile_program(code):
+    """Run the program in the profiling interpreter and show where its time went."""
+    global last_profile_json
+    interpreter = Interpreter(profile=True)
+    interpreter.profiler.max_steps = PROFILE_MAX_STEPS
+    old_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        interpreter.execute(code)
+        status = "✅ Program ran to completion"
+    except ProfileLimitExceeded:
+        status = f"⏱ Program stopped after {PROFILE_MAX_STEPS} steps; the profile covers the run so far"
+    except Exception as e:
+        status = f"❌ Program stopped with an error: {e}"
+    finally:
+        sys.stdout = old_stdout
+    last_profile_json = interpreter.profiler.to_json()
+    update_phase_output("Execution Profile",
+        status + "\n\n" +
+        format_profile_report(interpreter.profiler, code) + "\n\n" +
+        "💾 Use \"Save Profile JSON\" to export the full profile.")
+
+# Timing, memory and output sizes of the phases of the last analysis
+last_phase_metrics = None
 
 def analyze_phases():
+    global last_phase_metrics
     code = code_input.get("1.0", tk.END).strip()
     if not code:
         update_phase_output("Lexical Analysis", "⚠️ Please enter some code to analyze.")
@@ -1197,11 +287,14 @@ def analyze_phases():
         update_phase_output("Intermediate Code Generation", "")
         update_phase_output("Code Optimization", "")
         update_phase_output("Code Generation", "")
+        update_phase_output("Execution Profile", "")
+        update_phase_output("Phase Metrics", "")
         return
 
+    metrics = last_phase_metrics = PhaseMetrics()
     try:
         # Lexical Analysis
-        tokens = tokenize(code)
+        tokens = metrics.measure("tokenize", tokenize, code, size=len, unit="tokens")
         if tokens:
             update_phase_output("Lexical Analysis", format_token_output(tokens))
         else:
@@ -1218,8 +311,7 @@ def analyze_phases():
 
         # Always try to parse AST, even if compile() fails
         try:
-            ast = parser.parse(code)
-            ast = ensure_list(ast)
+            ast = metrics.measure("parse", parse_program, code, size=count_nodes, unit="AST nodes")
             if not ast:
                 raise Exception("No AST generated (possible syntax error).")
             ast_str = pretty_print_ast(ast)
@@ -1242,11 +334,15 @@ def analyze_phases():
             update_phase_output("Intermediate Code Generation", "")
             update_phase_output("Code Optimization", "")
             update_phase_output("Code Generation", "")
+            update_phase_output("Execution Profile", "")
             return
 
+        # Execution Profile (runs the program itself, so it does not depend on the later phases)
+        profile_program(code)
+
         # Semantic Analysis
         try:
-            sem_ok, sem_msg = semantic_analysis(ast)
+            sem_ok, sem_msg = metrics.measure("semantic_analysis", semantic_analysis, ast)
             if not sem_ok:
                 update_phase_output("Semantic Analysis", 
                     "❌ Semantic Errors Found:\n" +
@@ -1280,7 +376,8 @@ def analyze_phases():
 
         # Intermediate Code Generation
         try:
-            icg_code = generate_icg(ast)
+            icg_code = metrics.measure("generate_icg", generate_icg, ast,
+                                       size=listing_size, unit="IR instructions")
             update_phase_output("Intermediate Code Generation", 
                 "✅ Intermediate Code Generated:\n" +
                 "===========================\n" +
@@ -1297,11 +394,13 @@ def analyze_phases():
 
         # Code Optimization
         try:
-            optimized_code = optimize_code_icg(icg_code)
+            optimized_code = metrics.measure("optimize_code_icg", optimize_code_icg, icg_code,
+                                             size=listing_size, unit="IR instructions")
             update_phase_output("Code Optimization", 
                 "✅ Code Optimization Results:\n" +
                 "=========================\n" +
-                optimized_code)
+                optimized_code + "\n\n" +
+                compare_icg_runs(icg_code, optimized_code))
         except Exception as e:
             update_phase_output("Code Optimization", 
                 "❌ Error in Code Optimization:\n" +
@@ -1313,7 +412,8 @@ def analyze_phases():
 
         # Code Generation
         try:
-            codegen = generate_code(optimized_code)
+            codegen = metrics.measure("generate_code", generate_code, optimized_code,
+                                      size=listing_size, unit="instructions")
             update_phase_output("Code Generation", 
                 "✅ Final Generated Code:\n" +
                 "=====================\n" +
@@ -1336,6 +436,203 @@ def analyze_phases():
         update_phase_output("Intermediate Code Generation", "")
         update_phase_output("Code Optimization", "")
         update_phase_output("Code Generation", "")
+        update_phase_output("Execution Profile", "")
+
+    finally:
+        update_phase_output("Phase Metrics",
+            format_phase_metrics(metrics) + "\n\n" +
+            "Times include tracemalloc's bookkeeping; peak memory is what each phase allocated.\n" +
+            "💾 Use \"Save Phase Metrics\" to append them to a JSON lines file or write a Prometheus text file.")
+
+# ---------- Debugger (Testing Screen) ----------
+
+# line -> condition of the breakpoint on it (None if it always pauses), set in the editor's gutter
+breakpoints = {}
+# The program being debugged: its debugger, queues to and from its thread and its output
+debug_session = None
+# Line the debugged program is paused before, marked in the gutter and the editor
+paused_line = None
+
+def redraw_gutter(*args):
+    """Draw line numbers and breakpoint markers beside the editor's visible lines."""
+    gutter.delete("all")
+    index = input_text.index("@0,0")
+    while True:
+        info = input_text.dlineinfo(index)
+        if info is None:
+            break
+        line = int(index.split(".")[0])
+        y = info[1] + info[3] // 2
+        if line in breakpoints:
+            color = "#E53935" if breakpoints[line] is None else "#FB8C00"
+            gutter.create_oval(4, y - 5, 14, y + 5, fill=color, outline=color)
+        if line == paused_line:
+            gutter.create_text(24, y, text="▶", fill="#FFD700", font=("Fira Mono", 10))
+        gutter.create_text(58, y, anchor="e", text=str(line), fill="#6C7380", font=("Fira Mono", 10))
+        next_index = input_text.index(f"{index}+1line")
+        if next_index == index:
+            break
+        index = next_index
+
+def gutter_line(event):
+    return int(input_text.index(f"@0,{event.y}").split(".")[0])
+
+def set_breakpoint(line, condition):
+    """Add or change a breakpoint, in the running debug session too; False if the condition does not parse."""
+    try:
+        if debug_session is not None:
+            debug_session["debugger"].set_breakpoint(line, condition)
+        elif condition is not None:
+            parse_condition(condition)
+    except SyntaxError as e:
+        messagebox.showerror("Invalid breakpoint condition", str(e))
+        return False
+    breakpoints[line] = condition
+    return True
+
+def toggle_breakpoint(event):
+    line = gutter_line(event)
+    if line in breakpoints:
+        del breakpoints[line]
+        if debug_session is not None:
+            debug_session["debugger"].clear_breakpoint(line)
+    else:
+        set_breakpoint(line, None)
+    redraw_gutter()
+
+def edit_breakpoint_condition(event):
+    """Ask for the condition of the breakpoint on the clicked line; an empty one makes it unconditional."""
+    line = gutter_line(event)
+    condition = simpledialog.askstring(
+        "Breakpoint Condition", f"Pause at line {line} only when this expression is true:",
+        initialvalue=breakpoints.get(line) or "", parent=root)
+    if condition is not None:
+        set_breakpoint(line, condition.strip() or None)
+        redraw_gutter()
+
+def show_debug_state(text):
+    debug_box.config(state=tk.NORMAL)
+    debug_box.delete("1.0", tk.END)
+    debug_box.insert("1.0", text)
+    debug_box.config(state=tk.DISABLED)
+
+def mark_paused_line(line):
+    global paused_line
+    paused_line = line
+    input_text.tag_remove("debug_line", "1.0", tk.END)
+    if line is not None:
+        input_text.tag_add("debug_line", f"{line}.0", f"{line}.0 lineend+1c")
+        input_text.see(f"{line}.0")
+    redraw_gutter()
+
+def update_debug_buttons():
+    running = debug_session is not None
+    paused = running and debug_session["paused"]
+    debug_button.config(state=tk.DISABLED if running else tk.NORMAL)
+    pause_button.config(state=tk.NORMAL if running and not paused else tk.DISABLED)
+    stop_button.config(state=tk.NORMAL if running else tk.DISABLED)
+    for button in step_buttons:
+        button.config(state=tk.NORMAL if paused else tk.DISABLED)
+
+def run_debug_session(session, code):
+    """Run the debugged program; this is the session's own thread, which must not touch the widgets."""
+    old_stdout = sys.stdout
+    sys.stdout = session["output"]
+    try:
+        Interpreter(debugger=session["debugger"]).execute(code)
+        status = "✅ Program ran to completion"
+    except DebuggerQuit:
+        status = "⏹ Debugging stopped"
+    except Exception as e:
+        status = f"❌ Error: {e}"
+    finally:
+        sys.stdout = old_stdout
+    session["events"].put(("finished", status))
+
+def wait_for_debug_command(session, pause):
+    """Called by the debugger at each pause, in the program's thread: wait for the next command."""
+    session["events"].put(("paused", pause))
+    return session["commands"].get()
+
+def show_debug_output(session):
+    output = session["output"].getvalue()
+    if len(output) > session["shown"]:
+        output_box.config(state=tk.NORMAL)
+        output_box.insert(tk.END, output[session["shown"]:])
+        output_box.see(tk.END)
+        output_box.config(state=tk.DISABLED)
+        session["shown"] = len(output)
+
+def poll_debugger():
+    """Show the debugged program's output, pauses and end, checking again shortly while it runs."""
+    global debug_session
+    session = debug_session
+    if session is None:
+        return
+    show_debug_output(session)
+    while True:
+        try:
+            event = session["events"].get_nowait()
+        except queue.Empty:
+            break
+        if event[0] == "paused":
+            session["paused"] = True
+            mark_paused_line(event[1].line)
+            show_debug_state(format_pause(event[1], session["code"]))
+        else:
+            show_debug_output(session)
+            debug_session = None
+            mark_paused_line(None)
+            show_debug_state(event[1])
+            update_debug_buttons()
+            return
+    update_debug_buttons()
+    root.after(50, poll_debugger)
+
+def start_debugging():
+    """Run the editor's program in the interpreter, pausing at the gutter's breakpoints."""
+    global debug_session
+    if debug_session is not None:
+        return
+    code = input_text.get("1.0", tk.END)
+    session = {"commands": queue.Queue(), "events": queue.Queue(), "output": io.StringIO(),
+               "shown": 0, "paused": False, "code": code}
+    session["debugger"] = Debugger(lambda pause: wait_for_debug_command(session, pause))
+    for line, condition in breakpoints.items():
+        session["debugger"].set_breakpoint(line, condition)
+    debug_session = session
+    output_box.config(state=tk.NORMAL)
+    output_box.delete("1.0", tk.END)
+    output_box.config(state=tk.DISABLED)
+    show_debug_state("Running...")
+    update_debug_buttons()
+    threading.Thread(target=run_debug_session, args=(session, code), name="debugged-program",
+                     daemon=True).start()
+    root.after(50, poll_debugger)
+
+def send_debug_command(command):
+    """Resume the paused program with a debugger command (continue or a step)."""
+    if debug_session is None or not debug_session["paused"]:
+        return
+    debug_session["paused"] = False
+    mark_paused_line(None)
+    show_debug_state("Running...")
+    update_debug_buttons()
+    debug_session["commands"].put(command)
+
+def pause_debugging():
+    if debug_session is not None and not debug_session["paused"]:
+        debug_session["debugger"].interrupt()
+
+def stop_debugging():
+    if debug_session is None:
+        return
+    if debug_session["paused"]:
+        send_debug_command("quit")
+    else:
+        # Answered as soon as the program reaches its next statement
+        debug_session["commands"].put("quit")
+        debug_session["debugger"].interrupt()
 
 # ---------- Styling ----------
 
@@ -1465,8 +762,18 @@ editor_output_pane.pack(fill=tk.BOTH, expand=True, padx=30, pady=10)
 # Code editor
 editor_frame = tk.Frame(editor_output_pane, bg="#181A20")
 editor_output_pane.add(editor_frame, stretch="always")
+# Gutter with line numbers: click to toggle a breakpoint, right-click to give it a condition
+gutter = tk.Canvas(editor_frame, width=64, bg="#181A20", highlightthickness=0, cursor="hand2")
+gutter.pack(side=tk.LEFT, fill=tk.Y, padx=(10, 0), pady=10)
 input_text = tk.Text(editor_frame, height=20, font=("Fira Mono", 13), wrap="none", bg="#23272F", fg="#ECECEC", insertbackground="#FFD700", undo=True)
-input_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+input_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10), pady=10)
+input_text.tag_configure("debug_line", background="#3E4451")
+input_highlighter = TextHighlighter(input_text)
+input_text.config(yscrollcommand=redraw_gutter)
+input_text.bind("<KeyRelease>", redraw_gutter)
+input_text.bind("<Configure>", redraw_gutter)
+gutter.bind("<Button-1>", toggle_breakpoint)
+gutter.bind("<Button-3>", edit_breakpoint_condition)
 
 # Output console
 output_frame = tk.Frame(editor_output_pane, bg="#181A20")
@@ -1475,12 +782,32 @@ tk.Label(output_frame, text="Output Console", font=("Segoe UI", 14, "bold"), bg=
 output_box = tk.Text(output_frame, height=20, font=("Fira Mono", 13), wrap="none", state=tk.DISABLED, bg="#263238", fg="#ECEFF1", insertbackground="#FFD700")
 output_box.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
+# Debugger: where the program is paused, its call stack and variables
+tk.Label(output_frame, text="Debugger", font=("Segoe UI", 14, "bold"), bg="#181A20", fg="#00BFAE").pack(fill="x", padx=10)
+debug_box = tk.Text(output_frame, height=10, font=("Fira Mono", 12), wrap="none", state=tk.DISABLED, bg="#263238", fg="#ECEFF1")
+debug_box.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
 # Run and Back buttons
 button_frame = tk.Frame(testing_screen, bg="#23272F")
 button_frame.pack(pady=10)
 tk.Button(button_frame, text="▶ Run Code", font=("Segoe UI", 12, "bold"), bg="#1976D2", fg="white", activebackground="#1565C0", command=execute_code, cursor="hand2", padx=20, pady=10, relief="flat").grid(row=0, column=0, padx=10)
 tk.Button(button_frame, text="🔙 Back", font=("Segoe UI", 12, "bold"), bg="#1976D2", fg="white", activebackground="#1565C0", command=back_to_welcome, cursor="hand2", padx=20, pady=10, relief="flat").grid(row=0, column=1, padx=10)
 
+# Debugger controls
+debug_buttons = tk.Frame(testing_screen, bg="#23272F")
+debug_buttons.pack(pady=(0, 10))
+debug_button = tk.Button(debug_buttons, text="🐞 Debug", font=("Segoe UI", 11, "bold"), bg="#1976D2", fg="white", activebackground="#1565C0", command=start_debugging, cursor="hand2", padx=12, pady=6, relief="flat")
+pause_button = tk.Button(debug_buttons, text="⏸ Pause", font=("Segoe UI", 11, "bold"), bg="#1976D2", fg="white", activebackground="#1565C0", command=pause_debugging, cursor="hand2", padx=12, pady=6, relief="flat")
+step_buttons = [
+    tk.Button(debug_buttons, text=text, font=("Segoe UI", 11, "bold"), bg="#1976D2", fg="white", activebackground="#1565C0", command=lambda command=command: send_debug_command(command), cursor="hand2", padx=12, pady=6, relief="flat")
+    for text, command in [("▶ Continue", "continue"), ("↷ Step Over", "step_over"),
+                          ("↓ Step Into", "step_into"), ("↑ Step Out", "step_out")]
+]
+stop_button = tk.Button(debug_buttons, text="⏹ Stop", font=("Segoe UI", 11, "bold"), bg="#1976D2", fg="white", activebackground="#1565C0", command=stop_debugging, cursor="hand2", padx=12, pady=6, relief="flat")
+for column, button in enumerate([debug_button, pause_button] + step_buttons + [stop_button]):
+    button.grid(row=0, column=column, padx=5)
+update_debug_buttons()
+
 # ---------- Optimizer Screen ----------
 
 optimizer_screen = tk.Frame(root, bg="#f3e5f5")
@@ -1558,6 +885,7 @@ code_input = tk.Text(
 input_scroll.config(command=code_input.yview)
 input_scroll.pack(side="right", fill="y")
 code_input.pack(side="left", fill=tk.BOTH, expand=True, padx=10, pady=10)
+code_input_highlighter = TextHighlighter(code_input)
 
 phases_pane.add(input_frame, stretch="always")
 
@@ -1588,7 +916,9 @@ for phase_name in [
     "Semantic Analysis",
     "Intermediate Code Generation",
     "Code Optimization",
-    "Code Generation"
+    "Code Generation",
+    "Execution Profile",
+    "Phase Metrics"
 ]:
     frame = tk.LabelFrame(
         analysis_inner,
@@ -1637,6 +967,28 @@ analyze_button = tk.Button(
 )
 analyze_button.pack(side="left", padx=20)
 
+profile_json_button = tk.Button(
+    button_frame,
+    text="💾 Save Profile JSON",
+    font=("Segoe UI", 12, "bold"),
+    bg="#1976D2",
+    fg="white",
+    command=download_profile_json,
+    cursor="hand2"
+)
+profile_json_button.pack(side="left", padx=20)
+
+phase_metrics_button = tk.Button(
+    button_frame,
+    text="💾 Save Phase Metrics",
+    font=("Segoe UI", 12, "bold"),
+    bg="#1976D2",
+    fg="white",
+    command=download_phase_metrics,
+    cursor="hand2"
+)
+phase_metrics_button.pack(side="left", padx=20)
+
 back_button = tk.Button(
     button_frame,
     text="🔙 Back",
@@ -0,0 +1,202 @@
+import operator
+
+from ast_nodes import *
+from interpreter import contains
+
+# Inferred types. None means "no assignment seen yet"; UNKNOWN means the type can vary.
+INT = 'int'
+FLOAT = 'float'
+STR = 'str'
+BOOL = 'bool'
+LIST = 'list'
+RANGE = 'range'
+DICT = 'dict'
+SET = 'set'
+UNKNOWN = 'unknown'
+
+PYTHON_TYPES = {INT: int, FLOAT: float, STR: str, BOOL: bool, LIST: list, RANGE: range, DICT: dict, SET: set}
+
+# StringMethod nodes also call list methods (append, pop, extend); only these return a str
+STRING_METHODS = ('upper', 'lower', 'strip', 'replace')
+
+# Result types of builtins that always return the same type (a user function of the same
+# name may shadow one, which the runtime type checks of TypedBinaryOp catch)
+BUILTIN_TYPES = {'str': STR, 'int': INT, 'sorted': LIST, 'reversed': LIST, 'enumerate': LIST, 'zip': LIST}
+
+NUMERIC = (INT, FLOAT)
+ARITHMETIC_OPERATORS = ('+', '-', '*', '/', '%')
+COMPARISON_OPERATORS = ('==', '!=', '<', '>', '<=', '>=', 'in', 'not in')
+
+def _divide(left, right):
+    if right == 0:
+        raise Exception("Division by zero")
+    return left / right
+
+def _modulo(left, right):
+    if right == 0:
+        raise Exception("Modulo by zero")
+    return left % right
+
+PYTHON_OPERATORS = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': _divide, '%': _modulo,
+    '==': operator.eq, '!=': operator.ne, '<': operator.lt, '>': operator.gt,
+    '<=': operator.le, '>=': operator.ge,
+    'in': contains, 'not in': lambda item, container: not contains(item, container),
+}
+
+# Division and modulo by a literal that is known not to be zero skip the zero check
+UNCHECKED_OPERATORS = {'/': operator.truediv, '%': operator.mod}
+
+def is_node(value):
+    """AST nodes and statement lists; TypedBinaryOp's type and operation fields are skipped."""
+    return isinstance(value, list) or (hasattr(value, '__dict__') and not callable(value))
+
+def join(a, b):
+    """Combine the types of two values that can reach the same variable."""
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    return UNKNOWN
+
+def binary_result_type(op, left, right):
+    """Result type of `left op right`, or UNKNOWN when it depends on the values."""
+    if op in COMPARISON_OPERATORS:
+        return BOOL
+    if left is None or right is None:
+        return None
+    if op in ('and', 'or'):
+        return join(left, right)
+    if left in NUMERIC + (BOOL,) and right in NUMERIC + (BOOL,):
+        if op == '/' or FLOAT in (left, right):
+            return FLOAT
+        return INT
+    if op == '+' and left == right and left in (STR, LIST):
+        return left
+    if op == '*' and {left, right} in ({STR, INT}, {LIST, INT}):
+        return STR if STR in (left, right) else LIST
+    return UNKNOWN
+
+def specialized_operation(op, left, right, divisor=None):
+    """Python function implementing `left op right` for the given operand types, or None."""
+    if op not in PYTHON_OPERATORS:
+        return None
+    if left in NUMERIC and right in NUMERIC:
+        pass
+    elif left == right == STR and (op == '+' or op in COMPARISON_OPERATORS):
+        pass
+    elif left == right == BOOL and op in ('==', '!='):
+        pass
+    else:
+        return None
+    if op in UNCHECKED_OPERATORS and isinstance(divisor, Number) and divisor.value != 0:
+        return UNCHECKED_OPERATORS[op]
+    return PYTHON_OPERATORS[op]
+
+class TypeInference:
+    """Flow-insensitive type inference for one scope (the program or a function body).
+
+    Each variable's type is the join of the types of every value assigned to it in the scope,
+    computed to a fixpoint so `x = x + 1` keeps x's type. Function parameters and call results
+    are UNKNOWN, so specialization only happens where every assignment is visible.
+    """
+    def __init__(self, statements, params=()):
+        self.types = {param: UNKNOWN for param in params}
+        self.functions = []
+        changed = True
+        while changed:
+            before = dict(self.types)
+            self.functions = []
+            self.visit(statements)
+            changed = self.types != before
+
+    def assign(self, name, type_name):
+        self.types[name] = join(self.types.get(name), type_name)
+
+    def visit(self, node):
+        """Record the types of every assignment and loop variable, skipping nested functions."""
+        if isinstance(node, list):
+            for n in node:
+                self.visit(n)
+        elif isinstance(node, FunctionDef):
+            self.functions.append(node)
+        elif isinstance(node, Assign):
+            self.assign(node.name.name, self.type_of(node.expr))
+        elif isinstance(node, ForLoop):
+            self.assign(node.var.name, INT if self.type_of(node.iterable) == RANGE else UNKNOWN)
+            self.visit(node.body)
+        elif is_node(node):
+            for value in vars(node).values():
+                if is_node(value):
+                    self.visit(value)
+
+    def type_of(self, node):
+        """Inferred type of an expression."""
+        if isinstance(node, Number):
+            return INT if type(node.value) is int else FLOAT
+        if isinstance(node, String):
+            return STR
+        if isinstance(node, Boolean):
+            return BOOL
+        if isinstance(node, Identifier):
+            return self.types.get(node.name, UNKNOWN)
+        if isinstance(node, BinaryOp):
+            return binary_result_type(node.op, self.type_of(node.left), self.type_of(node.right))
+        if isinstance(node, UnaryOp):
+            operand = self.type_of(node.expr)
+            if node.op == 'not':
+                return BOOL
+            return INT if operand == BOOL else operand
+        if isinstance(node, ListNode):
+            return LIST
+        if isinstance(node, DictNode):
+            return DICT
+        if isinstance(node, SetNode):
+            return SET
+        if isinstance(node, IndexNode):
+            return STR if self.type_of(node.expr) == STR else UNKNOWN
+        if isinstance(node, SliceNode):
+            container = self.type_of(node.expr)
+            return container if container in (STR, LIST, RANGE) else UNKNOWN
+        if isinstance(node, LenFunction):
+            return INT
+        if isinstance(node, StringMethod):
+            return STR if node.method in STRING_METHODS else UNKNOWN
+        if isinstance(node, RangeCall):
+            return RANGE
+        if isinstance(node, BuiltinCall):
+            return BUILTIN_TYPES.get(node.name.name, UNKNOWN)
+        return UNKNOWN
+
+    def specialize(self, node):
+        """Replace BinaryOps whose operand types are known by TypedBinaryOps, returning the node."""
+        if isinstance(node, list):
+            return [self.specialize(n) for n in node]
+        if isinstance(node, FunctionDef) or not is_node(node):
+            return node
+        for field, value in vars(node).items():
+            if is_node(value):
+                setattr(node, field, self.specialize(value))
+        if type(node) is BinaryOp:
+            left, right = self.type_of(node.left), self.type_of(node.right)
+            operation = specialized_operation(node.op, left, right, node.right)
+            if operation is not None:
+                return TypedBinaryOp(node.left, node.op, node.right,
+                                     PYTHON_TYPES[left], PYTHON_TYPES[right], operation)
+        return node
+
+def specialize_types(statements):
+    """Infer types for the program and each function, and specialize their arithmetic in place.
+
+    Returns the program's statements and a dict of inferred variable types per scope
+    ('<module>' for the top level, otherwise the function name).
+    """
+    scopes = {}
+    pending = [('<module>', statements, ())]
+    while pending:
+        name, body, params = pending.pop(0)
+        inference = TypeInference(body, params)
+        body[:] = inference.specialize(body)
+        scopes[name] = {var: type_name or UNKNOWN for var, type_name in inference.types.items()}
+        pending.extend((func.name, func.body, func.params) for func in inference.functions)
+    return statements, scopes
@@ -0,0 +1,307 @@
+import itertools
+import weakref
+from array import array
+
+# array.array typecodes for the element types a TypedList stores unboxed, and back
+TYPECODES = {int: 'q', float: 'd'}
+ELEMENT_TYPES = {'q': int, 'd': float}
+
+def pack(values):
+    """Storage for a list's values: an array.array if they are all ints (or all floats), else the list."""
+    if values:
+        kinds = set(map(type, values))
+        if len(kinds) == 1:
+            typecode = TYPECODES.get(kinds.pop())
+            if typecode is not None:
+                try:
+                    return array(typecode, values)
+                except OverflowError:
+                    pass
+    return values
+
+def make_list(values):
+    """TypedList of evaluated elements, stored in an array if they are numeric (or there are none)."""
+    return TypedList(pack(values) if values else array('q'))
+
+def storage(value):
+    """The array or list holding the elements of a TypedList or ListView (a copy for a view)."""
+    if type(value) is TypedList:
+        return value.items
+    if value.copy is not None:
+        return value.copy.items
+    items, indices = value.base.items, value.indices
+    if not indices:
+        return items[:0]
+    # A range counting down to index 0 stops at -1, which as a slice bound means the last element
+    return items[indices.start:None if indices.stop < 0 else indices.stop:indices.step]
+
+def plain(value):
+    """A TypedList or ListView as a Python list; any other value unchanged."""
+    if type(value) in (TypedList, ListView):
+        items = storage(value)
+        return items if type(items) is list else items.tolist()
+    return value
+
+def type_name(value):
+    """Type name for error messages, in which a TypedList or ListView is a list."""
+    return 'list' if type(value) in (TypedList, ListView) else type(value).__name__
+
+class TypedList:
+    """List value whose elements are stored unboxed in an array('q') or array('d') while they are
+    all ints (that fit in 64 bits) or all floats, using 8 bytes per element instead of a pointer
+    plus a boxed object.
+
+    It behaves like the Python list it stands for. Writing any other value (a bool, a str, a
+    float into an int array, a huge int, ...) converts the storage to a plain list in place, so
+    every variable holding the list sees the change, and iterations over the array that are
+    running at the time carry on over the list from the same position. An empty array that is
+    not being iterated takes the type of the first values added to it instead.
+
+    Slicing returns a ListView sharing the storage; the views are told to copy their elements
+    before an element of the list is replaced or removed.
+    """
+    __slots__ = ('items', 'iterators', 'views')
+
+    def __init__(self, items):
+        self.items = items
+        self.iterators = {}
+        self.views = None
+
+    def detach_views(self):
+        """Give every live view of this list its own copy of its elements."""
+        for view in list(self.views.values()):
+            view.detach()
+        self.views = None
+
+    def to_list(self):
+        """Switch to plain list storage and return the list."""
+        old = self.items
+        self.items = old.tolist()
+        for iterator in self.iterators:
+            # Remember where each running iteration got to and stop it at the end of the array
+            self.iterators[iterator] = iterator.__reduce__()[2]
+            iterator.__setstate__(len(old))
+        return self.items
+
+    def __iter__(self):
+        items = self.items
+        if type(items) is list:
+            return iter(items)
+        return self.iterate_array(items)
+
+    def iterate_array(self, items):
+        iterator = iter(items)
+        self.iterators[iterator] = None
+        try:
+            yield from iterator
+        finally:
+            position = self.iterators.pop(iterator)
+        if position is not None:
+            rest = iter(self.items)
+            rest.__setstate__(position)
+            yield from rest
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ListView(self, range(len(self.items))[index])
+        return self.items[index]
+
+    def __setitem__(self, index, value):
+        if self.views is not None:
+            self.detach_views()
+        items = self.items
+        if type(items) is not list:
+            try:
+                if isinstance(index, slice):
+                    value = list(value)
+                    if set(map(type, value)) <= {ELEMENT_TYPES[items.typecode]}:
+                        items[index] = array(items.typecode, value)
+                        return
+                elif type(value) is ELEMENT_TYPES[items.typecode]:
+                    items[index] = value
+                    return
+            except OverflowError:
+                pass
+            items = self.to_list()
+        items[index] = value
+
+    def retype(self, values):
+        """Store values in place of an empty, unused array; False if the array is in use."""
+        if self.items or self.iterators:
+            return False
+        self.items = pack(values)
+        return True
+
+    def append(self, value):
+        items = self.items
+        if type(items) is not list:
+            if type(value) is ELEMENT_TYPES[items.typecode]:
+                try:
+                    items.append(value)
+                    return
+                except OverflowError:
+                    pass
+            if self.retype([value]):
+                return
+            items = self.to_list()
+        items.append(value)
+
+    def extend(self, values):
+        items = self.items
+        values = list(values.items if type(values) is TypedList else values)
+        if type(items) is not list and values:
+            if set(map(type, values)) <= {ELEMENT_TYPES[items.typecode]}:
+                try:
+                    # Convert first, so an int that does not fit leaves the array unchanged
+                    items.extend(array(items.typecode, values))
+                    return
+                except OverflowError:
+                    pass
+            if self.retype(values):
+                return
+            items = self.to_list()
+        items.extend(values)
+
+    def pop(self, index=-1):
+        if self.views is not None:
+            self.detach_views()
+        return self.items.pop(index)
+
+    def __add__(self, other):
+        if type(other) is TypedList:
+            if type(self.items) is not list and type(other.items) is not list and \
+                    self.items.typecode == other.items.typecode:
+                return TypedList(self.items + other.items)
+        elif type(other) not in (list, ListView):
+            return NotImplemented
+        return make_list(plain(self) + plain(other))
+
+    def __radd__(self, other):
+        if type(other) is not list:
+            return NotImplemented
+        return make_list(other + plain(self))
+
+    def __mul__(self, count):
+        if not isinstance(count, int):
+            return NotImplemented
+        return TypedList(self.items * count)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return plain(self) == plain(other)
+
+    def __ne__(self, other):
+        return plain(self) != plain(other)
+
+    def __lt__(self, other):
+        return plain(self) < plain(other)
+
+    def __le__(self, other):
+        return plain(self) <= plain(other)
+
+    def __gt__(self, other):
+        return plain(self) > plain(other)
+
+    def __ge__(self, other):
+        return plain(self) >= plain(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(plain(self))
+
+class ListView:
+    """Slice of a TypedList that shares the list's storage instead of copying it.
+
+    Creating a view, slicing it again, len() and reading an element take O(1) time, so passing
+    part of a list to a function costs the same as passing the whole list. The view copies the
+    elements it covers the first time either it or its list has an element replaced or removed
+    (appending leaves them in place), so it behaves exactly like the independent list Python's
+    slicing makes. Until then it keeps the whole list alive.
+    """
+    __slots__ = ('base', 'indices', 'copy', '__weakref__')
+
+    def __init__(self, base, indices):
+        self.base = base
+        self.indices = indices
+        self.copy = None
+        if base.views is None:
+            # Keyed by id, as views (like lists) cannot be hashed
+            base.views = weakref.WeakValueDictionary()
+        base.views[id(self)] = self
+
+    def detach(self):
+        """Copy the viewed elements into a TypedList of the view's own, and return it."""
+        if self.copy is None:
+            self.copy = TypedList(storage(self))
+            self.base.views.pop(id(self), None)
+            self.base = None
+        return self.copy
+
+    def __iter__(self):
+        if self.copy is not None:
+            return iter(self.copy)
+        return self.iterate_view()
+
+    def iterate_view(self):
+        items = self.base.items
+        for position, index in enumerate(self.indices):
+            if self.copy is not None:
+                # Detached during the iteration: carry on over the copy, seeing later changes to it
+                yield from itertools.islice(iter(self.copy), position, None)
+                return
+            yield items[index]
+
+    def __len__(self):
+        return len(self.indices) if self.copy is None else len(self.copy)
+
+    def __contains__(self, item):
+        return item in (self.copy if self.copy is not None else iter(self))
+
+    def __getitem__(self, index):
+        if self.copy is not None:
+            return self.copy[index]
+        if isinstance(index, slice):
+            return ListView(self.base, self.indices[index])
+        return self.base.items[self.indices[index]]
+
+    def __setitem__(self, index, value):
+        self.detach()[index] = value
+
+    def append(self, value):
+        self.detach().append(value)
+
+    def extend(self, values):
+        self.detach().extend(values)
+
+    def pop(self, index=-1):
+        return self.detach().pop(index)
+
+    def __add__(self, other):
+        if type(other) not in (list, TypedList, ListView):
+            return NotImplemented
+        return make_list(plain(self) + plain(other))
+
+    def __radd__(self, other):
+        if type(other) is not list:
+            return NotImplemented
+        return make_list(other + plain(self))
+
+    def __mul__(self, count):
+        if not isinstance(count, int):
+            return NotImplemented
+        return make_list(plain(self) * count)
+
+    __rmul__ = __mul__
+
+    __eq__, __ne__ = TypedList.__eq__, TypedList.__ne__
+    __lt__, __le__, __gt__, __ge__ = TypedList.__lt__, TypedList.__le__, TypedList.__gt__, TypedList.__ge__
+    __hash__ = None
+    __repr__ = TypedList.__repr__
@@ -0,0 +1,403 @@
+import functools
+import itertools
+import operator
+from array import array
+
+from ast_nodes import *
+from interpreter import StringBuilder
+from optimizer import ASTTransformer, describe, function_definitions
+from typed_list import ELEMENT_TYPES, ListView, TypedList, storage
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Below this many iterations, converting columns to arrays costs more than it saves
+NUMPY_MIN_LENGTH = 64
+
+# Largest int64, and the largest int magnitude below which every int converts to a float exactly
+INT64_MAX = 2 ** 63 - 1
+EXACT_FLOAT_INT = 2 ** 53
+
+# Operators an element expression may use; applied to Python values or to NumPy arrays alike
+ELEMENT_OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul,
+                     '/': operator.truediv, '%': operator.mod}
+
+REDUCTIONS = {'+': 'sum', '*': 'product'}
+
+# `if element < acc: acc = element` keeps the minimum, whichever side acc is written on
+EXTREMA = {('<', False): 'min', ('>', True): 'min', ('>', False): 'max', ('<', True): 'max'}
+
+def is_bound(node):
+    """Range bounds the vector kernel evaluates itself: ints, variables, len(variable) and +/-."""
+    if isinstance(node, Number):
+        return type(node.value) is int
+    if isinstance(node, Identifier):
+        return True
+    if isinstance(node, LenFunction):
+        return isinstance(node.expr, Identifier)
+    if isinstance(node, BinaryOp) and node.op in ('+', '-'):
+        return is_bound(node.left) and is_bound(node.right)
+    return False
+
+def is_unit_range(node):
+    """range(stop) or range(start, stop) (or with step 1) over bounds of is_bound form."""
+    if not isinstance(node, RangeCall) or node.stop is None:
+        return False
+    if node.step is not None and not (isinstance(node.step, Number) and type(node.step.value) is int
+                                      and node.step.value == 1):
+        return False
+    return is_bound(node.stop) and (node.start is None or is_bound(node.start))
+
+def element_key(node, var, indexed, target):
+    """Structural key of a vectorizable element expression, or None if node is not one.
+
+    Element expressions are built from numbers, variables, the loop variable, xs[i] (in range
+    loops) and + - * / % and unary minus. They must not read the loop's target, which changes
+    while the loop runs.
+    """
+    if isinstance(node, Number):
+        if type(node.value) not in (int, float):
+            return None
+        return ('number', type(node.value).__name__, node.value)
+    if isinstance(node, Identifier):
+        return None if node.name == target else ('name', node.name)
+    if isinstance(node, IndexNode):
+        if (indexed and isinstance(node.expr, Identifier) and isinstance(node.index, Identifier)
+                and node.index.name == var):
+            return ('index', node.expr.name)
+        return None
+    if isinstance(node, UnaryOp):
+        operand = element_key(node.expr, var, indexed, target) if node.op == '-' else None
+        return None if operand is None else ('negate', operand)
+    if isinstance(node, BinaryOp) and node.op in ELEMENT_OPERATORS:
+        left = element_key(node.left, var, indexed, target)
+        right = element_key(node.right, var, indexed, target)
+        if left is None or right is None:
+            return None
+        return (node.op, left, right)
+    return None
+
+def match_kernel(stmt, var, indexed, function_names):
+    """(kind, target, element expression) for the single statement of a vectorizable loop."""
+    if isinstance(stmt, ListAssign):
+        if (indexed and isinstance(stmt.expr, Identifier) and isinstance(stmt.index, Identifier)
+                and stmt.index.name == var):
+            return 'map', stmt.expr.name, stmt.value
+    elif isinstance(stmt, StringMethod):
+        if stmt.method == 'append' and len(stmt.args) == 1 and isinstance(stmt.string_obj, Identifier):
+            return 'append', stmt.string_obj.name, stmt.args[0]
+    elif isinstance(stmt, Assign):
+        target = stmt.name.name
+        expr = stmt.expr
+        if isinstance(expr, BinaryOp) and expr.op in REDUCTIONS:
+            # Addition and multiplication of numbers commute, so acc may be either operand
+            if isinstance(expr.left, Identifier) and expr.left.name == target:
+                return REDUCTIONS[expr.op], target, expr.right
+            if isinstance(expr.right, Identifier) and expr.right.name == target:
+                return REDUCTIONS[expr.op], target, expr.left
+        elif (isinstance(expr, BuiltinCall) and expr.name.name in ('min', 'max')
+                and expr.name.name not in function_names and len(expr.args) == 2
+                and isinstance(expr.args[0], Identifier) and expr.args[0].name == target):
+            # min(acc, e) keeps acc unless e < acc, exactly like the if form below
+            return expr.name.name, target, expr.args[1]
+    elif isinstance(stmt, IfElse):
+        condition = stmt.condition
+        if (not stmt.else_body and len(stmt.if_body) == 1 and isinstance(stmt.if_body[0], Assign)
+                and isinstance(condition, BinaryOp) and condition.op in ('<', '>')):
+            target = stmt.if_body[0].name.name
+            value = stmt.if_body[0].expr
+            for acc, element, acc_first in ((condition.right, condition.left, False),
+                                            (condition.left, condition.right, True)):
+                if (isinstance(acc, Identifier) and acc.name == target and
+                        element_key(element, var, indexed, target) is not None and
+                        element_key(element, var, indexed, target) == element_key(value, var, indexed, target)):
+                    return EXTREMA[(condition.op, acc_first)], target, element
+    return None
+
+class LoopVectorizer(ASTTransformer):
+    """Rewrite element-wise map and reduction loops into VectorizedLoops.
+
+    for i in range(...): c[i] = e          -> map
+    for x in xs: c.append(e)               -> append (range loops too)
+    acc = acc + e / acc = acc * e          -> sum / product
+    if e < acc: acc = e / acc = min(acc, e) -> min (and max likewise)
+    """
+    def run(self, statements):
+        self.function_names = set(function_definitions(statements))
+        return super().run(statements)
+
+    def transform_ForLoop(self, node):
+        node.body = self.transform_block(node.body)
+        indexed = isinstance(node.iterable, RangeCall)
+        if len(node.body) != 1 or not (is_unit_range(node.iterable) or isinstance(node.iterable, Identifier)):
+            return node
+        var = node.var.name
+        kernel = match_kernel(node.body[0], var, indexed, self.function_names)
+        if kernel is None:
+            return node
+        kind, target, element = kernel
+        if target == var or element_key(element, var, indexed, target) is None:
+            return node
+        self.note(f"Vectorized loop: for {var} in {describe(node.iterable)} → {kind} of "
+                  f"{describe(element)} into {target}")
+        return VectorizedLoop(node.var, node.iterable, node.body, kind, target, element)
+
+    def transform_TypedBinaryOp(self, node):
+        # Expressions contain no loops; the type fields of typed nodes are not AST nodes
+        return node
+
+def vectorize_loops(statements):
+    """Rewrite a program's vectorizable loops; returns the statements and a report of rewrites."""
+    vectorizer = LoopVectorizer()
+    statements = vectorizer.run(statements)
+    return statements, vectorizer.report
+
+# ---------- Runtime ----------
+
+class LoopColumns:
+    """The iterations of one run of a VectorizedLoop and the values its element expression reads."""
+    def __init__(self, node, env):
+        self.env = env
+        self.var = node.var.name
+        self.indexed = isinstance(node.iterable, RangeCall)
+        self.sources = []
+        if self.indexed:
+            start = node.iterable.start
+            self.start = 0 if start is None else self.bound(start)
+            self.stop = self.bound(node.iterable.stop)
+            self.items = range(self.start, self.stop)
+        else:
+            values = env[node.iterable.name]
+            if type(values) in (TypedList, ListView):
+                self.items = storage(values)
+            elif type(values) is list:
+                self.items = values
+            else:
+                raise TypeError("not a list")
+            self.sources.append(values)
+        self.length = len(self.items)
+
+    def bound(self, node):
+        if isinstance(node, Number):
+            return node.value
+        if isinstance(node, Identifier):
+            value = self.env[node.name]
+        elif isinstance(node, LenFunction):
+            value = len(self.env[node.expr.name])
+        else:
+            value = ELEMENT_OPERATORS[node.op](self.bound(node.left), self.bound(node.right))
+        if type(value) is not int:
+            raise TypeError("range bound is not an int")
+        return value
+
+    def scalar(self, name):
+        value = self.env[name]
+        return value.value() if type(value) is StringBuilder else value
+
+    def column(self, name):
+        """xs[start:stop] for an xs[i] read; a short list makes the loop raise, so it runs normally."""
+        values = self.env[name]
+        if type(values) not in (list, TypedList, ListView, tuple) or self.start < 0 or len(values) < self.stop:
+            raise IndexError("column out of range")
+        self.sources.append(values)
+        if type(values) in (TypedList, ListView):
+            values = storage(values)
+        return values[self.start:self.stop]
+
+def python_values(node, loop):
+    """(is_column, value) of an element expression, using Python's own operators."""
+    if isinstance(node, Number):
+        return False, node.value
+    if isinstance(node, Identifier):
+        if node.name == loop.var:
+            return True, loop.items
+        return False, loop.scalar(node.name)
+    if isinstance(node, IndexNode):
+        return True, loop.column(node.expr.name)
+    if isinstance(node, UnaryOp):
+        is_column, value = python_values(node.expr, loop)
+        return is_column, (list(map(operator.neg, value)) if is_column else -value)
+    function = ELEMENT_OPERATORS[node.op]
+    left_column, left = python_values(node.left, loop)
+    right_column, right = python_values(node.right, loop)
+    if not (left_column or right_column):
+        return False, function(left, right)
+    return True, list(map(function, left if left_column else itertools.repeat(left),
+                          right if right_column else itertools.repeat(right)))
+
+def numpy_column(values):
+    """(array, int bound) for a list of ints that fit in int64, (array, None) for a list of floats.
+
+    The array('q') or array('d') of a TypedList is used in place, without converting its elements.
+    """
+    if type(values) is array:
+        types = {ELEMENT_TYPES[values.typecode]}
+    else:
+        types = set(map(type, values))
+    if types == {int}:
+        try:
+            column = numpy.asarray(values, dtype=numpy.int64)
+        except OverflowError:
+            return None
+        bound = max(int(column.max()), -int(column.min()))
+        return (column, bound) if bound <= INT64_MAX else None
+    if types == {float}:
+        return numpy.asarray(values, dtype=numpy.float64), None
+    return None
+
+def numpy_values(node, loop):
+    """(array or scalar, bound) of an element expression computed with NumPy, or None.
+
+    bound is the largest magnitude an int result can have (None for float results). None is
+    returned whenever int64 or float64 arithmetic could differ from Python's: mixed or non-numeric
+    columns, results that might overflow, int division beyond exact float conversion, float
+    modulo and division or modulo by zero (which raises in the element loop).
+    """
+    if isinstance(node, Number) or (isinstance(node, Identifier) and node.name != loop.var):
+        value = node.value if isinstance(node, Number) else loop.scalar(node.name)
+        if type(value) is int and abs(value) <= INT64_MAX:
+            return value, abs(value)
+        if type(value) is float:
+            return value, None
+        return None
+    if isinstance(node, Identifier):
+        if loop.indexed:
+            return (numpy.arange(loop.start, loop.stop, dtype=numpy.int64),
+                    max(abs(loop.start), abs(loop.stop - 1)))
+        return numpy_column(loop.items)
+    if isinstance(node, IndexNode):
+        return numpy_column(loop.column(node.expr.name))
+    if isinstance(node, UnaryOp):
+        operand = numpy_values(node.expr, loop)
+        return None if operand is None else (-operand[0], operand[1])
+    left = numpy_values(node.left, loop)
+    right = numpy_values(node.right, loop)
+    if left is None or right is None:
+        return None
+    (a, a_bound), (b, b_bound) = left, right
+    ints = a_bound is not None and b_bound is not None
+    bound = None
+    if node.op in ('+', '-'):
+        bound = a_bound + b_bound if ints else None
+    elif node.op == '*':
+        bound = a_bound * b_bound if ints else None
+    elif node.op == '/':
+        if ints and max(a_bound, b_bound) > EXACT_FLOAT_INT:
+            return None
+    elif node.op == '%':
+        if not ints:
+            return None
+        bound = b_bound
+    if node.op in ('/', '%'):
+        if (b == 0).any() if isinstance(b, numpy.ndarray) else b == 0:
+            return None
+    if bound is not None and bound > INT64_MAX:
+        return None
+    return ELEMENT_OPERATORS[node.op](a, b), bound
+
+def reduce_numpy(kind, acc, values, bound, length):
+    """Result of a reduction over a NumPy column, or None to reduce it with Python instead."""
+    if bound is not None and type(acc) is int:
+        if kind == 'sum' and bound * length + abs(acc) <= INT64_MAX:
+            return acc + int(values.sum())
+        if kind in ('min', 'max'):
+            # Equal ints are indistinguishable, so which occurrence wins does not matter
+            extreme = int(values.min() if kind == 'min' else values.max())
+            better = extreme < acc if kind == 'min' else extreme > acc
+            return extreme if better else acc
+        return None
+    if kind in ('sum', 'product') and type(acc) in (int, float) and abs(acc) <= INT64_MAX:
+        # accumulate adds (or multiplies) strictly left to right, like the loop; reduce may not
+        ufunc = numpy.add if kind == 'sum' else numpy.multiply
+        column = numpy.concatenate((numpy.array([acc], dtype=numpy.float64), values))
+        return float(ufunc.accumulate(column)[-1])
+    return None
+
+def store_numpy(target, start, values):
+    """Write a NumPy result into a TypedList's array from start (appending if start is None).
+
+    Returns False if the target is not stored in an array of the result's element type.
+    """
+    if type(target) is not TypedList or type(target.items) is not array:
+        return False
+    items = target.items
+    if values.dtype != numpy.dtype(items.typecode):
+        return False
+    if start is None:
+        items.frombytes(memoryview(numpy.ascontiguousarray(values)).cast('B'))
+    else:
+        if target.views is not None:
+            target.detach_views()
+        numpy.frombuffer(items, dtype=values.dtype)[start:start + len(values)] = values
+    return True
+
+def reduce_python(kind, acc, values):
+    if kind == 'sum':
+        return functools.reduce(operator.add, values, acc)
+    if kind == 'product':
+        return functools.reduce(operator.mul, values, acc)
+    # min() and max() compare each new item against the current one, like the loop
+    return (min if kind == 'min' else max)(itertools.chain((acc,), values))
+
+def run_kernel(node, env):
+    """Run a VectorizedLoop on whole columns; returns False if it must run element by element."""
+    loop = LoopColumns(node, env)
+    if loop.length == 0:
+        return False
+    kind = node.kind
+    if kind in ('sum', 'product', 'min', 'max'):
+        acc = env[node.target]
+        if kind in ('sum', 'product') and type(acc) not in (int, float):
+            return False
+    else:
+        target = env[node.target]
+        if type(target) not in (list, TypedList, ListView):
+            return False
+    result = None
+    if numpy is not None and loop.length >= NUMPY_MIN_LENGTH:
+        vector = numpy_values(node.element, loop)
+        if vector is not None:
+            values, bound = vector
+            if not isinstance(values, numpy.ndarray):
+                values = numpy.full(loop.length, values)
+            if kind in ('map', 'append'):
+                result = values
+            else:
+                result = reduce_numpy(kind, acc, values, bound, loop.length)
+    if result is None:
+        is_column, values = python_values(node.element, loop)
+        if not is_column:
+            values = [values] * loop.length
+        result = list(values) if kind in ('map', 'append') else reduce_python(kind, acc, values)
+    # Nothing has changed so far; now store the results the loop would have left behind
+    from_numpy = numpy is not None and isinstance(result, numpy.ndarray)
+    if kind == 'map':
+        if len(target) < loop.stop or loop.start < 0:
+            return False
+        if not (from_numpy and store_numpy(target, loop.start, result)):
+            target[loop.start:loop.stop] = result.tolist() if from_numpy else result
+    elif kind == 'append':
+        if any(target is source for source in loop.sources):
+            return False
+        if not (from_numpy and store_numpy(target, None, result)):
+            target.extend(result.tolist() if from_numpy else result)
+    else:
+        env[node.target] = result
+    env[loop.var] = loop.items[-1]
+    return True
+
+def run_vectorized(node, env):
+    """Run a VectorizedLoop on whole columns if possible; False means run it as a ForLoop."""
+    try:
+        done = run_kernel(node, env)
+    except Exception:
+        # Missing variables, bad types, short lists, zero divisors, ...: the element loop raises
+        # the matching error at the iteration where it happens
+        done = False
+    if done:
+        node.hits += 1
+    else:
+        node.fallbacks += 1
+    return done